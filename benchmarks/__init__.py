@@ -0,0 +1,35 @@
+'''
+Benchmark scripts for the API.\n
+Each benchmark is a standalone script that is run from the project root, e.g. `python -m benchmarks.blacklist_cache`.
+They run against a throwaway test database so the development database is never touched.
+'''
+import os
+import time
+
+import django
+
+
+def setup(database_name=None):
+    '''Function to configure django and create a fresh test database for a benchmark'''
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'project_management_api.settings')
+    os.environ.setdefault('SECRET_KEY', 'benchmark-secret-key')
+    django.setup()
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment(debug=False)
+
+    if database_name is not None:
+        connection.settings_dict['TEST']['NAME'] = database_name
+
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+
+
+def timed(func, *args, **kwargs):
+    '''Function to run a callable and return its result with the elapsed time in seconds'''
+
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
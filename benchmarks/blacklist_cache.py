@@ -0,0 +1,60 @@
+'''
+Requests/sec on a protected endpoint with the blacklisted token cache on and off.\n
+Usage: python -m benchmarks.blacklist_cache [--requests N] [--blacklisted N]
+'''
+import argparse
+from datetime import timedelta
+from uuid import uuid4
+
+from benchmarks import setup, timed
+
+
+def run(requests, blacklisted):
+    from django.test import override_settings
+    from django.urls import reverse
+    from django.utils import timezone
+    from rest_framework.test import APIClient
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    from user.authenticators import blacklist_cache
+    from user.models import BlacklistedToken, CustomUser
+
+    user = CustomUser.objects.create(
+        email='bench@gmail.com',
+        first_name='bench',
+        last_name='mark',
+        password='Testing@03',
+        phone_number='08012345678',
+        is_verified=True,
+    )
+
+    expiration_date = timezone.now() + timedelta(hours=12)
+    BlacklistedToken.objects.bulk_create(
+        BlacklistedToken(jti=uuid4().hex, user=user, expiration_date=expiration_date) for _ in range(blacklisted)
+    )
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+    url = reverse('user:user-details')
+
+    def hammer():
+        for _ in range(requests):
+            response = client.get(url)
+            assert response.status_code == 200, response.status_code
+
+    for enabled in (False, True):
+        blacklist_cache.clear()
+        with override_settings(BLACKLIST_CACHE_ENABLED=enabled):
+            client.get(url)
+            _, elapsed = timed(hammer)
+        print(f'cache {"on " if enabled else "off"}: {requests / elapsed:8.1f} req/s ({blacklisted} blacklisted tokens)')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--blacklisted', type=int, default=20000)
+    args = parser.parse_args()
+
+    setup()
+    run(args.requests, args.blacklisted)
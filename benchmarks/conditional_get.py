@@ -0,0 +1,49 @@
+'''
+Time and queries of detail and list endpoints fetched in full and revalidated with `If-None-Match`.\n
+Each endpoint is fetched through the test client once to get its ETag, then fetched again and again without it and
+with it, answered with 304 Not Modified, and the best time of every run is kept.\n
+Usage: python -m benchmarks.conditional_get [--members N] [--repeat N]
+'''
+import argparse
+
+from benchmarks import setup, timed
+from benchmarks.json_rendering import populate
+
+
+def run(members, repeat):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+
+    workspace, project = populate(members)
+    client = APIClient()
+    client.force_authenticate(user=workspace.creator)
+    urls = {
+        'project': reverse('project:project-details', kwargs={'project_id': project.id}),
+        'projects': reverse('project:workspace-projects', kwargs={'workspace_id': workspace.id}),
+        'tasks': reverse('task:tasks-for-project', kwargs={'project_id': project.id}),
+    }
+
+    for name, url in urls.items():
+        response = client.get(url)
+        print(f'{name} ({members} members each, {len(response.content) / 1024:.1f} KiB)')
+
+        for label, headers in (('full', {}), ('revalidated', {'HTTP_IF_NONE_MATCH': response['ETag']})):
+            with CaptureQueriesContext(connection) as queries:
+                status_code = client.get(url, **headers).status_code
+            # read before the next request clears the query log
+            count = len(queries)
+
+            elapsed = min(timed(client.get, url, **headers)[1] for _ in range(repeat))
+            print(f'  {label:<12} {status_code}, {count:2} queries, {elapsed * 1000:6.2f} ms')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--members', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    setup()
+    run(args.members, args.repeat)
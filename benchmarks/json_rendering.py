@@ -0,0 +1,98 @@
+'''
+Render and parse throughput of DRF's JSON renderer and parser and their orjson-backed replacements.\n
+The rendered data are the largest response shapes of the API, built with the serializers the views use: a page of
+projects with their members nested, and a page of tasks with their members. Every shape is rendered and parsed
+repeatedly and the best run kept.\n
+Usage: python -m benchmarks.json_rendering [--members N] [--repeat N]
+'''
+import argparse
+from io import BytesIO
+
+from benchmarks import setup, timed
+
+
+def populate(members):
+    '''Function to create a page of projects and a page of tasks, each with `members` members'''
+
+    from django.conf import settings
+    from django.utils import timezone
+
+    from project.models import Project
+    from task.models import Task
+    from user.models import CustomUser
+    from workspace.models import Member, Workspace
+
+    page_size = settings.REST_FRAMEWORK['PAGE_SIZE']
+    users = CustomUser.objects.bulk_create(
+        CustomUser(email=f'user{i}@gmail.com', first_name='bench', last_name='mark', phone_number='08012345678')
+        for i in range(members)
+    )
+    workspace = Workspace.objects.create(name='benchmark', company_email='owner@gmail.com', no_of_members_allowed=members, creator=users[0])
+    created = Member.objects.bulk_create(Member(user=user, workspace=workspace, role='editor') for user in users)
+
+    projects = Project.objects.bulk_create(
+        Project(
+            name=f'project {i}',
+            description='benchmark project',
+            workspace=workspace,
+            start_date=timezone.now(),
+            end_date=timezone.now(),
+        )
+        for i in range(page_size)
+    )
+    tasks = Task.objects.bulk_create(
+        Task(name=f'task {i}', description='benchmark task', start_date=timezone.now(), project=projects[0], workspace=workspace)
+        for i in range(page_size)
+    )
+    Project.members.through.objects.bulk_create(
+        Project.members.through(project_id=project.id, member_id=member.id) for project in projects for member in created
+    )
+    Task.members.through.objects.bulk_create(
+        Task.members.through(task_id=task.id, member_id=member.id) for task in tasks for member in created
+    )
+
+    return workspace, projects[0]
+
+
+def run(members, repeat):
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+
+    from project.models import Project
+    from project.serializers import ProjectDetailsSerializer
+    from project_management_api.parsers import ORJSONParser
+    from project_management_api.renderers import ORJSONRenderer
+    from task.models import Task
+    from task.serializers import TaskDetailSerializer
+
+    workspace, project = populate(members)
+    shapes = {
+        'projects': ProjectDetailsSerializer(
+            ProjectDetailsSerializer.setup_eager_loading(Project.objects.filter(workspace=workspace)).order_by('id'), many=True
+        ).data,
+        'tasks': TaskDetailSerializer(
+            TaskDetailSerializer.setup_eager_loading(Task.objects.filter(project=project)).order_by('id'), many=True
+        ).data,
+    }
+
+    for name, data in shapes.items():
+        body = JSONRenderer().render(data)
+        print(f'{name}: {len(data)} rows with {members} members each, {len(body) / 1024:.0f} KiB of JSON')
+
+        for label, renderer, parser in (('json', JSONRenderer(), JSONParser()), ('orjson', ORJSONRenderer(), ORJSONParser())):
+            render = min(timed(renderer.render, data)[1] for _ in range(repeat))
+            parse = min(timed(lambda: parser.parse(BytesIO(body)))[1] for _ in range(repeat))
+            print(
+                f'  {label:<7} render {render * 1000:6.2f} ms ({len(body) / render / 1024 / 1024:6.0f} MiB/s), '
+                f'parse {parse * 1000:6.2f} ms ({len(body) / parse / 1024 / 1024:6.0f} MiB/s)'
+            )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--members', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup()
+    run(args.members, args.repeat)
@@ -0,0 +1,108 @@
+'''
+Peak memory and time to send every task of a project with 100k tasks, as one list built in memory and streamed.\n
+The in-memory list is what a list view does when it renders the whole queryset at once: `serializer.data` for every
+row, then the rendered JSON. The stream is `GET /task/project/<id>/?stream=true` through the test client, with the
+chunks read and dropped the way a server writes them to the socket. Peak memory is measured with tracemalloc.\n
+Usage: python -m benchmarks.list_streaming [--tasks N] [--chunk-size N]
+'''
+import argparse
+import tracemalloc
+
+from benchmarks import setup, timed
+
+
+def populate(tasks):
+    '''Function to create a project with `tasks` tasks, each with up to two members'''
+
+    from django.utils import timezone
+
+    from project.models import Project
+    from task.models import Task
+    from user.models import CustomUser
+    from workspace.models import Member, Workspace
+
+    users = CustomUser.objects.bulk_create(
+        CustomUser(email=f'user{i}@gmail.com', first_name='bench', last_name='mark', phone_number='08012345678')
+        for i in range(10)
+    )
+    workspace = Workspace.objects.create(name='benchmark', company_email='owner@gmail.com', no_of_members_allowed=10, creator=users[0])
+    members = Member.objects.bulk_create(Member(user=user, workspace=workspace, role='editor') for user in users)
+    project = Project.objects.create(
+        name='benchmark',
+        description='benchmark project',
+        workspace=workspace,
+        start_date=timezone.now(),
+        end_date=timezone.now(),
+    )
+
+    created = Task.objects.bulk_create(
+        (
+            Task(
+                name=f'task {i}',
+                description='benchmark task',
+                start_date=timezone.now(),
+                project=project,
+                workspace=workspace,
+                created_by=members[0],
+            )
+            for i in range(tasks)
+        ),
+        batch_size=5000,
+    )
+    Task.members.through.objects.bulk_create(
+        (Task.members.through(task_id=task.id, member_id=members[i % 10].id) for i, task in enumerate(created) if i % 3),
+        batch_size=5000,
+    )
+
+    return users[0], project
+
+
+def measure(func):
+    '''Function to run a callable and get its result, elapsed time and peak traced memory in MiB'''
+
+    tracemalloc.start()
+    result, elapsed = timed(func)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return result, elapsed, peak / 1024 / 1024
+
+
+def run(tasks, chunk_size):
+    from django.test import override_settings
+    from django.urls import reverse
+    from rest_framework.renderers import JSONRenderer
+    from rest_framework.test import APIClient
+
+    from task.models import Task
+    from task.serializers import TaskDetailSerializer
+
+    (user, project), elapsed = timed(populate, tasks)
+    print(f'created {tasks} tasks in {elapsed:.1f}s')
+
+    def in_memory():
+        queryset = TaskDetailSerializer.setup_eager_loading(Task.objects.filter(project=project)).order_by('id')
+        return len(JSONRenderer().render(TaskDetailSerializer(queryset, many=True).data))
+
+    client = APIClient()
+    client.force_authenticate(user=user)
+    url = reverse('task:tasks-for-project', kwargs={'project_id': project.id})
+
+    def streamed():
+        response = client.get(url, {'stream': 'true'})
+        return sum(len(chunk) for chunk in response.streaming_content)
+
+    with override_settings(LIST_STREAM_CHUNK_SIZE=chunk_size):
+        for label, func in (('in memory', in_memory), ('streamed', streamed)):
+            size, elapsed, peak = measure(func)
+            print(f'{label:<10} {size / 1024 / 1024:6.1f} MiB of JSON in {elapsed:5.1f}s, peak memory {peak:7.1f} MiB')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--tasks', type=int, default=100000)
+    parser.add_argument('--chunk-size', type=int, default=500)
+    args = parser.parse_args()
+
+    setup()
+    run(args.tasks, args.chunk_size)
@@ -0,0 +1,152 @@
+'''
+Concurrency stress test for the workspace member counter on SQLite in WAL mode.\n
+Several threads invite users to the same workspace through the API while others remove members, then the counter is
+checked against the Member rows and the workspace capacity. Exits with status 1 if the counter drifted or the
+workspace overfilled.\n
+Usage: python -m benchmarks.member_counters [--threads N] [--invites N] [--capacity N]
+'''
+import argparse
+import os
+import sys
+import threading
+import time
+
+from benchmarks import setup, timed
+
+
+def retry(func, attempts=20):
+    '''Function to retry a request that hit a locked database, the way a client would'''
+
+    from django.db import OperationalError
+
+    for attempt in range(attempts):
+        try:
+            return func()
+        except OperationalError:
+            time.sleep(0.01 * (attempt + 1))
+
+    raise RuntimeError('Database stayed locked')
+
+
+def run(threads, invites, capacity):
+    from django.db import connection
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+
+    from user.models import CustomUser
+    from workspace.models import Member, Workspace
+
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA journal_mode=WAL')
+
+    def create_user(email):
+        return CustomUser.objects.create(
+            email=email,
+            first_name='bench',
+            last_name='mark',
+            password='Testing@03',
+            phone_number='08012345678',
+            is_verified=True,
+            subscription_plan='ultimate',
+        )
+
+    owner = create_user('owner@gmail.com')
+    workspace = Workspace.objects.create(
+        name='stress',
+        company_email='stress@gmail.com',
+        no_of_members_allowed=capacity,
+        current_no_of_members=1,
+        creator=owner,
+    )
+    Member.objects.create(user=owner, workspace=workspace, role='editor')
+    users = [create_user(f'user{i}@gmail.com') for i in range(threads * invites)]
+
+    results = {'added': 0, 'full': 0, 'removed': 0, 'failed': 0}
+    lock = threading.Lock()
+    inviting_done = threading.Event()
+
+    def count(key):
+        with lock:
+            results[key] += 1
+
+    def inviter(users):
+        client = APIClient(raise_request_exception=False)
+        client.force_authenticate(user=owner)
+
+        for user in users:
+            url = reverse('workspace:add-member', kwargs={'workspace_id': workspace.id, 'user_id': user.id})
+            response = retry(lambda: client.post(url, {'role': 'viewer'}))
+            if response.status_code == 201:
+                count('added')
+            elif response.data == {'error': 'The workspaace is full'}:
+                count('full')
+            else:
+                count('failed')
+
+        connection.close()
+
+    def remover():
+        client = APIClient(raise_request_exception=False)
+        client.force_authenticate(user=owner)
+
+        removed = 0
+        while removed < invites and not inviting_done.is_set():
+            member = Member.objects.filter(workspace=workspace).exclude(user=owner).order_by('?').first()
+            if member is not None:
+                url = reverse('workspace:remove-member', kwargs={'workspace_id': workspace.id, 'member_id': member.id})
+                response = retry(lambda: client.post(url))
+                if response.status_code == 200:
+                    count('removed')
+                    removed += 1
+            
+            time.sleep(0.005)
+
+        connection.close()
+
+    workers = [threading.Thread(target=inviter, args=(users[i::threads],)) for i in range(threads)]
+    workers += [threading.Thread(target=remover) for _ in range(max(1, threads // 4))]
+
+    def stress():
+        for worker in workers:
+            worker.start()
+        for worker in workers[:threads]:
+            worker.join()
+
+        inviting_done.set()
+        for worker in workers[threads:]:
+            worker.join()
+
+    _, elapsed = timed(stress)
+
+    workspace.refresh_from_db()
+    members = Member.objects.filter(workspace=workspace).count()
+
+    print(
+        f"{results['added']} added, {results['full']} rejected as full, {results['failed']} failed, "
+        f"{results['removed']} removed in {elapsed:.2f}s"
+    )
+    print(f'counter {workspace.current_no_of_members}, members {members}, capacity {capacity}')
+
+    return workspace.current_no_of_members == members and members <= capacity
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--invites', type=int, default=25)
+    parser.add_argument('--capacity', type=int, default=50)
+    args = parser.parse_args()
+
+    # WAL needs a file database
+    database_name = 'benchmark_member_counters.sqlite3'
+    setup(database_name=database_name)
+
+    try:
+        ok = run(args.threads, args.invites, args.capacity)
+    finally:
+        for suffix in ['', '-wal', '-shm']:
+            if os.path.exists(database_name + suffix):
+                os.remove(database_name + suffix)
+
+    print('OK' if ok else 'FAILED: the member counter drifted from the Member rows or went past the capacity')
+    sys.exit(0 if ok else 1)
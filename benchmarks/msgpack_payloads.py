@@ -0,0 +1,69 @@
+'''
+Payload size and encode time of the endpoints the mobile apps poll, as JSON and as MessagePack.\n
+A page of each of `/task/project/<id>/`, `/project/workspace/<id>/all/` and `/notification/all/` is fetched through the
+test client, then the page data is rendered again and again with the JSON and MessagePack renderers and the best run
+kept. Sizes are given as sent and gzipped, since most responses go through a compressing proxy.\n
+Usage: python -m benchmarks.msgpack_payloads [--members N] [--repeat N]
+'''
+import argparse
+import gzip
+import sys
+
+from benchmarks import setup, timed
+from benchmarks.json_rendering import populate
+
+
+def run(members, repeat):
+    from django.conf import settings
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+
+    from notification.models import Notification
+    from project_management_api.renderers import MessagePackRenderer, ORJSONRenderer, msgpack
+    from workspace.models import Member
+
+    if msgpack is None:
+        sys.exit('msgpack is not installed')
+
+    workspace, project = populate(members)
+    user = workspace.creator
+    senders = [member.user_id for member in Member.objects.filter(workspace=workspace)]
+    Notification.objects.bulk_create(
+        Notification(
+            receiver=user,
+            sender_id=senders[i % len(senders)],
+            message=f'Your role has been updated in {workspace.name}. You are now a/an editor.',
+            kind=Notification.MEMBERSHIP,
+        )
+        for i in range(settings.REST_FRAMEWORK['PAGE_SIZE'])
+    )
+
+    client = APIClient()
+    client.force_authenticate(user=user)
+    urls = {
+        'tasks': reverse('task:tasks-for-project', kwargs={'project_id': project.id}),
+        'projects': reverse('project:workspace-projects', kwargs={'workspace_id': workspace.id}),
+        'notifications': reverse('notification:get-notifications'),
+    }
+
+    for name, url in urls.items():
+        data = client.get(url).data
+        print(f'{name} ({len(data["results"])} rows, {members} members each where nested)')
+
+        for label, renderer in (('json', ORJSONRenderer()), ('msgpack', MessagePackRenderer())):
+            body = renderer.render(data)
+            elapsed = min(timed(renderer.render, data)[1] for _ in range(repeat))
+            print(
+                f'  {label:<8} {len(body) / 1024:7.1f} KiB, {len(gzip.compress(body)) / 1024:6.1f} KiB gzipped, '
+                f'encoded in {elapsed * 1000:5.2f} ms'
+            )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--members', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup()
+    run(args.members, args.repeat)
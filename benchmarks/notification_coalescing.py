@@ -0,0 +1,59 @@
+'''
+Notification rows written and kept for a burst of membership changes, with coalescing on and off.\n
+Every round notifies each member of a workspace of a role change in its own request, the way a bulk re-assignment by
+an admin does, and the rows inserted and left in the notification table are counted.\n
+Usage: python -m benchmarks.notification_coalescing [--members N] [--rounds N]
+'''
+import argparse
+
+from benchmarks import setup, timed
+
+
+def run(members, rounds):
+    from django.db import connection
+    from django.test import override_settings
+    from django.test.utils import CaptureQueriesContext
+
+    from notification import dispatcher
+    from notification.models import Notification
+    from user.models import CustomUser
+    from workspace.models import Workspace
+
+    owner, *receivers = CustomUser.objects.bulk_create(
+        CustomUser(email=f'user{i}@gmail.com', first_name='bench', last_name='mark', phone_number='08012345678')
+        for i in range(members + 1)
+    )
+    workspace = Workspace.objects.create(name='benchmark', company_email='owner@gmail.com', no_of_members_allowed=members, creator=owner)
+
+    def burst():
+        for i in range(rounds):
+            with dispatcher.collect():
+                dispatcher.notify(
+                    receivers,
+                    f'Your role has been updated in {workspace.name}. You are now a/an {"editor" if i % 2 else "viewer"}.',
+                    sender=owner,
+                    kind=Notification.MEMBERSHIP,
+                    target=workspace,
+                )
+
+    for label, windows in (('off', {}), ('on ', {Notification.MEMBERSHIP: 600})):
+        Notification.objects.all().delete()
+
+        with override_settings(NOTIFICATION_COALESCE_WINDOWS=windows), CaptureQueriesContext(connection) as queries:
+            _, elapsed = timed(burst)
+
+        inserted = sum(query['sql'].count('), (') + 1 for query in queries if query['sql'].startswith('INSERT INTO "notification_notification"'))
+        print(
+            f'coalescing {label}: {inserted:7} rows inserted, {Notification.objects.count():6} rows kept, '
+            f'{len(queries):4} queries in {elapsed:.2f}s'
+        )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--members', type=int, default=200)
+    parser.add_argument('--rounds', type=int, default=50)
+    args = parser.parse_args()
+
+    setup()
+    run(args.members, args.rounds)
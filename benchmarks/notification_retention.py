@@ -0,0 +1,161 @@
+'''
+Inbox reads and pruning throughput on a notification table with millions of rows of history.\n
+A year of synthetic notifications is spread over the users, then every sampled user's whole inbox is read page by page,
+the way the API pages through it, with the full history, inside the live window before pruning, and after pruning.
+The expired notifications are then pruned kind by kind to the archive table and to an NDJSON file.\n
+Usage: python -m benchmarks.notification_retention [--rows N] [--users N] [--batch-size N]
+'''
+import argparse
+import os
+import random
+import time
+from datetime import timedelta
+from uuid import UUID
+
+from benchmarks import setup, timed
+
+PAGE_SIZE = 50
+SAMPLED_USERS = 20
+
+
+def populate(rows, users, chunk_size=50000):
+    '''Function to insert `rows` notifications sent to `users` users over the last year, oldest first'''
+
+    from django.db import connection, transaction
+    from django.utils import timezone
+
+    from notification.models import Notification
+    from project_management_api.ids import uuid7_at
+    from user.models import CustomUser
+
+    receivers = CustomUser.objects.bulk_create(
+        CustomUser(email=f'user{i}@gmail.com', first_name='bench', last_name='mark', phone_number='08012345678')
+        for i in range(users)
+    )
+    receiver_ids = [receiver.id for receiver in receivers]
+
+    kinds = [Notification.MESSAGE, Notification.BROADCAST, Notification.MEMBERSHIP]
+    fields = [Notification._meta.get_field(name) for name in ('id', 'message', 'sender', 'receiver', 'date_sent', 'is_read', 'kind')]
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        Notification._meta.db_table,
+        ', '.join(field.column for field in fields),
+        ', '.join(['%s'] * len(fields)),
+    )
+
+    start = timezone.now() - timedelta(days=365)
+    step = timedelta(days=365) / rows
+
+    for offset in range(0, rows, chunk_size):
+        values = []
+        for i in range(offset, min(offset + chunk_size, rows)):
+            date_sent = start + step * i
+            values.append([
+                field.get_db_prep_save(value, connection)
+                for field, value in zip(fields, (
+                    # time-ordered like the ids the API generates, with random low bits
+                    UUID(int=uuid7_at(date_sent.timestamp()).int | random.getrandbits(62)),
+                    'You have been added to workspace benchmark',
+                    None,
+                    random.choice(receiver_ids),
+                    date_sent,
+                    random.random() < 0.9,
+                    random.choices(kinds, weights=(5, 3, 2))[0],
+                ))
+            ])
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(sql, values)
+
+    return receiver_ids
+
+
+def read_inboxes(user_ids, live=False):
+    '''Function to read the whole inbox of each user a page at a time and get the number of notifications read'''
+
+    from notification.models import Notification
+    from notification.retention import live as live_window
+
+    read = 0
+
+    for user_id in user_ids:
+        notifications = Notification.objects.filter(receiver_id=user_id)
+        if live:
+            notifications = live_window(notifications)
+
+        cursor = None
+        while True:
+            page = notifications.order_by('id')
+            if cursor is not None:
+                page = page.filter(id__gt=cursor)
+
+            ids = list(page.values_list('id', flat=True)[:PAGE_SIZE])
+            read += len(ids)
+
+            if len(ids) < PAGE_SIZE:
+                break
+            cursor = ids[-1]
+
+    return read
+
+
+def run(rows, users, batch_size, archive_path):
+    from django.conf import settings
+
+    from notification import retention
+    from notification.models import ArchivedNotification, Notification
+
+    _, elapsed = timed(populate, rows, users)
+    print(f'inserted {rows} notifications for {users} users in {elapsed:.1f}s')
+    print(f'retention in days: {settings.NOTIFICATION_RETENTION}')
+
+    sampled = random.sample(list(Notification.objects.values_list('receiver_id', flat=True).distinct()), SAMPLED_USERS)
+
+    def report(label, live):
+        read, elapsed = timed(read_inboxes, sampled, live)
+        print(f'{label:<28} {read / SAMPLED_USERS:8.0f} notifications per inbox, {elapsed / SAMPLED_USERS * 1000:7.1f}ms per inbox')
+
+    report('inbox, full history:', False)
+    report('inbox, live window:', True)
+
+    for kind, archive in (
+        (Notification.MESSAGE, retention.archive_to_table),
+        (Notification.BROADCAST, retention.archive_to_table),
+        (Notification.MEMBERSHIP, 'file'),
+    ):
+        with open(archive_path, 'a') as file:
+            if archive == 'file':
+                archive = retention.FileArchive(file)
+
+            start = time.perf_counter()
+            pruned = retention.prune(kind, archive=archive, batch_size=batch_size)
+            elapsed = time.perf_counter() - start
+
+        target = 'NDJSON file' if isinstance(archive, retention.FileArchive) else 'archive table'
+        print(f'pruned {pruned:8} {kind:<10} notifications to the {target:<13} in {elapsed:6.1f}s ({pruned / elapsed:8.0f} rows/s)')
+
+    print(
+        f'{Notification.objects.count()} live notifications left, {ArchivedNotification.objects.count()} archived to the '
+        f'table, {os.path.getsize(archive_path) / 1024 / 1024:.0f} MiB archived to the file'
+    )
+
+    report('inbox, after pruning:', True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=2000000)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--batch-size', type=int)
+    args = parser.parse_args()
+
+    # a file database, as a table of this size would not be kept in memory
+    database_name = 'benchmark_notification_retention.sqlite3'
+    archive_path = 'benchmark_notification_retention.ndjson'
+    setup(database_name=database_name)
+
+    try:
+        run(args.rows, args.users, args.batch_size, archive_path)
+    finally:
+        for path in (database_name, archive_path):
+            if os.path.exists(path):
+                os.remove(path)
@@ -0,0 +1,50 @@
+'''
+Time per row to render the tasks of a project with the DRF serializer and with the fast list path.\n
+Both render the same rows to the same JSON: the serializer from the eager-loaded queryset the list views used before,
+the fast path from `.values()` rows with one query on the members through table. The database reads are included in
+both, and every run is repeated and the best time kept.\n
+Usage: python -m benchmarks.serializer_fastpath [--tasks N] [--repeat N]
+'''
+import argparse
+
+from benchmarks import setup, timed
+from benchmarks.list_streaming import populate
+
+
+def run(tasks, repeat):
+    from rest_framework.renderers import JSONRenderer
+
+    from project_management_api.fastpath import get_reader
+    from task.models import Task
+    from task.serializers import TaskDetailSerializer
+
+    (_, project), elapsed = timed(populate, tasks)
+    print(f'created {tasks} tasks in {elapsed:.1f}s')
+
+    queryset = TaskDetailSerializer.setup_eager_loading(Task.objects.filter(project=project)).order_by('id')
+    reader = get_reader(TaskDetailSerializer)
+
+    def serializer():
+        return JSONRenderer().render(TaskDetailSerializer(queryset.all(), many=True).data)
+
+    def fastpath():
+        return JSONRenderer().render(reader.data(list(reader.values(queryset.all()))))
+
+    outputs = {}
+
+    for label, func in (('serializer', serializer), ('fast path', fastpath)):
+        elapsed = min(timed(func)[1] for _ in range(repeat))
+        outputs[label] = func()
+        print(f'{label:<10} {elapsed:6.2f}s, {elapsed / tasks * 1e6:6.1f} us per row')
+
+    print(f'same output: {outputs["serializer"] == outputs["fast path"]}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--tasks', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    setup()
+    run(args.tasks, args.repeat)
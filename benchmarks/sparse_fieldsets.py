@@ -0,0 +1,55 @@
+'''
+Response size, queries and time of list and detail endpoints with every field and with sparse fieldsets.\n
+Each endpoint is fetched through the test client with no query parameters, with only ids and names
+(`?fields=id,name,members.id,members.user.first_name`) and with relations as ids (`?expand=`), and the best time of
+every run is kept.\n
+Usage: python -m benchmarks.sparse_fieldsets [--members N] [--repeat N]
+'''
+import argparse
+
+from benchmarks import setup, timed
+from benchmarks.json_rendering import populate
+
+FIELDSETS = {
+    'everything': {},
+    'ids and names': {'fields': 'id,name,members.id,members.user.first_name'},
+    'relations as ids': {'expand': ''},
+}
+
+
+def run(members, repeat):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+
+    workspace, project = populate(members)
+    client = APIClient()
+    client.force_authenticate(user=workspace.creator)
+    urls = {
+        'tasks': reverse('task:tasks-for-project', kwargs={'project_id': project.id}),
+        'projects': reverse('project:workspace-projects', kwargs={'workspace_id': workspace.id}),
+        'project': reverse('project:project-details', kwargs={'project_id': project.id}),
+    }
+
+    for name, url in urls.items():
+        print(f'{name} ({members} members each)')
+
+        for label, params in FIELDSETS.items():
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get(url, params)
+            # read before the next request clears the query log
+            count = len(queries)
+
+            elapsed = min(timed(client.get, url, params)[1] for _ in range(repeat))
+            print(f'  {label:<17} {len(response.content) / 1024:7.1f} KiB, {count:2} queries, {elapsed * 1000:6.1f} ms')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--members', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    setup()
+    run(args.members, args.repeat)
@@ -0,0 +1,131 @@
+'''
+Load test for notification streams: thousands of idle server-sent event connections on one worker.\n
+The connections are opened against the ASGI application in-process, without sockets, so the numbers are the cost of
+the streams themselves: the time to open them, the memory they hold while idle, how long one broadcast takes to reach
+all of them and how long they take to close. Exits with status 1 if a connection failed or missed the broadcast.\n
+Usage: python -m benchmarks.sse_connections [--connections N] [--users N]
+'''
+import argparse
+import asyncio
+import resource
+import sys
+import time
+
+from benchmarks import setup
+
+
+class Connection:
+    '''A client holding a notification stream open until it is told to disconnect'''
+
+    def __init__(self, token):
+        self.scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': '/notification/stream/',
+            'raw_path': b'/notification/stream/',
+            'query_string': b'',
+            'root_path': '',
+            'headers': [(b'host', b'testserver'), (b'authorization', token)],
+            'client': ('127.0.0.1', 50000),
+            'server': ('testserver', 80),
+        }
+        self.status = None
+        self.opened = asyncio.Event()
+        self.notified = asyncio.Event()
+        self.disconnected = asyncio.Event()
+        self._requested = False
+
+    async def receive(self):
+        if not self._requested:
+            self._requested = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        await self.disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(self, message):
+        if message['type'] == 'http.response.start':
+            self.status = message['status']
+            if self.status != 200:
+                self.opened.set()
+        elif message.get('body'):
+            self.opened.set()
+            if b'event: notification' in message['body']:
+                self.notified.set()
+
+
+async def run(connections, users):
+    from asgiref.sync import sync_to_async
+    from django.core.asgi import get_asgi_application
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    from notification import dispatcher
+    from user.models import CustomUser
+
+    application = get_asgi_application()
+
+    def create_users():
+        created = CustomUser.objects.bulk_create([
+            CustomUser(email=f'user{i}@gmail.com', first_name='bench', last_name='mark', phone_number='08012345678', is_verified=True)
+            for i in range(users)
+        ])
+        return [(user, f'Bearer {RefreshToken.for_user(user).access_token}'.encode()) for user in created]
+
+    def broadcast(receivers):
+        with dispatcher.collect():
+            dispatcher.notify(receivers, 'announcement')
+
+    receivers = await sync_to_async(create_users)()
+    clients = [Connection(receivers[i % users][1]) for i in range(connections)]
+
+    # peak resident memory in KiB on Linux, which only grows while the streams are opened
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.perf_counter()
+    tasks = [asyncio.create_task(application(client.scope, client.receive, client.send)) for client in clients]
+    await asyncio.gather(*(client.opened.wait() for client in clients))
+    opened = time.perf_counter() - start
+
+    # let the streams settle into waiting for events
+    await asyncio.sleep(1)
+    memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline
+
+    start = time.perf_counter()
+    await sync_to_async(broadcast)([user for user, _ in receivers])
+    try:
+        await asyncio.wait_for(asyncio.gather(*(client.notified.wait() for client in clients)), 30)
+    except asyncio.TimeoutError:
+        pass
+    delivered = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for client in clients:
+        client.disconnected.set()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    closed = time.perf_counter() - start
+
+    failed = sum(client.status != 200 for client in clients)
+    missed = sum(not client.notified.is_set() for client in clients)
+
+    print(f'{connections} streams for {users} users opened in {opened:.2f}s ({connections / opened:.0f}/s)')
+    print(f'{memory / 1024:.1f} MiB held while idle, {memory / connections:.1f} KiB per stream')
+    print(f'one broadcast reached {connections - missed} streams in {delivered * 1000:.0f}ms')
+    print(f'streams closed in {closed:.2f}s, {failed} failed')
+
+    return failed == 0 and missed == 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--connections', type=int, default=2000)
+    parser.add_argument('--users', type=int, default=200)
+    args = parser.parse_args()
+
+    setup()
+    ok = asyncio.run(run(args.connections, args.users))
+
+    print('OK' if ok else 'FAILED: a stream failed to open or missed the broadcast')
+    sys.exit(0 if ok else 1)
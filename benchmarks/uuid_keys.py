@@ -0,0 +1,64 @@
+'''
+Bulk insert throughput and primary key index size with random (uuid4) and time-ordered (uuid7) ids.\n
+Rows are inserted into the notification table in small transactions, the way the API creates them, and the index
+size is read from SQLite's dbstat table.\n
+Usage: python -m benchmarks.uuid_keys [--rows N] [--batch-size N]
+'''
+import argparse
+import os
+from uuid import uuid4
+
+from benchmarks import setup, timed
+
+
+def index_size(table):
+    '''Function to get the number of pages and bytes used by the primary key index of a table'''
+
+    from django.db import connection
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT COUNT(*), SUM(pgsize) FROM dbstat WHERE name IN "
+            "(SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = %s AND name LIKE 'sqlite_autoindex_%%')",
+            [table],
+        )
+        return cursor.fetchone()
+
+
+def run(rows, batch_size):
+    from django.db import connection, transaction
+
+    from notification.models import Notification
+    from project_management_api.ids import uuid7
+
+    def insert(generate_id):
+        for start in range(0, rows, batch_size):
+            with transaction.atomic():
+                Notification.objects.bulk_create(
+                    Notification(id=generate_id(), message='benchmark') for _ in range(min(batch_size, rows - start))
+                )
+
+    for name, generate_id in (('uuid4', uuid4), ('uuid7', uuid7)):
+        Notification.objects.all().delete()
+        with connection.cursor() as cursor:
+            cursor.execute('VACUUM')
+
+        _, elapsed = timed(insert, generate_id)
+        pages, size = index_size(Notification._meta.db_table)
+        print(f'{name}: {rows / elapsed:9.1f} rows/s, primary key index {pages} pages ({size / 1024:.0f} KiB)')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--batch-size', type=int, default=100)
+    args = parser.parse_args()
+
+    # a file database so page cache misses from scattered inserts show up
+    database_name = 'benchmark_uuid_keys.sqlite3'
+    setup(database_name=database_name)
+
+    try:
+        run(args.rows, args.batch_size)
+    finally:
+        os.remove(database_name)
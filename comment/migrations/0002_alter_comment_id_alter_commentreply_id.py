@@ -0,0 +1,24 @@
+# Generated by Django 5.0.1 on 2026-10-17 00:40
+
+import project_management_api.ids
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comment', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='comment',
+            name='id',
+            field=models.UUIDField(default=project_management_api.ids.uuid7, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='commentreply',
+            name='id',
+            field=models.UUIDField(default=project_management_api.ids.uuid7, primary_key=True, serialize=False),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.0.1 on 2026-10-17 00:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comment', '0002_alter_comment_id_alter_commentreply_id'),
+        ('project', '0035_alter_project_workspace_and_more'),
+        ('workspace', '0016_alter_member_options_alter_member_user_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='comment',
+            name='project',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='project', to='project.project'),
+        ),
+        migrations.AlterField(
+            model_name='commentreply',
+            name='comment',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='comment_obj', to='comment.comment'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['project', 'id'], name='comment_project_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='commentreply',
+            index=models.Index(fields=['comment', 'id'], name='commentreply_comment_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.0.1 on 2026-10-17 00:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_workspace(apps, schema_editor):
+    '''Copy the workspace of each comment's project onto the comment and onto its replies'''
+
+    Project = apps.get_model('project', 'Project')
+    Comment = apps.get_model('comment', 'Comment')
+    CommentReply = apps.get_model('comment', 'CommentReply')
+    
+    Comment.objects.update(workspace_id=Subquery(Project.objects.filter(id=OuterRef('project_id')).values('workspace_id')[:1]))
+    CommentReply.objects.update(workspace_id=Subquery(Comment.objects.filter(id=OuterRef('comment_id')).values('workspace_id')[:1]))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comment', '0003_alter_comment_project_alter_commentreply_comment_and_more'),
+        ('workspace', '0016_alter_member_options_alter_member_user_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='workspace',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='workspace.workspace'),
+        ),
+        migrations.AddField(
+            model_name='commentreply',
+            name='workspace',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='workspace.workspace'),
+        ),
+        migrations.RunPython(backfill_workspace, migrations.RunPython.noop),
+    ]
@@ -1,27 +1,55 @@
 from django.db import models
-from uuid import uuid4
+from project_management_api.ids import uuid7
 
 from project.models import Project
-from workspace.models import Member
+from workspace.models import Member, Workspace
 
 # Create your models here.
 class Comment(models.Model):
     '''Comment model'''
     
-    id = models.UUIDField(default=uuid4, primary_key=True)
+    id = models.UUIDField(default=uuid7, primary_key=True)
     comment = models.CharField(null=False, max_length=300)
-    project = models.ForeignKey(Project, on_delete=models.CASCADE, null=True, related_name='project')
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, null=True, related_name='project', db_index=False)
+    # copy of project.workspace, kept in step by save() and Project.save()
+    workspace = models.ForeignKey(Workspace, null=True, on_delete=models.CASCADE, editable=False, related_name='+')
     commenter = models.ForeignKey(Member, on_delete=models.SET_NULL, null=True, related_name='member')
+    updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
         return  f'Comment by {self.commenter.user.email} on {self.project.name}'
     
+    def save(self, *args, **kwargs):
+        # copy the workspace from the project so permission checks do not have to load it
+        if self.project_id is not None and (self.workspace_id is None or type(self).project.is_cached(self)):
+            self.workspace_id = self.project.workspace_id
+            
+        super().save(*args, **kwargs)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['project', 'id'], name='comment_project_idx'),
+        ]
+    
 
 class CommentReply(models.Model):
     '''Comment reply model'''
     
-    id = models.UUIDField(default=uuid4, primary_key=True)
+    id = models.UUIDField(default=uuid7, primary_key=True)
     reply = models.CharField(null=False, max_length=300)
-    comment = models.ForeignKey(Comment, on_delete=models.CASCADE, null=True, related_name='comment_obj')
+    comment = models.ForeignKey(Comment, on_delete=models.CASCADE, null=True, related_name='comment_obj', db_index=False)
+    # copy of comment.workspace, kept in step by save() and Project.save()
+    workspace = models.ForeignKey(Workspace, null=True, on_delete=models.CASCADE, editable=False, related_name='+')
     commenter = models.ForeignKey(Member, on_delete=models.SET_NULL, null=True, related_name='member_commenter')
-    
\ No newline at end of file
+    
+    def save(self, *args, **kwargs):
+        # copy the workspace from the comment so permission checks do not have to load it
+        if self.comment_id is not None and (self.workspace_id is None or type(self).comment.is_cached(self)):
+            self.workspace_id = self.comment.workspace_id
+            
+        super().save(*args, **kwargs)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['comment', 'id'], name='commentreply_comment_idx'),
+        ]
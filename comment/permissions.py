@@ -1,7 +1,7 @@
 from rest_framework.permissions import BasePermission, SAFE_METHODS
 
-from comment.models import CommentReply
-from workspace.models import Member
+from comment.models import Comment, CommentReply
+from workspace.membership import get_membership_resolver
 
 class IsProjectMemberComment(BasePermission):     
     '''Permission to check if a user is a member of a project'''
@@ -9,15 +9,15 @@ class IsProjectMemberComment(BasePermission):
     message = 'You are not a member of this project'
     
     def has_object_permission(self, request, view, obj):
-        # check if member is in project members
-        comment_obj = obj
-        if isinstance(obj, CommentReply):
-            comment_obj = obj.comment
-            
         # get member based on current logged in user
-        member = Member.objects.get(user=request.user, workspace=comment_obj.project.workspace)
+        member = get_membership_resolver(request).get(obj.workspace_id)
         
-        return comment_obj.project.members.contains(member)
+        if member is None:
+            return False
+        
+        # check if member is in project members, replies are checked against the project of their comment
+        comment_id = obj.comment_id if isinstance(obj, CommentReply) else obj.id
+        return Comment.objects.filter(id=comment_id, project__members=member).exists()
     
 
 class IsCommentOwner(BasePermission):
@@ -29,4 +29,4 @@ class IsCommentOwner(BasePermission):
         if request.method in SAFE_METHODS:
             return True
         
-        return request.user == obj.commenter.user
\ No newline at end of file
+        return obj.commenter is not None and obj.commenter.user_id == request.user.id
@@ -2,7 +2,8 @@ from rest_framework import serializers
 
 from comment.models import Comment, CommentReply
 from project.models import Project
-from workspace.models import Member
+from project_management_api.serializers import EagerLoadingMixin, SparseFieldsetMixin
+from workspace.membership import get_membership_resolver
 from workspace.serializers import MemberSerializer
 
 class CommentSerializer(serializers.ModelSerializer):
@@ -17,7 +18,11 @@ class CommentSerializer(serializers.ModelSerializer):
     
     def create(self, validated_data):
         project = Project.objects.get(id=self.context['view'].kwargs['project_id'])
-        member = Member.objects.get(user=self.context['request'].user, workspace=project.workspace)
+        member = get_membership_resolver(self.context['request']).get(project.workspace_id)
+        
+        if member is None:
+            raise serializers.ValidationError({'error': 'Member does not exist in this workspace'})
+        
         # Create comment
         comment = Comment.objects.create(
             comment=validated_data.get('comment'),
@@ -28,9 +33,11 @@ class CommentSerializer(serializers.ModelSerializer):
         return comment
  
  
-class CommentDetailsSerializer(serializers.ModelSerializer):
+class CommentDetailsSerializer(SparseFieldsetMixin, EagerLoadingMixin, serializers.ModelSerializer):
     '''Serializer for comment details'''
     
+    select_related_fields = ['commenter__user', 'commenter__workspace']
+    
     commenter = MemberSerializer(read_only=True)
     
     class Meta:
@@ -58,24 +65,26 @@ class CommentReplySerializer(serializers.ModelSerializer):
     
     def create(self, validated_data):
         comment = Comment.objects.get(id=self.context['view'].kwargs['comment_id'])
-        member = Member.objects.get(user=self.context['request'].user, workspace=comment.project.workspace)
+        member = get_membership_resolver(self.context['request']).get(comment.workspace_id)
+        
+        if member is None:
+            raise serializers.ValidationError({'error': 'Member does not exist in this workspace'})
         
-        try:
-            # Create comment
-            reply = CommentReply.objects.create(
-                reply=validated_data.get('reply'),
-                comment=comment,
-                commenter=member
-            )
-        except Member.DoesNotExist:
-            raise serializers.ValidationError('Member does not exist in this workspace')
+        # Create comment
+        reply = CommentReply.objects.create(
+            reply=validated_data.get('reply'),
+            comment=comment,
+            commenter=member
+        )
         
         return reply
  
  
-class CommentReplyDetailsSerializer(serializers.ModelSerializer):
+class CommentReplyDetailsSerializer(SparseFieldsetMixin, EagerLoadingMixin, serializers.ModelSerializer):
     '''Serializer for comment reply details'''
     
+    select_related_fields = ['commenter__user', 'commenter__workspace']
+    
     commenter = MemberSerializer(read_only=True)
     
     class Meta:
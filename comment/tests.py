@@ -1,3 +1,51 @@
-from django.test import TestCase
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 
-# Create your tests here.
+from rest_framework.test import APITestCase
+
+from comment.models import Comment, CommentReply
+from project.tests import create_project
+from workspace.tests import add_members, create_user, create_workspace
+
+
+class CommentQueryCountTestCase(APITestCase):
+    '''Test case to guard the number of queries run by comment endpoints'''
+    
+    def setUp(self):
+        self.user = create_user('test@gmail.com')
+        self.workspace = create_workspace(self.user)
+        self.project = create_project(self.workspace)
+        self.client.force_authenticate(user=self.user)
+        
+    def test_list_comments(self):
+        url = reverse('comment:all-comments', kwargs={'project_id': self.project.id})
+        Comment.objects.create(comment='comment', project=self.project, commenter=add_members(self.workspace, 1)[0])
+        
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(len(response.data['results']), 1)
+        
+        for member in add_members(self.workspace, 4):
+            Comment.objects.create(comment='comment', project=self.project, commenter=member)
+        
+        with self.assertNumQueries(len(queries)):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data['results']), 5)
+        
+    def test_list_comment_replies(self):
+        comment = Comment.objects.create(comment='comment', project=self.project, commenter=add_members(self.workspace, 1)[0])
+        url = reverse('comment:all-comment-replies', kwargs={'comment_id': comment.id})
+        CommentReply.objects.create(reply='reply', comment=comment, commenter=add_members(self.workspace, 1)[0])
+        
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(len(response.data['results']), 1)
+        
+        for member in add_members(self.workspace, 4):
+            CommentReply.objects.create(reply='reply', comment=comment, commenter=member)
+        
+        with self.assertNumQueries(len(queries)):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data['results']), 5)
+        self.assertIn('reply', response.data['results'][0])
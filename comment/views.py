@@ -7,6 +7,8 @@ from rest_framework import status
 
 from comment.models import Comment, CommentReply
 from project.models import Project
+from project_management_api.serializers import Fieldset
+from project_management_api.views import ConditionalGetMixin, FastListMixin, StreamingListMixin
 from .permissions import IsProjectMemberComment, IsCommentOwner
 
 from . import serializers
@@ -33,8 +35,9 @@ class CommentDetailsView(generics.RetrieveUpdateDestroyAPIView):
     
     def get(self, request, *args, **kwargs):
         try:
-            comment = Comment.objects.get(id=self.kwargs['comment_id'])
-            serializer = self.serializer_class(comment)
+            fieldset = Fieldset.from_request(request)
+            comment = self.serializer_class.setup_eager_loading(Comment.objects, fieldset).get(id=self.kwargs['comment_id'])
+            serializer = self.serializer_class(comment, context={'fieldset': fieldset})
             return Response(serializer.data, status=status.HTTP_200_OK)
         except Comment.DoesNotExist:
             return Response({'error': 'Comment does not exist'}, status=status.HTTP_404_NOT_FOUND)
@@ -58,24 +61,21 @@ class CommentDetailsView(generics.RetrieveUpdateDestroyAPIView):
             return Response({'error': 'Comment does not exist'}, status=status.HTTP_404_NOT_FOUND)
         
         
-class GetAllCommentsView(generics.ListAPIView):
+class GetAllCommentsView(ConditionalGetMixin, FastListMixin, StreamingListMixin, generics.ListAPIView):
     '''View to get all comments for a project'''
     
     serializer_class = serializers.CommentDetailsSerializer
     
     def get_queryset(self):
         project = Project.objects.get(id=self.kwargs['project_id'])
-        comments = Comment.objects.filter(project=project)
+        comments = self.serializer_class.setup_eager_loading(Comment.objects.filter(project=project), Fieldset.from_request(self.request))
         return comments
     
     def list(self, request, *args, **kwargs):
-        project = Project.objects.get(id=self.kwargs['project_id'])
-        comments = Comment.objects.filter(project=project)
-        
-        serializer = self.serializer_class(comments, many=True)
+        comments = self.get_page_data(self.get_queryset())
         
-        if comments.exists():
-            return Response(serializer.data, status=status.HTTP_200_OK)
+        if comments:
+            return self.get_paginated_response(comments)
         else:
             return Response({'error': 'There are no comments for this project'}, status=status.HTTP_204_NO_CONTENT)
             
@@ -101,8 +101,9 @@ class CommentReplyDetailsView(generics.RetrieveUpdateDestroyAPIView):
     
     def get(self, request, *args, **kwargs):
         try:
-            reply = CommentReply.objects.get(id=self.kwargs['comment_reply_id'])
-            serializer = self.serializer_class(reply)
+            fieldset = Fieldset.from_request(request)
+            reply = self.serializer_class.setup_eager_loading(CommentReply.objects, fieldset).get(id=self.kwargs['comment_reply_id'])
+            serializer = self.serializer_class(reply, context={'fieldset': fieldset})
             return Response(serializer.data, status=status.HTTP_200_OK)
         except Comment.DoesNotExist:
             return Response({'error': 'Comment reply does not exist'}, status=status.HTTP_404_NOT_FOUND)
@@ -126,23 +127,20 @@ class CommentReplyDetailsView(generics.RetrieveUpdateDestroyAPIView):
             return Response({'error': 'Comment reply does not exist'}, status=status.HTTP_404_NOT_FOUND)
     
 
-class GetAllCommentRepliesView(generics.ListAPIView):
+class GetAllCommentRepliesView(FastListMixin, StreamingListMixin, generics.ListAPIView):
     '''View to get all comment replies'''
     
-    serializer_class = serializers.CommentDetailsSerializer
+    serializer_class = serializers.CommentReplyDetailsSerializer
     
     def get_queryset(self):
         comment = Comment.objects.get(id=self.kwargs['comment_id'])
-        replies = CommentReply.objects.filter(comment=comment)
+        replies = self.serializer_class.setup_eager_loading(CommentReply.objects.filter(comment=comment), Fieldset.from_request(self.request))
         return replies
     
     def list(self, request, *args, **kwargs):
-        comment = Comment.objects.get(id=self.kwargs['comment_id'])
-        replies = CommentReply.objects.filter(comment=comment)
+        replies = self.get_page_data(self.get_queryset())
         
-        serializer = self.serializer_class(replies, many=True)
-        
-        if replies.exists():
-            return Response(serializer.data, status=status.HTTP_200_OK)
+        if replies:
+            return self.get_paginated_response(replies)
         else:
             return Response({'error': 'There are no replies for this comment'}, status=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
@@ -1,6 +1,7 @@
 from django.contrib import admin
 
-from notification.models import Notification
+from notification.models import ArchivedNotification, Notification
 
 # Register your models here.
-admin.site.register(Notification)
\ No newline at end of file
+admin.site.register(Notification)
+admin.site.register(ArchivedNotification)
\ No newline at end of file
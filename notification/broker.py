@@ -0,0 +1,220 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils.module_loading import import_string
+
+from notification import ordering
+from notification.models import Notification
+
+logger = logging.getLogger(__name__)
+
+
+def format_event(notification):
+    '''Function to get the server-sent event for a notification'''
+
+    data = json.dumps({
+        'id': str(notification.id),
+        'message': notification.message,
+        'sender': str(notification.sender_id) if notification.sender_id else None,
+        'date_sent': notification.date_sent.isoformat(),
+        'is_read': notification.is_read,
+        'kind': notification.kind,
+        'target': notification.target,
+        'count': notification.count,
+    })
+
+    return f'id: {notification.id}\nevent: notification\ndata: {data}\n\n'
+
+
+def _wake(future):
+    if not future.done():
+        future.set_result(None)
+
+
+class Subscription:
+    '''
+    Events waiting to be sent on one notification stream.\n
+    Events are put from any thread and taken by the stream in its event loop. A stream that falls more than
+    `NOTIFICATION_STREAM_BUFFER` events behind is marked as overflowed and should be closed, so the client reconnects
+    and picks up the notifications it missed with `Last-Event-ID`.
+    '''
+
+    def __init__(self, user_id, size):
+        self.user_id = user_id
+        self.size = size
+        self.overflowed = False
+        self._events = deque()
+        self._lock = threading.Lock()
+        self._waiter = None
+
+    def put(self, id, event):
+        with self._lock:
+            if len(self._events) >= self.size:
+                self.overflowed = True
+            else:
+                self._events.append((id, event))
+
+            waiter, self._waiter = self._waiter, None
+
+        if waiter is not None:
+            loop, future = waiter
+            loop.call_soon_threadsafe(_wake, future)
+
+    async def get(self, timeout):
+        '''Function to wait up to `timeout` seconds for the next event and get its id and text, or None if there is none'''
+
+        loop = asyncio.get_running_loop()
+
+        with self._lock:
+            if self._events:
+                return self._events.popleft()
+
+            future = loop.create_future()
+            self._waiter = (loop, future)
+
+        try:
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            pass
+
+        with self._lock:
+            if self._waiter is not None and self._waiter[1] is future:
+                self._waiter = None
+
+            return self._events.popleft() if self._events else None
+
+
+class LocalBroker:
+    '''
+    In-process publish/subscribe of new notifications to the streams of their receivers.\n
+    Streams only get the notifications written by the process serving them, which is enough for a single worker.
+    Use PollingBroker when the API runs in several processes.
+    '''
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = {}
+
+    def subscribe(self, user_id):
+        subscription = Subscription(user_id, settings.NOTIFICATION_STREAM_BUFFER)
+
+        with self._lock:
+            self._subscriptions.setdefault(user_id, set()).add(subscription)
+
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id)
+
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.user_id]
+
+    def publish(self, notifications):
+        '''Function to send notifications written by this process once they are committed'''
+
+        self.deliver(notifications)
+
+    def deliver(self, notifications):
+        '''Function to put notifications on the streams of their receivers served by this process'''
+
+        with self._lock:
+            targets = [
+                (notification, list(self._subscriptions.get(notification.receiver_id, ())))
+                for notification in notifications
+            ]
+
+        for notification, subscriptions in targets:
+            if subscriptions:
+                # formatted once however many streams the receiver has open
+                event = format_event(notification)
+                for subscription in subscriptions:
+                    subscription.put(notification.id, event)
+
+
+class PollingBroker(LocalBroker):
+    '''
+    Broker for an API running in several processes.\n
+    Each process serving streams reads the notifications written by every process with one query every
+    `NOTIFICATION_POLL_INTERVAL` seconds and delivers them to its own streams. Every read goes back
+    `NOTIFICATION_POLL_OVERLAP` seconds by date sent, so rows committed a little after they were queued are not missed.
+    Dates rather than ids are compared, as older notifications do not have time-ordered ids.
+    '''
+
+    def __init__(self):
+        super().__init__()
+        self._thread = None
+        self._seen = {}
+
+    def subscribe(self, user_id):
+        self.start()
+        return super().subscribe(user_id)
+
+    def publish(self, notifications):
+        # every process picks the notifications up from the database instead
+        pass
+
+    def start(self):
+        '''Function to start polling in a background thread if it is not running yet'''
+
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='notification-broker', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(settings.NOTIFICATION_POLL_INTERVAL)
+
+            try:
+                self.poll()
+            except Exception:
+                logger.exception('Polling for new notifications failed')
+            finally:
+                close_old_connections()
+
+    def poll(self):
+        '''Function to deliver the notifications written since the last poll'''
+
+        now = time.time()
+        since = now - settings.NOTIFICATION_POLL_OVERLAP
+
+        # forget the notifications that are now older than the overlap
+        self._seen = {id: seen_at for id, seen_at in self._seen.items() if seen_at >= since}
+
+        notifications = [
+            notification
+            for notification in Notification.objects.filter(date_sent__gte=datetime.fromtimestamp(since, timezone.utc)).order_by(*ordering.ORDER)
+            if notification.id not in self._seen
+        ]
+
+        for notification in notifications:
+            self._seen[notification.id] = now
+
+        self.deliver(notifications)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    '''Function to get the broker set in `NOTIFICATION_BROKER`, creating it on first use'''
+
+    global _broker
+
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = import_string(settings.NOTIFICATION_BROKER)()
+
+    return _broker
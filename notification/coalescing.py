@@ -0,0 +1,91 @@
+from datetime import timedelta
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from notification.models import Notification
+from notification.ordering import ORDER
+
+
+def get_target(instance):
+    '''Function to get the key notifications about a model instance are merged by'''
+
+    return f'{instance._meta.label_lower}:{instance.pk}'
+
+
+def get_events(notification):
+    '''Function to get what each of the notifications merged into a notification said, oldest first'''
+
+    if notification.events is not None:
+        return notification.events
+
+    return [{
+        'message': notification.message,
+        'sender': str(notification.sender_id) if notification.sender_id else None,
+        'date_sent': notification.date_sent.isoformat(),
+    }]
+
+
+def _merge(notifications):
+    # the newest notification stands for the others, with their number and what they said
+    latest = notifications[-1]
+
+    if len(notifications) > 1:
+        latest.count = sum(notification.count for notification in notifications)
+        latest.events = [event for notification in notifications for event in get_events(notification)]
+        latest.events = latest.events[-settings.NOTIFICATION_COALESCE_MAX_EVENTS:]
+
+    return latest
+
+
+def coalesce(notifications):
+    '''
+    Function to merge notifications that are about to be written and get the notifications to write with the unread
+    notifications they replace.\n
+    Notifications of a kind in `NOTIFICATION_COALESCE_WINDOWS` with the same receiver and target are merged with each
+    other and with the receiver's unread notifications about the same target sent within the window, so a burst of
+    changes leaves one notification with a count. The replaced notifications are read with one query, locked until
+    the transaction ends, and have to be deleted in the same transaction.
+    '''
+
+    windows = settings.NOTIFICATION_COALESCE_WINDOWS
+    written = []
+    groups = {}
+
+    for notification in notifications:
+        if notification.target is None or notification.kind not in windows:
+            written.append(notification)
+        else:
+            groups.setdefault((notification.receiver_id, notification.kind, notification.target), []).append(notification)
+
+    if not groups:
+        return notifications, []
+
+    now = timezone.now()
+    kinds = {kind for _, kind, _ in groups}
+
+    # the window is a range of the (receiver, date_sent, id) index of unread notifications
+    recent = Notification.objects.select_for_update().filter(
+        reduce(or_, (Q(kind=kind, date_sent__gte=now - timedelta(seconds=windows[kind])) for kind in kinds)),
+        receiver_id__in={receiver_id for receiver_id, _, _ in groups},
+        target__in={target for _, _, target in groups},
+        is_read=False,
+    ).order_by(*ORDER)
+
+    replaced = []
+    earlier = {}
+
+    for notification in recent:
+        key = (notification.receiver_id, notification.kind, notification.target)
+
+        if key in groups:
+            earlier.setdefault(key, []).append(notification)
+            replaced.append(notification)
+
+    for key, group in groups.items():
+        written.append(_merge(earlier.get(key, []) + group))
+
+    return written, replaced
@@ -0,0 +1,73 @@
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from notification.models import Notification
+
+User = get_user_model()
+
+
+def _by_count(received):
+    by_count = {}
+    for receiver_id, count in received.items():
+        by_count.setdefault(count, []).append(receiver_id)
+
+    return by_count.items()
+
+
+def add_unread(notifications, replaced=()):
+    '''
+    Function to count newly written notifications as unread for their receivers, in place of the unread notifications
+    they `replaced`.\n
+    Receivers getting the same number of notifications are updated with one statement, so a broadcast to a whole
+    workspace costs a single UPDATE. Call it in the same transaction as the insert.
+    '''
+
+    received = Counter(notification.receiver_id for notification in notifications if not notification.is_read)
+    received.subtract(notification.receiver_id for notification in replaced)
+
+    for count, receiver_ids in _by_count(received):
+        if count:
+            User.objects.filter(id__in=receiver_ids).update(unread_notifications=F('unread_notifications') + count)
+
+
+def remove_unread(user_id, count):
+    '''Function to take notifications that were read or deleted off a user's unread counter'''
+
+    if count:
+        User.objects.filter(id=user_id).update(unread_notifications=Greatest(F('unread_notifications') - count, Value(0)))
+
+
+def remove_unread_many(received):
+    '''
+    Function to take notifications that were deleted in bulk off the unread counters of their receivers.\n
+    `received` maps receiver ids to their number of unread notifications deleted, and receivers with the same number
+    are updated with one statement.
+    '''
+
+    for count, receiver_ids in _by_count(received):
+        User.objects.filter(id__in=receiver_ids).update(
+            unread_notifications=Greatest(F('unread_notifications') - count, Value(0))
+        )
+
+
+def get_unread_count(user_id):
+    '''Function to get the number of unread notifications of a user from their counter'''
+
+    return User.objects.filter(id=user_id).values_list('unread_notifications', flat=True).first() or 0
+
+
+def reconcile_unread_counts():
+    '''Function to recompute every user's unread counter from their notifications and get the number of users fixed'''
+
+    unread_count = Coalesce(
+        Subquery(
+            Notification.objects.filter(receiver=OuterRef('pk'), is_read=False).order_by().values('receiver')
+            .annotate(count=Count('id')).values('count')
+        ),
+        Value(0),
+    )
+
+    return User.objects.exclude(unread_notifications=unread_count).update(unread_notifications=unread_count)
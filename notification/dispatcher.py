@@ -0,0 +1,103 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+
+from django.db import transaction
+from django.db.models import Model
+from django.utils import timezone
+
+from notification.broker import get_broker
+from notification.coalescing import coalesce, get_target
+from notification.counters import add_unread
+from notification.models import Notification
+from workspace.models import Member, Workspace
+
+# Notifications waiting to be written at the end of the current request, or None outside of `collect`
+_pending = ContextVar('pending_notifications', default=None)
+
+
+@contextmanager
+def collect():
+    '''
+    Context manager to write the notifications queued inside it with a single bulk_create when it exits.\n
+    NotificationMiddleware wraps every request in it.
+    '''
+
+    token = _pending.set([])
+
+    try:
+        yield
+    finally:
+        notifications = _pending.get()
+        _pending.reset(token)
+
+        if notifications:
+            _write(notifications)
+
+
+def _write(notifications):
+    with transaction.atomic():
+        notifications, replaced = coalesce(notifications)
+
+        if replaced:
+            Notification.objects.filter(id__in=[notification.id for notification in replaced]).delete()
+
+        Notification.objects.bulk_create(notifications)
+        add_unread(notifications, replaced=replaced)
+
+        # push the notifications to open streams once they are visible to other connections
+        transaction.on_commit(partial(get_broker().publish, notifications))
+
+
+def _add(notifications):
+    pending = _pending.get()
+
+    if pending is None:
+        _write(notifications)
+    else:
+        pending.extend(notifications)
+
+
+def notify(receivers, message, sender=None, kind=Notification.MESSAGE, target=None):
+    '''
+    Function to queue a notification of a kind to each of the receivers (users or user ids) and get the queued
+    notifications.\n
+    The notifications are queued when the current transaction commits, so none are sent for changes that are rolled
+    back, and written together with the other notifications of the request. Notifications about the same `target`
+    (a model instance) may be merged into one before they are written, see notification/coalescing.py.
+    '''
+
+    if isinstance(receivers, Model) or not hasattr(receivers, '__iter__'):
+        receivers = [receivers]
+
+    now = timezone.now()
+    target = get_target(target) if target is not None else None
+    notifications = [
+        Notification(message=message, sender=sender, date_sent=now, kind=kind, target=target, **(
+            {'receiver': receiver} if isinstance(receiver, Model) else {'receiver_id': receiver}
+        ))
+        for receiver in receivers
+    ]
+
+    if notifications:
+        transaction.on_commit(partial(_add, notifications))
+
+    return notifications
+
+
+def notify_members(target, message, sender=None, kind=Notification.BROADCAST):
+    '''
+    Function to queue a notification to every member of a workspace, project, team or task but the sender.\n
+    The members are read with one query whatever their number, and the notifications are written with the other
+    notifications of the request.
+    '''
+
+    if isinstance(target, Workspace):
+        members = Member.objects.filter(workspace=target)
+    else:
+        members = target.members.all()
+
+    if sender is not None:
+        members = members.exclude(user=sender)
+
+    return notify(members.values_list('user_id', flat=True), message, sender=sender, kind=kind, target=target)
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from notification import retention
+from notification.models import Notification
+
+
+class Command(BaseCommand):
+    help = 'Archive and delete the notifications that are past the retention of their kind (NOTIFICATION_RETENTION)'
+
+    def add_arguments(self, parser):
+        kinds = ', '.join(kind for kind, _ in Notification.kinds)
+
+        parser.add_argument('kinds', nargs='*', help=f'Kinds of notifications to prune: {kinds} (default: all)')
+        parser.add_argument('--archive-file', help='Append pruned notifications to this file as newline-delimited JSON instead of the archive table')
+        parser.add_argument('--no-archive', action='store_true', help='Delete pruned notifications without archiving them')
+        parser.add_argument('--batch-size', type=int, help='Notifications archived and deleted per transaction (default: NOTIFICATION_PRUNE_BATCH_SIZE)')
+
+    def handle(self, *args, **options):
+        kinds = [kind for kind, _ in Notification.kinds]
+
+        for kind in options['kinds']:
+            if kind not in kinds:
+                raise CommandError(f'Unknown notification kind {kind}')
+
+        if options['archive_file'] and options['no_archive']:
+            raise CommandError('--archive-file and --no-archive cannot be used together')
+
+        archive_file = open(options['archive_file'], 'a') if options['archive_file'] else None
+
+        if archive_file is not None:
+            archive = retention.FileArchive(archive_file)
+        elif options['no_archive']:
+            archive = None
+        else:
+            archive = retention.archive_to_table
+
+        try:
+            for kind in options['kinds'] or kinds:
+                if retention.get_retention(kind) is None:
+                    self.stdout.write(f'Kept all {kind} notifications')
+                    continue
+
+                pruned = retention.prune(kind, archive=archive, batch_size=options['batch_size'])
+
+                self.stdout.write(self.style.SUCCESS(f'Pruned {pruned} {kind} notifications'))
+        finally:
+            if archive_file is not None:
+                archive_file.close()
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from notification.counters import reconcile_unread_counts
+
+
+class Command(BaseCommand):
+    help = 'Recompute the unread notification counter of every user from their notifications'
+
+    def handle(self, *args, **options):
+        fixed = reconcile_unread_counts()
+
+        self.stdout.write(self.style.SUCCESS(f'Fixed the unread notification counter of {fixed} users'))
@@ -0,0 +1,12 @@
+from notification import dispatcher
+
+
+class NotificationMiddleware:
+    '''Middleware to write all the notifications queued while handling a request with a single bulk_create'''
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with dispatcher.collect():
+            return self.get_response(request)
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.1 on 2026-10-17 01:09
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notification', '0004_alter_notification_receiver_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='notification',
+            name='date_sent',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
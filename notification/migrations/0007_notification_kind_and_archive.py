@@ -0,0 +1,62 @@
+# Generated by Django 5.0.1 on 2026-10-17 01:23
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Exists, OuterRef, Q
+
+
+def backfill_kind(apps, schema_editor):
+    '''
+    Mark the notifications sent for workspace membership changes and the workspace broadcasts, the rest are messages.
+    A broadcast was written as one notification per member, all with the same sender, message and date sent, while
+    messages are sent to one user at a time.
+    '''
+
+    Notification = apps.get_model('notification', 'Notification')
+
+    Notification.objects.filter(
+        Q(message__startswith='You have been added to workspace ')
+        | Q(message__startswith='You have been removed from workspace ')
+        | Q(message__startswith='Youur role has been updated in ')
+    ).update(kind='membership')
+
+    copies = Notification.objects.filter(
+        sender_id=OuterRef('sender_id'),
+        message=OuterRef('message'),
+        date_sent=OuterRef('date_sent'),
+    ).exclude(id=OuterRef('id'))
+
+    Notification.objects.filter(Exists(copies), kind='message').update(kind='broadcast')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notification', '0006_notification_is_read_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedNotification',
+            fields=[
+                ('id', models.UUIDField(primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('message', 'Message'), ('broadcast', 'Broadcast'), ('membership', 'Membership')], max_length=10)),
+                ('message', models.CharField(max_length=300)),
+                ('sender_id', models.UUIDField(null=True)),
+                ('receiver_id', models.UUIDField(null=True)),
+                ('date_sent', models.DateTimeField()),
+                ('is_read', models.BooleanField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='kind',
+            field=models.CharField(choices=[('message', 'Message'), ('broadcast', 'Broadcast'), ('membership', 'Membership')], default='message', max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['kind', 'date_sent'], name='notification_expiry_idx'),
+        ),
+        migrations.RunPython(backfill_kind, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.0.1 on 2026-10-17 01:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notification', '0007_notification_kind_and_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivednotification',
+            name='count',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='archivednotification',
+            name='events',
+            field=models.JSONField(null=True),
+        ),
+        migrations.AddField(
+            model_name='archivednotification',
+            name='target',
+            field=models.CharField(max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='count',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='events',
+            field=models.JSONField(null=True),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='target',
+            field=models.CharField(max_length=64, null=True),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.1 on 2026-10-17 02:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notification', '0008_notification_coalescing'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['date_sent'], name='notification_sent_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.0.1 on 2026-10-17 02:56
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notification', '0009_notification_sent_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='notification',
+            name='notification_receiver_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='notification',
+            name='notification_received_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='notification',
+            name='notification_unread_idx',
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['receiver', 'date_sent', 'id'], name='notification_receiver_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('is_read', False)), fields=['receiver', 'date_sent', 'id'], name='notification_unread_idx'),
+        ),
+    ]
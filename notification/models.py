@@ -1,6 +1,7 @@
 from django.db import models
-from uuid import uuid4
+from project_management_api.ids import uuid7
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 from datetime import datetime as dt
 
 User = get_user_model()
@@ -9,12 +10,64 @@ User = get_user_model()
 class Notification(models.Model):
     '''Notification model'''
     
-    id = models.UUIDField(default=uuid4, primary_key=True)
+    # Kinds, each kept for its own retention period (NOTIFICATION_RETENTION)
+    MESSAGE = 'message'
+    BROADCAST = 'broadcast'
+    MEMBERSHIP = 'membership'
+    
+    kinds = [
+        (MESSAGE, 'Message'),
+        (BROADCAST, 'Broadcast'),
+        (MEMBERSHIP, 'Membership'),
+    ]
+    
+    id = models.UUIDField(default=uuid7, primary_key=True)
     message = models.CharField(null=False, max_length=300)
     sender = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='sender')
-    receiver = models.ForeignKey(User, on_delete=models.CASCADE, null=True, related_name='receiver')
-    date_sent = models.DateTimeField(auto_now_add=True)
+    receiver = models.ForeignKey(User, on_delete=models.CASCADE, null=True, related_name='receiver', db_index=False)
+    # set when the notification is queued rather than when the queue is written
+    date_sent = models.DateTimeField(default=timezone.now)
+    is_read = models.BooleanField(default=False)
+    kind = models.CharField(choices=kinds, default=MESSAGE, max_length=10)
+    # what the notification is about, e.g. `workspace.workspace:<id>`, see notification/coalescing.py
+    target = models.CharField(max_length=64, null=True)
+    # number of notifications merged into this one, and what they said when there is more than one
+    count = models.PositiveIntegerField(default=1)
+    events = models.JSONField(null=True)
     
     def __str__(self):
         return f'Notification from {self.sender.email} to {self.receiver.email}'
-    
\ No newline at end of file
+    
+    class Meta:
+        indexes = [
+            # notifications are listed in the order they were sent, by date sent and id (see notification/ordering.py),
+            # as notifications written before ids were time-ordered keep random ids
+            models.Index(fields=['receiver', 'date_sent', 'id'], name='notification_receiver_idx'),
+            models.Index(fields=['receiver', 'date_sent', 'id'], condition=models.Q(is_read=False), name='notification_unread_idx'),
+            # expired notifications are pruned oldest first, one kind at a time
+            models.Index(fields=['kind', 'date_sent'], name='notification_expiry_idx'),
+            # PollingBroker reads the notifications sent by anyone in the last few seconds
+            models.Index(fields=['date_sent'], name='notification_sent_idx'),
+        ]
+
+
+class ArchivedNotification(models.Model):
+    '''
+    Notification moved out of the notification table by `python manage.py prune_notifications`.\n
+    Archived rows are only written and read back in bulk, so the table has no indexes but its primary key, and the
+    sender and receiver are kept as plain ids that outlive the users.
+    '''
+    
+    id = models.UUIDField(primary_key=True)
+    kind = models.CharField(choices=Notification.kinds, max_length=10)
+    message = models.CharField(max_length=300)
+    sender_id = models.UUIDField(null=True)
+    receiver_id = models.UUIDField(null=True)
+    date_sent = models.DateTimeField()
+    is_read = models.BooleanField()
+    target = models.CharField(max_length=64, null=True)
+    count = models.PositiveIntegerField(default=1)
+    events = models.JSONField(null=True)
+    
+    def __str__(self):
+        return f'Archived notification {self.id}'
@@ -0,0 +1,45 @@
+from datetime import datetime, timezone
+
+from django.db.models import Q
+
+from notification.models import Notification
+from project_management_api.ids import uuid7_timestamp
+
+# Notifications written before ids were time-ordered keep random uuid4 ids, so notifications are put in the order they
+# were sent by date sent, with the id to break ties, rather than by id alone
+ORDER = ['date_sent', 'id']
+
+
+def get_position(id):
+    '''
+    Function to get the position of the notification with an id in the order notifications were sent, as its date sent
+    and id, or None if it is unknown.\n
+    An id that is not a notification, like the one a new notification stream starts from, is placed at the time in it
+    when it is time-ordered.
+    '''
+
+    date_sent = Notification.objects.filter(id=id).values_list('date_sent', flat=True).first()
+
+    if date_sent is None:
+        timestamp = uuid7_timestamp(id)
+
+        if timestamp is None:
+            return None
+
+        date_sent = datetime.fromtimestamp(timestamp, timezone.utc)
+
+    return date_sent, id
+
+
+def sent_after(position):
+    '''Function to get the filter of the notifications sent after a position'''
+
+    date_sent, id = position
+    return Q(date_sent__gt=date_sent) | Q(date_sent=date_sent, id__gt=id)
+
+
+def sent_up_to(position):
+    '''Function to get the filter of the notifications sent up to and including a position'''
+
+    date_sent, id = position
+    return Q(date_sent__lt=date_sent) | Q(date_sent=date_sent, id__lte=id)
@@ -0,0 +1,12 @@
+from notification.ordering import ORDER
+from project_management_api.pagination import KeysetPagination
+
+
+class InboxPagination(KeysetPagination):
+    '''
+    Keyset pagination of the inbox in the order notifications were sent, see notification/ordering.py.\n
+    Pages are read from the `(receiver, date_sent, id)` index, with the notifications sent at the date of the cursor
+    skipped by offset.
+    '''
+    
+    ordering = ORDER
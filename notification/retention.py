@@ -0,0 +1,117 @@
+import json
+import os
+from collections import Counter
+from datetime import timedelta
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from notification.counters import remove_unread_many
+from notification.models import ArchivedNotification, Notification
+
+# Columns of a notification kept when it is archived
+FIELDS = ['id', 'kind', 'message', 'sender_id', 'receiver_id', 'date_sent', 'is_read', 'target', 'count', 'events']
+
+
+def get_retention(kind):
+    '''Function to get how long notifications of a kind are kept, or None if they are kept forever'''
+
+    days = settings.NOTIFICATION_RETENTION.get(kind)
+
+    return None if days is None else timedelta(days=days)
+
+
+def live(notifications, now=None):
+    '''
+    Function to leave the notifications past the retention of their kind out of a queryset of notifications.\n
+    The longest retention bounds reads of the (receiver, date_sent) index to the live window however much history is
+    waiting to be pruned, and the kind of each row in the window is then checked against its own retention. Dates
+    rather than ids are bounded, as older notifications do not have time-ordered ids.
+    '''
+
+    now = now or timezone.now()
+    retentions = {kind: get_retention(kind) for kind, _ in Notification.kinds}
+
+    expired = [
+        Q(kind=kind, date_sent__lt=now - retention)
+        for kind, retention in retentions.items() if retention is not None
+    ]
+
+    if not expired:
+        return notifications
+
+    if None not in retentions.values():
+        notifications = notifications.filter(date_sent__gte=now - max(retentions.values()))
+
+    return notifications.exclude(reduce(or_, expired))
+
+
+def archive_to_table(ids):
+    '''
+    Function to copy a batch of pruned notifications to the archive table.\n
+    The rows are copied with one INSERT ... SELECT, so they never leave the database.
+    '''
+
+    select, params = Notification.objects.filter(id__in=ids).values(*FIELDS).query.sql_with_params()
+    columns = ', '.join(connection.ops.quote_name(ArchivedNotification._meta.get_field(name).column) for name in FIELDS)
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'INSERT INTO {connection.ops.quote_name(ArchivedNotification._meta.db_table)} ({columns}) {select}', params)
+
+
+class FileArchive:
+    '''
+    Archive appending pruned notifications to a file as newline-delimited JSON, one notification per line.\n
+    Every batch is synced to disk before its notifications are deleted, so a batch whose delete fails is written again
+    by the next run rather than lost.
+    '''
+
+    def __init__(self, file):
+        self.file = file
+
+    def __call__(self, ids):
+        rows = Notification.objects.filter(id__in=ids).order_by('date_sent').values(*FIELDS)
+        self.file.write(''.join(json.dumps(row, cls=DjangoJSONEncoder) + '\n' for row in rows))
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+
+def prune(kind, archive=archive_to_table, batch_size=None, now=None):
+    '''
+    Function to archive and delete the notifications of a kind past its retention and get how many were pruned.\n
+    Notifications are pruned oldest first in batches of `NOTIFICATION_PRUNE_BATCH_SIZE`, each archived and deleted in
+    its own transaction, so locks are only held briefly and an interrupted run keeps what it pruned. `archive` is
+    called with the ids of every batch before it is deleted, or is None to delete without archiving. Unread
+    notifications are taken off the unread counters of their receivers.
+    '''
+
+    retention = get_retention(kind)
+
+    if retention is None:
+        return 0
+
+    batch_size = batch_size or settings.NOTIFICATION_PRUNE_BATCH_SIZE
+    expired = Notification.objects.filter(kind=kind, date_sent__lt=(now or timezone.now()) - retention).order_by('date_sent')
+    pruned = 0
+
+    while True:
+        with transaction.atomic():
+            rows = list(expired.values_list('id', 'receiver_id', 'is_read')[:batch_size])
+
+            if not rows:
+                return pruned
+
+            ids = [id for id, _, _ in rows]
+
+            if archive is not None:
+                archive(ids)
+
+            Notification.objects.filter(id__in=ids).delete()
+            remove_unread_many(Counter(receiver_id for _, receiver_id, is_read in rows if not is_read))
+
+        pruned += len(rows)
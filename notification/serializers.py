@@ -1,27 +1,38 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
 
+from notification import dispatcher
 from notification.models import Notification
+from project_management_api.serializers import EagerLoadingMixin, SparseFieldsetMixin
 from user.serializers import UserDetailsSerializer
 
 User = get_user_model()
 
-class NotificationSerializer(serializers.ModelSerializer):
+class NotificationSerializer(SparseFieldsetMixin, EagerLoadingMixin, serializers.ModelSerializer):
     '''Serializer for notifications'''
     
+    select_related_fields = ['sender', 'receiver']
+    
     sender = UserDetailsSerializer(read_only=True)
     receiver = UserDetailsSerializer(read_only=True)
     
     class Meta:
         model = Notification
-        fields = '__all__'
-        read_only_fields = ['id', 'sender', 'receiver']
+        # what merged notifications said is only read on request, see NotificationEventsView
+        exclude = ['events']
+        read_only_fields = ['id', 'sender', 'receiver', 'date_sent', 'is_read', 'kind', 'target', 'count']
         
     def create(self, validated_data):
-        notification = Notification.objects.create(
-            message = validated_data.get('message'),
-            sender = self.context['request'].user,
-            receiver = User.objects.get(id=self.context['view'].kwargs['user_id'])
+        [notification] = dispatcher.notify(
+            User.objects.get(id=self.context['view'].kwargs['user_id']),
+            validated_data.get('message'),
+            sender=self.context['request'].user,
         )
         
-        return notification
\ No newline at end of file
+        return notification
+
+
+class MarkNotificationsReadSerializer(serializers.Serializer):
+    '''Serializer to mark notifications as read, up to and including the notification with the id in `up_to`'''
+    
+    up_to = serializers.UUIDField(required=False)
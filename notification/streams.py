@@ -0,0 +1,91 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from notification import ordering
+from notification.broker import format_event, get_broker
+from notification.models import Notification
+from project_management_api.ids import uuid7
+
+
+def get_missed(user_id, last_event_id):
+    '''
+    Function to get the notifications a user was sent after the one with the id in `last_event_id`, in the order they
+    were sent, see notification/ordering.py. Nothing is missed after an id whose position is unknown.
+    '''
+
+    position = ordering.get_position(last_event_id)
+
+    if position is None:
+        return []
+
+    return list(
+        Notification.objects.filter(ordering.sent_after(position), receiver_id=user_id)
+        .order_by(*ordering.ORDER)[:settings.NOTIFICATION_STREAM_REPLAY_LIMIT]
+    )
+
+
+async def stream_notifications(user_id, last_event_id=None):
+    '''
+    Async generator of the server-sent events of a user's notification stream.\n
+    The stream starts with the notifications missed since `last_event_id`, then sends new notifications as the broker
+    delivers them, with a comment every `NOTIFICATION_STREAM_HEARTBEAT` seconds to keep idle connections open.
+    Without `last_event_id` it starts from now and sends an id-only event so the client's EventSource can resume
+    from there after reconnecting.
+    '''
+
+    broker = get_broker()
+    # subscribe before reading the missed notifications so none are lost in between
+    subscription = broker.subscribe(user_id)
+
+    try:
+        yield f'retry: {settings.NOTIFICATION_STREAM_RETRY}\n\n'
+
+        if last_event_id is None:
+            last_event_id = uuid7()
+            yield f'id: {last_event_id}\n\n'
+
+        missed = await sync_to_async(get_missed)(user_id, last_event_id)
+
+        for notification in missed:
+            yield format_event(notification)
+
+        # more to catch up on, end the stream so the client reconnects from the last one sent
+        if len(missed) == settings.NOTIFICATION_STREAM_REPLAY_LIMIT:
+            return
+
+        sent = {notification.id for notification in missed}
+
+        while not subscription.overflowed:
+            item = await subscription.get(settings.NOTIFICATION_STREAM_HEARTBEAT)
+
+            if item is None:
+                yield ': keep-alive\n\n'
+                continue
+
+            id, event = item
+            # skip notifications already sent from the database. Ones queued before the stream started are still sent,
+            # as they are only published once written at the end of the request that sent them
+            if id in sent:
+                continue
+
+            yield event
+
+    finally:
+        broker.unsubscribe(subscription)
+
+
+def replay_notifications(user_id, last_event_id=None):
+    '''
+    Generator of the server-sent events of a user's notification stream for servers without an event loop.\n
+    Only the notifications missed since `last_event_id` are sent before the stream ends, and the client's
+    EventSource polls by reconnecting after `NOTIFICATION_STREAM_RETRY` milliseconds.
+    '''
+
+    yield f'retry: {settings.NOTIFICATION_STREAM_RETRY}\n\n'
+
+    if last_event_id is None:
+        yield f'id: {uuid7()}\n\n'
+        return
+
+    for notification in get_missed(user_id, last_event_id):
+        yield format_event(notification)
@@ -1,3 +1,527 @@
-from django.test import TestCase
+import asyncio
+import json
+import os
+import tempfile
+from datetime import timedelta
+from importlib import import_module
+from io import StringIO
+from unittest import mock
+from uuid import UUID, uuid4
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.apps import apps
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from notification import counters, dispatcher
+from notification.broker import PollingBroker, get_broker
+from notification.models import ArchivedNotification, Notification
+from project_management_api.ids import uuid7_at
+from workspace.models import Member
+from workspace.tests import add_members, create_user, create_workspace
+
+
+class NotificationDispatcherTestCase(APITestCase):
+    '''Test case for queueing notifications and writing them in batches'''
+    
+    def setUp(self):
+        self.user = create_user('test@gmail.com')
+        self.workspace = create_workspace(self.user)
+        self.client.force_authenticate(user=self.user)
+        
+    def test_notifications_written_together(self):
+        receivers = [create_user(f'{i}@gmail.com') for i in range(5)]
+        
+        # one insert and one update of the unread counters, in a savepoint
+        with self.assertNumQueries(4):
+            with dispatcher.collect(), self.captureOnCommitCallbacks(execute=True):
+                dispatcher.notify(receivers[:2], 'first', sender=self.user)
+                dispatcher.notify([receiver.id for receiver in receivers[2:]], 'second', sender=self.user)
+        
+        self.assertEqual(Notification.objects.filter(sender=self.user).count(), 5)
+        
+    def test_rolled_back_notifications_dropped(self):
+        receiver = create_user('receiver@gmail.com')
+        
+        with dispatcher.collect(), self.captureOnCommitCallbacks(execute=True):
+            dispatcher.notify(receiver, 'kept', sender=self.user)
+            
+            try:
+                with transaction.atomic():
+                    dispatcher.notify(receiver, 'dropped', sender=self.user)
+                    raise ValueError
+            except ValueError:
+                pass
+        
+        self.assertEqual(list(Notification.objects.filter(receiver=receiver).values_list('message', flat=True)), ['kept'])
+        
+    def test_broadcast_to_workspace(self):
+        members = add_members(self.workspace, 30)
+        url = reverse('notification:broadcast-notification', kwargs={'workspace_id': self.workspace.id})
+        
+        # the workspace, the membership resolver, the members' ids, and one insert for all the notifications
+        # with one update of the unread counters, in a savepoint
+        with self.assertNumQueries(7), self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, {'message': 'announcement'})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        
+        self.assertEqual(
+            set(Notification.objects.filter(message='announcement').values_list('receiver_id', flat=True)),
+            {member.user_id for member in members},
+        )
+        
+    def test_broadcast_needs_editor(self):
+        viewer = add_members(self.workspace, 1)[0]
+        self.client.force_authenticate(user=viewer.user)
+        
+        response = self.client.post(reverse('notification:broadcast-notification', kwargs={'workspace_id': self.workspace.id}), {'message': 'announcement'})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(Notification.objects.exists())
+
+
+class UnreadNotificationsTestCase(APITestCase):
+    '''Test case for the read state of notifications and the unread counter'''
+    
+    def setUp(self):
+        self.sender = create_user('sender@gmail.com')
+        self.user = create_user('test@gmail.com')
+        self.client.force_authenticate(user=self.user)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.notifications = [dispatcher.notify(self.user, f'message {i}', sender=self.sender)[0] for i in range(5)]
+            
+    def get_unread_count(self):
+        return self.client.get(reverse('notification:unread-notification-count')).data['unread']
+        
+    def test_unread_count(self):
+        # a single read of the user's counter
+        with self.assertNumQueries(1):
+            self.assertEqual(self.get_unread_count(), 5)
+        
+    def test_mark_read_up_to(self):
+        response = self.client.post(reverse('notification:mark-notifications-read'), {'up_to': self.notifications[2].id})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        self.assertEqual(self.get_unread_count(), 2)
+        self.assertEqual(
+            list(Notification.objects.filter(receiver=self.user, is_read=False).order_by('id')),
+            self.notifications[3:],
+        )
+        
+        response = self.client.get(reverse('notification:get-notifications'), {'unread': 'true'})
+        self.assertEqual([notification['id'] for notification in response.data['results']], [str(n.id) for n in self.notifications[3:]])
+        
+        # marking the same notifications again changes nothing
+        self.client.post(reverse('notification:mark-notifications-read'), {'up_to': self.notifications[2].id})
+        self.assertEqual(self.get_unread_count(), 2)
+        
+    def test_mark_read_up_to_legacy_ids(self):
+        # notifications written before ids were time-ordered keep random ids
+        sent = timezone.now() - timedelta(days=1)
+        legacy = [
+            Notification.objects.create(id=uuid4(), message=f'legacy {i}', sender=self.sender, receiver=self.user, date_sent=sent + timedelta(minutes=i))
+            for i in range(20)
+        ]
+        counters.add_unread(legacy)
+        
+        response = self.client.post(reverse('notification:mark-notifications-read'), {'up_to': legacy[9].id})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(Notification.objects.filter(is_read=True)), set(legacy[:10]))
+        
+        self.client.post(reverse('notification:mark-notifications-read'), {'up_to': self.notifications[-1].id})
+        self.assertEqual(self.get_unread_count(), 0)
+        self.assertFalse(Notification.objects.filter(is_read=False).exists())
+        
+    def test_mark_read_up_to_unknown(self):
+        response = self.client.post(reverse('notification:mark-notifications-read'), {'up_to': uuid4()})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.get_unread_count(), 5)
+        
+    def test_mark_all_read(self):
+        self.client.post(reverse('notification:mark-notifications-read'))
+        self.assertEqual(self.get_unread_count(), 0)
+        
+    def test_delete_unread_notification(self):
+        self.client.post(reverse('notification:mark-notifications-read'), {'up_to': self.notifications[0].id})
+        
+        for notification in self.notifications[:2]:
+            response = self.client.delete(reverse('notification:delete-notification', kwargs={'notification_id': notification.id}))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        self.assertEqual(self.get_unread_count(), 3)
+        
+    def test_reconcile_unread_counts(self):
+        Notification.objects.filter(id=self.notifications[0].id).update(is_read=True)
+        
+        out = StringIO()
+        call_command('reconcile_unread_counts', stdout=out)
+        
+        self.assertIn('Fixed the unread notification counter of 1 users', out.getvalue())
+        self.assertEqual(self.get_unread_count(), 4)
+
+
+
+class NotificationStreamTestCase(APITestCase):
+    '''Test case for streaming notifications as server-sent events'''
+    
+    def setUp(self):
+        self.sender = create_user('sender@gmail.com')
+        self.user = create_user('test@gmail.com')
+        self.url = reverse('notification:notification-stream')
+        self.headers = {'Authorization': f'Bearer {RefreshToken.for_user(self.user).access_token}'}
+        
+    def send(self, message):
+        with self.captureOnCommitCallbacks(execute=True):
+            return dispatcher.notify(self.user, message, sender=self.sender)[0]
+        
+    def send_legacy(self, count):
+        # notifications written before ids were time-ordered keep random ids
+        sent = timezone.now() - timedelta(days=1)
+        return [
+            Notification.objects.create(id=uuid4(), message=f'legacy {i}', sender=self.sender, receiver=self.user, date_sent=sent + timedelta(minutes=i))
+            for i in range(count)
+        ]
+        
+    async def read(self, events, count):
+        chunks = [await asyncio.wait_for(anext(events), 5) for _ in range(count)]
+        return ''.join(chunk.decode() for chunk in chunks)
+        
+    async def disconnect(self, events):
+        # a client disconnecting cancels the stream while it waits for the next event
+        reader = asyncio.ensure_future(anext(events))
+        await asyncio.sleep(0.1)
+        reader.cancel()
+        
+        with self.assertRaises(asyncio.CancelledError):
+            await reader
+        
+    async def test_new_notifications_pushed(self):
+        response = await self.async_client.get(self.url, headers=self.headers)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        events = aiter(response.streaming_content)
+        
+        # the retry interval and the id the stream starts from
+        self.assertIn('retry: ', await self.read(events, 2))
+        
+        notification = await sync_to_async(self.send)('hello')
+        event = await self.read(events, 1)
+        
+        self.assertTrue(event.startswith(f'id: {notification.id}\nevent: notification\n'))
+        self.assertIn('"message": "hello"', event)
+        
+        await self.disconnect(events)
+        self.assertEqual(get_broker()._subscriptions, {})
+        
+    async def test_resume_from_last_event_id(self):
+        notifications = [await sync_to_async(self.send)(f'message {i}') for i in range(3)]
+        
+        response = await self.async_client.get(self.url, headers={**self.headers, 'Last-Event-ID': str(notifications[0].id)})
+        events = aiter(response.streaming_content)
+        
+        missed = await self.read(events, 3)
+        self.assertNotIn('message 0', missed)
+        self.assertIn(f'id: {notifications[1].id}', missed)
+        self.assertIn(f'id: {notifications[2].id}', missed)
+        
+        await self.disconnect(events)
+        
+    async def test_legacy_ids(self):
+        legacy = await sync_to_async(self.send_legacy)(20)
+        
+        # a new stream starts from now whatever the ids of older notifications
+        response = await self.async_client.get(self.url, headers=self.headers)
+        events = aiter(response.streaming_content)
+        last_event_id = (await self.read(events, 2)).split('id: ')[1].split('\n')[0]
+        
+        notification = await sync_to_async(self.send)('hello')
+        self.assertIn('"message": "hello"', await self.read(events, 1))
+        await self.disconnect(events)
+        
+        # resuming from the id the stream started from or from an older notification with a random id
+        response = await self.async_client.get(self.url, headers={**self.headers, 'Last-Event-ID': last_event_id})
+        events = aiter(response.streaming_content)
+        self.assertIn(f'id: {notification.id}', await self.read(events, 2))
+        await self.disconnect(events)
+        
+        response = await self.async_client.get(self.url, headers={**self.headers, 'Last-Event-ID': str(legacy[17].id)})
+        events = aiter(response.streaming_content)
+        missed = await self.read(events, 4)
+        self.assertEqual(
+            [line[4:] for line in missed.splitlines() if line.startswith('id: ')],
+            [str(legacy[18].id), str(legacy[19].id), str(notification.id)],
+        )
+        await self.disconnect(events)
+        
+    async def test_queued_before_stream_started(self):
+        def queue():
+            with self.captureOnCommitCallbacks() as callbacks:
+                dispatcher.notify(self.user, 'queued', sender=self.sender)
+            return callbacks
+        
+        def write(callbacks):
+            with self.captureOnCommitCallbacks(execute=True):
+                for callback in callbacks:
+                    callback()
+        
+        # the notification is queued before the stream starts and written after, at the end of the request sending it
+        callbacks = await sync_to_async(queue)()
+        
+        response = await self.async_client.get(self.url, headers=self.headers)
+        events = aiter(response.streaming_content)
+        await self.read(events, 2)
+        
+        await sync_to_async(write)(callbacks)
+        self.assertIn('"message": "queued"', await self.read(events, 1))
+        await self.disconnect(events)
+        
+    def test_wsgi_stream_replays_and_ends(self):
+        notifications = [self.send(f'message {i}') for i in range(3)]
+        self.client.force_authenticate(user=self.user)
+        
+        response = self.client.get(self.url, HTTP_LAST_EVENT_ID=str(notifications[0].id))
+        events = b''.join(response.streaming_content).decode()
+        
+        self.assertEqual(events.count('event: notification'), 2)
+        self.assertIn('message 2', events)
+        
+    def test_polling_broker(self):
+        broker = PollingBroker()
+        
+        with mock.patch.object(PollingBroker, 'start'):
+            subscription = broker.subscribe(self.user.id)
+        
+        # older notifications are not read again, whatever their ids
+        self.send_legacy(20)
+        
+        # notifications written by any process are read from the database once
+        notification = self.send('hello')
+        broker.poll()
+        broker.poll()
+        
+        self.assertEqual(len(subscription._events), 1)
+        self.assertEqual(subscription._events[0][0], notification.id)
+
+
+class NotificationRetentionTestCase(APITestCase):
+    '''Test case for the retention of notifications and pruning them to the archive'''
+    
+    def setUp(self):
+        self.sender = create_user('sender@gmail.com')
+        self.user = create_user('test@gmail.com')
+        self.client.force_authenticate(user=self.user)
+        
+        self.message = self.send('old message', Notification.MESSAGE, days=40)
+        self.expired_message = self.send('expired message', Notification.MESSAGE, days=100)
+        self.expired_broadcast = self.send('expired broadcast', Notification.BROADCAST, days=40)
+        self.broadcast = self.send('broadcast', Notification.BROADCAST, days=1)
+        
+    def send(self, message, kind, days):
+        date_sent = timezone.now() - timedelta(days=days)
+        notification = Notification.objects.create(
+            id=uuid7_at(date_sent.timestamp()),
+            message=message,
+            sender=self.sender,
+            receiver=self.user,
+            date_sent=date_sent,
+            kind=kind,
+        )
+        counters.add_unread([notification])
+        return notification
+    
+    def test_inbox_leaves_out_expired(self):
+        response = self.client.get(reverse('notification:get-notifications'))
+        self.assertEqual([notification['message'] for notification in response.data['results']], ['old message', 'broadcast'])
+        
+    def test_inbox_keeps_legacy_ids(self):
+        # an older notification with a random id sorting below every time-ordered one
+        Notification.objects.create(
+            id=UUID(int=uuid4().int & ~(0xFF << 120)),
+            message='legacy message',
+            sender=self.sender,
+            receiver=self.user,
+            date_sent=timezone.now() - timedelta(days=2),
+        )
+        
+        # listed in the order they were sent, a page at a time and streamed
+        messages = []
+        url = reverse('notification:get-notifications') + '?page_size=1'
+        
+        while url:
+            response = self.client.get(url)
+            messages += [notification['message'] for notification in response.data['results']]
+            url = response.data['next']
+        self.assertEqual(messages, ['old message', 'legacy message', 'broadcast'])
+        
+        response = self.client.get(reverse('notification:get-notifications'), {'stream': 'true'})
+        self.assertEqual([notification['message'] for notification in json.loads(b''.join(response.streaming_content))], messages)
+        
+    def test_backfill_kind(self):
+        backfill_kind = import_module('notification.migrations.0007_notification_kind_and_archive').backfill_kind
+        date_sent = timezone.now() - timedelta(days=10)
+        receivers = [self.user, create_user('other@gmail.com')]
+        broadcast = Notification.objects.bulk_create(
+            Notification(message='meeting at 3', sender=self.sender, receiver=receiver, date_sent=date_sent) for receiver in receivers
+        )
+        message = Notification.objects.create(message='meeting at 3', sender=self.sender, receiver=self.user)
+        membership = Notification.objects.create(message='You have been added to workspace workspace', sender=self.sender, receiver=self.user)
+        
+        backfill_kind(apps, None)
+        
+        self.assertEqual(set(Notification.objects.filter(kind=Notification.BROADCAST, date_sent=date_sent)), set(broadcast))
+        self.assertEqual(Notification.objects.get(id=message.id).kind, Notification.MESSAGE)
+        self.assertEqual(Notification.objects.get(id=membership.id).kind, Notification.MEMBERSHIP)
+        self.assertEqual(Notification.objects.get(id=self.message.id).kind, Notification.MESSAGE)
+        
+    def test_prune_to_archive_table(self):
+        out = StringIO()
+        call_command('prune_notifications', '--batch-size', '1', stdout=out)
+        
+        self.assertIn('Pruned 1 message notifications', out.getvalue())
+        self.assertIn('Pruned 1 broadcast notifications', out.getvalue())
+        self.assertEqual(set(Notification.objects.all()), {self.message, self.broadcast})
+        self.assertEqual(
+            set(ArchivedNotification.objects.values_list('id', 'receiver_id', 'kind')),
+            {
+                (self.expired_message.id, self.user.id, Notification.MESSAGE),
+                (self.expired_broadcast.id, self.user.id, Notification.BROADCAST),
+            },
+        )
+        
+        # the pruned notifications were unread
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.unread_notifications, 2)
+        
+    def test_prune_to_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'notifications.ndjson')
+            call_command('prune_notifications', 'broadcast', '--archive-file', path, stdout=StringIO())
+            
+            with open(path) as file:
+                archived = [json.loads(line) for line in file]
+        
+        self.assertEqual([notification['id'] for notification in archived], [str(self.expired_broadcast.id)])
+        self.assertEqual(archived[0]['message'], 'expired broadcast')
+        self.assertFalse(ArchivedNotification.objects.exists())
+        self.assertTrue(Notification.objects.filter(id=self.expired_message.id).exists())
+        
+    def test_kept_forever(self):
+        out = StringIO()
+        
+        with self.settings(NOTIFICATION_RETENTION={'message': None, 'broadcast': 30}):
+            call_command('prune_notifications', 'message', stdout=out)
+            response = self.client.get(reverse('notification:get-notifications'))
+        
+        self.assertIn('Kept all message notifications', out.getvalue())
+        self.assertEqual(len(response.data['results']), 3)
+
+
+class NotificationCoalescingTestCase(APITestCase):
+    '''Test case for merging bursts of notifications about the same thing'''
+    
+    def setUp(self):
+        self.owner = create_user('owner@gmail.com')
+        self.workspace = create_workspace(self.owner)
+        self.user = create_user('test@gmail.com')
+        
+    def notify(self, message, kind=Notification.MEMBERSHIP, target=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            dispatcher.notify(self.user, message, sender=self.owner, kind=kind, target=target or self.workspace)
+        
+    def get_notifications(self):
+        return list(Notification.objects.filter(receiver=self.user).order_by('id'))
+    
+    def test_member_removed_and_added_again(self):
+        self.client.force_authenticate(user=self.owner)
+        add_url = reverse('workspace:add-member', kwargs={'workspace_id': self.workspace.id, 'user_id': self.user.id})
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(add_url, {'role': 'viewer'})
+        member = Member.objects.get(user=self.user)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('workspace:remove-member', kwargs={'workspace_id': self.workspace.id, 'member_id': member.id}))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(add_url, {'role': 'viewer'})
+        
+        [notification] = self.get_notifications()
+        self.assertEqual(notification.count, 3)
+        self.assertEqual(notification.message, 'You have been added to workspace workspace')
+        
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.unread_notifications, 1)
+        
+    def test_burst_written_as_one(self):
+        with dispatcher.collect(), self.captureOnCommitCallbacks(execute=True):
+            for role in ['editor', 'viewer', 'editor']:
+                dispatcher.notify(self.user, f'You are now a/an {role}.', sender=self.owner, kind=Notification.MEMBERSHIP, target=self.workspace)
+                
+        [notification] = self.get_notifications()
+        self.assertEqual(notification.count, 3)
+        self.assertEqual([event['message'] for event in notification.events], ['You are now a/an editor.', 'You are now a/an viewer.', 'You are now a/an editor.'])
+        
+    def test_expanded_on_read(self):
+        self.notify('first')
+        self.notify('second')
+        [notification] = self.get_notifications()
+        self.client.force_authenticate(user=self.user)
+        
+        response = self.client.get(reverse('notification:get-notifications'))
+        self.assertEqual(response.data['results'][0]['count'], 2)
+        self.assertNotIn('events', response.data['results'][0])
+        
+        response = self.client.get(reverse('notification:notification-events', kwargs={'notification_id': notification.id}))
+        self.assertEqual(response.data['count'], 2)
+        self.assertEqual([event['message'] for event in response.data['events']], ['first', 'second'])
+        
+    def test_not_merged(self):
+        self.notify('read')
+        Notification.objects.filter(receiver=self.user).update(is_read=True)
+        
+        date_sent = timezone.now() - timedelta(hours=1)
+        Notification.objects.create(
+            id=uuid7_at(date_sent.timestamp()),
+            message='outside the window',
+            receiver=self.user,
+            date_sent=date_sent,
+            kind=Notification.MEMBERSHIP,
+            target=self.get_notifications()[0].target,
+        )
+        
+        self.notify('other workspace', target=create_workspace(self.owner, name='other'))
+        self.notify('message', kind=Notification.MESSAGE)
+        self.notify('message', kind=Notification.MESSAGE)
+        self.notify('new')
+        
+        self.assertEqual([notification.count for notification in self.get_notifications()], [1] * 6)
+
+
+class NotificationFieldsetTestCase(APITestCase):
+    '''Test case for listing only the notification fields asked for'''
+    
+    def setUp(self):
+        self.user = create_user('test@gmail.com')
+        self.sender = create_user('sender@gmail.com')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('notification:get-notifications')
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            dispatcher.notify(self.user, 'hello', sender=self.sender)
+            
+    def test_fields(self):
+        response = self.client.get(self.url, {'fields': 'message,sender.first_name'})
+        self.assertEqual(response.json()['results'], [{'message': 'hello', 'sender': {'first_name': 'test'}}])
+        
+    def test_expand(self):
+        # the sender and receiver are not joined in when they are rendered as ids
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {'fields': 'message,sender,receiver', 'expand': ''})
+        
+        self.assertEqual(response.json()['results'], [{'message': 'hello', 'sender': str(self.sender.id), 'receiver': str(self.user.id)}])
+        self.assertFalse(any('JOIN' in query['sql'] for query in queries if 'notification_notification' in query['sql']))
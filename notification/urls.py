@@ -4,6 +4,11 @@ from . import views
 app_name = 'notification'
 urlpatterns = [
     path('send/<uuid:user_id>/', views.SendNotificatioView.as_view(), name='send-notification'),
+    path('send/workspace/<uuid:workspace_id>/', views.BroadcastNotificationView.as_view(), name='broadcast-notification'),
     path('all/', views.GetAllNotificationsView.as_view(), name='get-notifications'),
+    path('read/', views.MarkNotificationsReadView.as_view(), name='mark-notifications-read'),
+    path('stream/', views.NotificationStreamView.as_view(), name='notification-stream'),
+    path('unread-count/', views.UnreadNotificationCountView.as_view(), name='unread-notification-count'),
+    path('<uuid:notification_id>/events/', views.NotificationEventsView.as_view(), name='notification-events'),
     path('<uuid:notification_id>/delete/', views.DeleteNotificationView.as_view(), name='delete-notification'),
 ]
\ No newline at end of file
@@ -1,11 +1,25 @@
+from uuid import UUID
+
 from django.contrib.auth import get_user_model
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.http import StreamingHttpResponse
 
 from rest_framework import generics
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
 
+from notification import counters, dispatcher, ordering
+from notification.coalescing import get_events
 from notification.models import Notification
+from notification.pagination import InboxPagination
+from notification.retention import live
+from notification.streams import replay_notifications, stream_notifications
+from project_management_api.serializers import Fieldset
+from project_management_api.views import StreamingListMixin
+from workspace.models import Workspace
+from workspace.permissions import IsWorkspaceOwnerOrEditorOrReadOnly
 from .permissions import IsNotificationOwner
 
 from . import serializers
@@ -25,26 +39,139 @@ class SendNotificatioView(generics.CreateAPIView):
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     
 
-class GetAllNotificationsView(generics.ListAPIView):
+class BroadcastNotificationView(generics.GenericAPIView):
+    '''View to send a notification to every member of a workspace'''
+    
+    serializer_class = serializers.NotificationSerializer
+    permission_classes = [IsAuthenticated, IsWorkspaceOwnerOrEditorOrReadOnly]
+    
+    def post(self, request, workspace_id):
+        try:
+            workspace = Workspace.objects.get(id=workspace_id)
+        except Workspace.DoesNotExist:
+            return Response({'error': 'Workspace does not exist'}, status=status.HTTP_404_NOT_FOUND)
+        
+        self.check_object_permissions(request, obj=workspace)
+        
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        notifications = dispatcher.notify_members(workspace, serializer.validated_data['message'], sender=request.user)
+        return Response({'message': f'Notification sent to {len(notifications)} members'}, status=status.HTTP_201_CREATED)
+    
+
+class GetAllNotificationsView(StreamingListMixin, generics.ListAPIView):
     '''View to get all notifications for the current logged in user'''
     
     serializer_class = serializers.NotificationSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = InboxPagination
     
     def get_queryset(self):
-        notifications = Notification.objects.filter(receiver=self.request.user)
+        # only the notifications inside the retention of their kind, the rest are waiting to be pruned
+        notifications = self.serializer_class.setup_eager_loading(
+            live(Notification.objects.filter(receiver=self.request.user)).defer('events'),
+            Fieldset.from_request(self.request),
+        )
+        
+        # `?unread=true` leaves out notifications that were read
+        if self.request.query_params.get('unread') == 'true':
+            notifications = notifications.filter(is_read=False)
+            
         return notifications
     
     def list(self, request, *args, **kwargs):
-        notifications = Notification.objects.filter(receiver=self.request.user)
-        serializer = self.serializer_class(notifications, many=True)
+        notifications = self.paginate_queryset(self.get_queryset())
         
-        if notifications.exists():
-            return Response(serializer.data, status=status.HTTP_200_OK)
+        if notifications:
+            serializer = self.serializer_class(notifications, many=True, context={'fieldset': Fieldset.from_request(request)})
+            return self.get_paginated_response(serializer.data)
         else:
             return Response({'error': 'You do not have any notifications at the moment'}, status=status.HTTP_204_NO_CONTENT)
 
 
+class MarkNotificationsReadView(generics.GenericAPIView):
+    '''View to mark the current logged in user's notifications as read, up to a notification when one is given'''
+    
+    serializer_class = serializers.MarkNotificationsReadSerializer
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        notifications = Notification.objects.filter(receiver=request.user, is_read=False)
+        
+        # the notifications sent up to the given one, by date sent as older notifications do not have time-ordered ids
+        if 'up_to' in serializer.validated_data:
+            position = ordering.get_position(serializer.validated_data['up_to'])
+            
+            if position is None:
+                return Response({'error': 'Notification does not exist'}, status=status.HTTP_404_NOT_FOUND)
+            
+            notifications = notifications.filter(ordering.sent_up_to(position))
+            
+        with transaction.atomic():
+            read = notifications.update(is_read=True)
+            counters.remove_unread(request.user.id, read)
+            
+        return Response({'message': f'{read} notifications marked as read'}, status=status.HTTP_200_OK)
+    
+    
+class UnreadNotificationCountView(generics.GenericAPIView):
+    '''View to get the number of unread notifications of the current logged in user'''
+    
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        return Response({'unread': counters.get_unread_count(request.user.id)}, status=status.HTTP_200_OK)
+    
+
+class NotificationStreamView(generics.GenericAPIView):
+    '''
+    View to stream the current logged in user's new notifications as server-sent events.\n
+    Served through ASGI (project_management_api/asgi.py) the stream stays open and notifications are pushed as they
+    are sent. Under WSGI an open stream would hold a worker, so only the notifications missed since `Last-Event-ID`
+    are sent and the client's EventSource polls by reconnecting.
+    '''
+    
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        # EventSource sends the id of the last event it got when it reconnects
+        try:
+            last_event_id = UUID(request.headers.get('Last-Event-ID') or request.query_params.get('last_event_id'))
+        except (TypeError, ValueError):
+            last_event_id = None
+            
+        if isinstance(request._request, ASGIRequest):
+            events = stream_notifications(request.user.id, last_event_id)
+        else:
+            events = replay_notifications(request.user.id, last_event_id)
+            
+        response = StreamingHttpResponse(events, content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        # stop proxies like nginx from holding events back
+        response['X-Accel-Buffering'] = 'no'
+        return response
+    
+
+class NotificationEventsView(generics.GenericAPIView):
+    '''View to expand a notification into what each of the notifications merged into it said'''
+    
+    permission_classes = [IsAuthenticated, IsNotificationOwner]
+    
+    def get(self, request, notification_id):
+        try:
+            notification = Notification.objects.get(id=notification_id)
+        except Notification.DoesNotExist:
+            return Response({'error': 'This notification does not exist'}, status=status.HTTP_404_NOT_FOUND)
+        
+        self.check_object_permissions(request, notification)
+        
+        return Response({'count': notification.count, 'events': get_events(notification)}, status=status.HTTP_200_OK)
+    
+
 class DeleteNotificationView(generics.DestroyAPIView):
     '''View to delete a notification'''
     
@@ -56,6 +183,16 @@ class DeleteNotificationView(generics.DestroyAPIView):
         self.check_object_permissions(self.request, notification)
         return notification
     
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            # only take the notification off the unread counter if it is still unread when it is deleted
+            unread, _ = Notification.objects.filter(id=instance.id, is_read=False).delete()
+            
+            if unread:
+                counters.remove_unread(instance.receiver_id, unread)
+            else:
+                instance.delete()
+    
     def delete(self, request, *args, **kwargs):
         try:
             super().delete(request, *args, **kwargs)
@@ -0,0 +1,24 @@
+# Generated by Django 5.0.1 on 2026-10-17 00:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0034_alter_project_id'),
+        ('workspace', '0016_alter_member_options_alter_member_user_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='project',
+            name='workspace',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, to='workspace.workspace'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['workspace', 'id'], name='project_workspace_idx'),
+        ),
+    ]
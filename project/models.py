@@ -1,6 +1,8 @@
 from datetime import datetime as dt
-from django.db import models
-from uuid import uuid4
+from django.apps import apps
+from django.db import models, transaction
+from django.utils import timezone
+from project_management_api.ids import uuid7
 from user.models import CustomUser
 
 from workspace.models import Member, Workspace
@@ -8,17 +10,50 @@ from workspace.models import Member, Workspace
 class Project(models.Model):
     '''Project model'''
 
-    id = models.UUIDField(default=uuid4, primary_key=True)
+    id = models.UUIDField(default=uuid7, primary_key=True)
     name = models.CharField(null=False, max_length=40, unique=True)
     description = models.CharField(null=False, max_length=255)
     label_color = models.CharField(max_length=25, null=False, default='0xFFFFFFFF')
     is_complete = models.BooleanField(default=False)
     start_date = models.DateTimeField(null=False, default=dt.now())
     end_date = models.DateTimeField(null=True)
-    workspace = models.ForeignKey(Workspace, on_delete=models.CASCADE, null=True)
+    workspace = models.ForeignKey(Workspace, on_delete=models.CASCADE, null=True, db_index=False)
     members = models.ManyToManyField(Member, related_name='projects', blank=True)
     created_by = models.ForeignKey(Member, null=True, on_delete=models.CASCADE)
+    # also bumped when members are added or removed in bulk, see project_management_api/views.py BulkMembersView
+    updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
         return f'{self.id} | {self.name} | {self.workspace.name}'
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        project = super().from_db(db, field_names, values)
+        project._loaded_workspace_id = project.workspace_id
+        return project
+    
+    def save(self, *args, **kwargs):
+        moved = not self._state.adding and self.workspace_id != getattr(self, '_loaded_workspace_id', self.workspace_id)
+        
+        if not moved:
+            super().save(*args, **kwargs)
+            self._loaded_workspace_id = self.workspace_id
+            return
+        
+        # tasks, teams and comments keep a copy of their project's workspace, move them along with the project in the
+        # same transaction so the copies never disagree with it
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            
+            for model in ['task.Task', 'team.Team', 'comment.Comment']:
+                apps.get_model(model).objects.filter(project=self).update(workspace_id=self.workspace_id, updated_at=timezone.now())
+                
+            apps.get_model('comment.CommentReply').objects.filter(comment__project=self).update(workspace_id=self.workspace_id)
+            
+        self._loaded_workspace_id = self.workspace_id
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['workspace', 'id'], name='project_workspace_idx'),
+        ]
     
\ No newline at end of file
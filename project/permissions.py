@@ -1,6 +1,6 @@
 from rest_framework.permissions import BasePermission, SAFE_METHODS
 
-from workspace.models import Member
+from workspace.membership import get_membership_resolver
 
 class IsProjectWorkspaceOwnerOrReadOnly(BasePermission):
     '''Permission to check against unaithorized members'''
@@ -11,14 +11,8 @@ class IsProjectWorkspaceOwnerOrReadOnly(BasePermission):
         if request.method in SAFE_METHODS:
             return True
         else:
-            # get member based on current logged in user and workspace object
-            member = Member.objects.filter(user=request.user, workspace=obj.workspace)
-            
-            # check if member exists in workspace
-            if not member.exists():
-                return False
-            
-            return (obj.workspace.creator == request.user) or member.first().role == 'editor'   
+            # check member based on current logged in user and workspace object
+            return get_membership_resolver(request).is_owner_or_editor(obj.workspace_id)
         
 class IsProjectMemberOrReadOnly(BasePermission):     
     '''Permission to check if a user is a member of a project'''
@@ -30,6 +24,6 @@ class IsProjectMemberOrReadOnly(BasePermission):
             return True
         else:
             # get member based on current logged in user
-            member = Member.objects.get(user=request.user)
+            member = get_membership_resolver(request).get(obj.workspace_id)
             # check if member is in project members
-            return obj.members.contains(member)
\ No newline at end of file
+            return member is not None and obj.members.contains(member)
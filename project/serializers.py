@@ -1,13 +1,24 @@
 from django.contrib.auth import get_user_model
+from django.db import transaction
 from rest_framework import serializers
 
 from datetime import datetime
 from project.models import Project
-from workspace.models import Member, Workspace
+from project_management_api import quotas
+from project_management_api.serializers import EagerLoadingMixin, SparseFieldsetMixin
+from workspace.membership import get_membership_resolver
 from workspace.serializers import MemberSerializer
 
 User = get_user_model()
 
+# Messages for workspaces that have as many projects as their plan allows
+PROJECT_LIMIT_MESSAGES = {
+    'basic': 'This workspace is allowed only 3 projects. Upgrade to have access to more projects.',
+    'premium': 'This workspace is allowed only 7 projects. Upgrade to have access to more projects.',
+    'enterprise': 'This workspace is allowed 15 projects.',
+}
+
+
 class ProjectSerializer(serializers.ModelSerializer):
     '''Serializer to create a new project'''
     
@@ -32,60 +43,53 @@ class ProjectSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError({'error': 'Start date cannot be greater than end date'})
         
         workspace_id = self.context['view'].kwargs['workspace_id']
-        workspace = Workspace.objects.get(id=workspace_id)
-        
-        # filter member object so that members from outside the workspace cannot be added
-        member = Member.objects.filter(user=self.context['request'].user, workspace=workspace)
         
-        # --------------------------------------------------
-        # WORKSPACE SUBSCRIPTION PLAN RESTRICTION CHECKS
-        # --------------------------------------------------
+        # get member object so that members from outside the workspace cannot be added
+        member = get_membership_resolver(self.context['request']).get(workspace_id)
         
-        if workspace.plan == 'basic':
-            if Project.objects.filter(workspace=workspace).count() == 3:
-                raise serializers.ValidationError({'error': 'This workspace is allowed only 3 projects. Upgrade to have access to more projects.'})
-            
-        if workspace.plan == 'premium':
-            if Project.objects.filter(workspace=workspace).count() == 7:
-                raise serializers.ValidationError({'error': 'This workspace is allowed only 7 projects. Upgrade to have access to more projects.'})
-            
-        if workspace.plan == 'enterprise':
-            if Project.objects.filter(workspace=workspace).count() == 15:
-                raise serializers.ValidationError({'error': 'This workspace is allowed 15 projects.'}) 
-       
         # check if user belongs in workspace
-        if not member.exists():
+        if member is None:
             raise serializers.ValidationError({'error': 'You do not exist in this workspace'})
         
         # check if member is an editor
-        if member.first().role != 'editor':
+        if member.role != 'editor':
             raise serializers.ValidationError({'error': 'You are not an editor in the workspace'})
         
+        # the workspace subscription plan restrictions are checked when the project is created
         return data
     
     def create(self, validated_data):
         workspace_id = self.context['view'].kwargs['workspace_id']
-        workspace = Workspace.objects.get(id=workspace_id)
         
-        # filter member object so that members from outside the workspace cannot be added
-        member = Member.objects.filter(user=self.context['request'].user, workspace=workspace)
+        # get member object so that members from outside the workspace cannot be added
+        member = get_membership_resolver(self.context['request']).get(workspace_id)
         
-        project = Project.objects.create(
-            **validated_data,
-            workspace=workspace,
-            created_by=member.first()
-        )
-        
-        # add member to members list in project
-        project.members.set(member)
-        project.save()
+        with transaction.atomic():
+            # WORKSPACE SUBSCRIPTION PLAN RESTRICTION CHECKS
+            try:
+                quotas.reserve('projects', member.workspace_id)
+            except quotas.QuotaExceeded as error:
+                raise serializers.ValidationError({'error': PROJECT_LIMIT_MESSAGES[error.plan]})
+            
+            project = Project.objects.create(
+                **validated_data,
+                workspace=member.workspace,
+                created_by=member
+            )
+            
+            # add member to members list in project
+            project.members.add(member)
         
         return project
     
     
-class ProjectDetailsSerializer(serializers.ModelSerializer):
+class ProjectDetailsSerializer(SparseFieldsetMixin, EagerLoadingMixin, serializers.ModelSerializer):
     '''Serializer to create a new project'''
     
+    select_related_fields = ['workspace']
+    prefetch_related_fields = {'members': MemberSerializer}
+    values_lookups = {'workspace': 'workspace__name'}
+    
     workspace = serializers.StringRelatedField(read_only=True)
     members = MemberSerializer(many=True, read_only=True)
     
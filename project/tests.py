@@ -1,3 +1,404 @@
-from django.test import TestCase
+import json
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.db import DatabaseError, connection
+from django.db.models import F, QuerySet
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from comment.models import Comment, CommentReply
+from project.models import Project
+from project_management_api.ids import uuid7
+from task.models import Task
+from team.models import Team
+from workspace.models import Member, Workspace
+from workspace.tests import add_members, create_user, create_workspace
+
+
+def create_project(workspace, name='project'):
+    '''Function to create a project with the workspace creator as a member'''
+    
+    member = Member.objects.get(user=workspace.creator, workspace=workspace)
+    project = Project.objects.create(
+        name=name,
+        description='project description',
+        start_date=timezone.now(),
+        end_date=timezone.now() + timedelta(days=30),
+        workspace=workspace,
+        created_by=member,
+    )
+    project.members.add(member)
+    Workspace.objects.filter(id=workspace.id).update(current_no_of_projects=F('current_no_of_projects') + 1)
+    
+    return project
+
+
+class ProjectQueryCountTestCase(APITestCase):
+    '''Test case to guard the number of queries run by project endpoints'''
+    
+    def setUp(self):
+        self.user = create_user('test@gmail.com')
+        self.workspace = create_workspace(self.user)
+        self.client.force_authenticate(user=self.user)
+        
+    def test_create_project(self):
+        data = {
+            'name': 'project',
+            'description': 'project description',
+            'start_date': (timezone.now() + timedelta(days=1)).isoformat(),
+            'end_date': (timezone.now() + timedelta(days=30)).isoformat(),
+        }
+        
+        # 15 queries before the membership resolver, plus the savepoint around reserving
+        # the project quota in one statement instead of counting the workspace's projects
+        with self.assertNumQueries(10):
+            response = self.client.post(reverse('project:create-project', kwargs={'workspace_id': self.workspace.id}), data)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        
+    def test_update_project(self):
+        project = create_project(self.workspace)
+        
+        # 8 queries before the membership resolver
+        with self.assertNumQueries(7):
+            response = self.client.patch(reverse('project:project-details', kwargs={'project_id': project.id}), {'description': 'new'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+    def test_list_projects(self):
+        url = reverse('project:workspace-projects', kwargs={'workspace_id': self.workspace.id})
+        create_project(self.workspace, name='first').members.add(*add_members(self.workspace, 2))
+        
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(len(response.data['results']), 1)
+        
+        for i in range(3):
+            create_project(self.workspace, name=f'project {i}').members.add(*add_members(self.workspace, 3))
+        
+        with self.assertNumQueries(len(queries)):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data['results']), 4)
+
+
+class ProjectWorkspaceTestCase(APITestCase):
+    '''Test case for the workspace copied onto tasks, teams and comments'''
+    
+    def setUp(self):
+        self.user = create_user('test@gmail.com')
+        self.workspace = create_workspace(self.user)
+        self.project = create_project(self.workspace)
+        self.member = Member.objects.get(user=self.user, workspace=self.workspace)
+        
+    def test_workspace_is_copied_on_create(self):
+        task = Task.objects.create(name='task', description='task description', project=self.project)
+        team = Team.objects.create(name='team', project=self.project)
+        comment = Comment.objects.create(comment='comment', project=self.project, commenter=self.member)
+        reply = CommentReply.objects.create(reply='reply', comment=comment, commenter=self.member)
+        
+        for obj in [task, team, comment, reply]:
+            self.assertEqual(obj.workspace_id, self.workspace.id)
+            
+    def test_workspace_follows_project_move(self):
+        Task.objects.create(name='task', description='task description', project=self.project)
+        Team.objects.create(name='team', project=self.project)
+        comment = Comment.objects.create(comment='comment', project=self.project, commenter=self.member)
+        CommentReply.objects.create(reply='reply', comment=comment, commenter=self.member)
+        other_workspace = create_workspace(self.user, name='other')
+        
+        project = Project.objects.get(id=self.project.id)
+        project.workspace = other_workspace
+        project.save()
+        
+        for model in [Task, Team, Comment, CommentReply]:
+            self.assertEqual(set(model.objects.values_list('workspace_id', flat=True)), {other_workspace.id})
+            
+    def test_failed_move_is_rolled_back(self):
+        Task.objects.create(name='task', description='task description', project=self.project)
+        comment = Comment.objects.create(comment='comment', project=self.project, commenter=self.member)
+        CommentReply.objects.create(reply='reply', comment=comment, commenter=self.member)
+        other_workspace = create_workspace(self.user, name='other')
+        update = QuerySet.update
+        
+        def fail_on_replies(queryset, **kwargs):
+            if queryset.model is CommentReply:
+                raise DatabaseError('connection lost')
+            return update(queryset, **kwargs)
+        
+        project = Project.objects.get(id=self.project.id)
+        project.workspace = other_workspace
+        
+        with mock.patch.object(QuerySet, 'update', fail_on_replies), self.assertRaises(DatabaseError):
+            project.save()
+            
+        # the project and the copies of its workspace stay where they were
+        self.assertEqual(Project.objects.get(id=self.project.id).workspace_id, self.workspace.id)
+        for model in [Task, Comment, CommentReply]:
+            self.assertEqual(set(model.objects.values_list('workspace_id', flat=True)), {self.workspace.id})
+
+
+class ProjectQuotaTestCase(APITestCase):
+    '''Test case for the workspace plan quota on the number of projects'''
+    
+    def setUp(self):
+        self.user = create_user('test@gmail.com')
+        self.workspace = create_workspace(self.user)
+        self.client.force_authenticate(user=self.user)
+        
+    def create_project(self, name):
+        return self.client.post(reverse('project:create-project', kwargs={'workspace_id': self.workspace.id}), {
+            'name': name,
+            'description': 'project description',
+            'start_date': (timezone.now() + timedelta(days=1)).isoformat(),
+            'end_date': (timezone.now() + timedelta(days=30)).isoformat(),
+        })
+        
+    def test_create_project_over_quota(self):
+        for i in range(3):
+            self.assertEqual(self.create_project(f'project {i}').status_code, status.HTTP_201_CREATED)
+        
+        response = self.create_project('project 3')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['error'], 'This workspace is allowed only 3 projects. Upgrade to have access to more projects.')
+        self.assertEqual(Project.objects.filter(workspace=self.workspace).count(), 3)
+        
+        # upgrading the plan raises the limit without touching the counter
+        self.workspace.plan = 'premium'
+        self.workspace.save()
+        self.assertEqual(self.create_project('project 3').status_code, status.HTTP_201_CREATED)
+        
+        self.workspace.refresh_from_db()
+        self.assertEqual(self.workspace.current_no_of_projects, 4)
+        
+    def test_delete_project_releases_quota(self):
+        project = create_project(self.workspace)
+        
+        response = self.client.delete(reverse('project:project-details', kwargs={'project_id': project.id}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        self.workspace.refresh_from_db()
+        self.assertEqual(self.workspace.current_no_of_projects, 0)
+
+
+class BulkProjectMembersTestCase(APITestCase):
+    '''Test case for adding and removing many project members at once'''
+    
+    def setUp(self):
+        self.user = create_user('test@gmail.com')
+        self.workspace = create_workspace(self.user)
+        self.project = create_project(self.workspace)
+        self.client.force_authenticate(user=self.user)
+        
+    def post(self, name, members):
+        return self.client.post(
+            reverse(f'project:{name}', kwargs={'project_id': self.project.id}),
+            {'member_ids': [str(member.id) for member in members]},
+            format='json'
+        )
+        
+    def test_add_members(self):
+        members = add_members(self.workspace, 5)
+        
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post('add-members-to-project', members[:2])
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        
+        # the same queries for any number of members
+        with self.assertNumQueries(len(queries)):
+            response = self.post('add-members-to-project', members[2:])
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.project.members.count(), 6)
+        
+    def test_add_members_already_in_project(self):
+        members = add_members(self.workspace, 2)
+        self.project.members.add(members[0])
+        
+        response = self.post('add-members-to-project', members)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['member_ids'], [str(members[0].id)])
+        self.assertFalse(self.project.members.contains(members[1]))
+        
+    def test_add_members_from_another_workspace(self):
+        other = create_workspace(create_user('other@gmail.com'), name='other')
+        
+        response = self.post('add-members-to-project', add_members(other, 1))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.project.members.count(), 1)
+        
+    def test_remove_members(self):
+        members = add_members(self.workspace, 3)
+        self.project.members.add(*members)
+        
+        response = self.post('remove-members-from-project', members[:2])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(self.project.members.exclude(user=self.user)), [members[2]])
+        
+        response = self.post('remove-members-from-project', members[:2])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ProjectFieldsetTestCase(APITestCase):
+    '''Test case for rendering only the fields and relations asked for with `?fields=` and `?expand=`'''
+    
+    def setUp(self):
+        self.user = create_user('test@gmail.com')
+        self.workspace = create_workspace(self.user)
+        self.client.force_authenticate(user=self.user)
+        self.project = create_project(self.workspace)
+        self.project.members.add(*add_members(self.workspace, 2))
+        self.url = reverse('project:project-details', kwargs={'project_id': self.project.id})
+        
+    def get(self, url, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        return response.json(), [query['sql'] for query in queries]
+    
+    def test_fields(self):
+        project, all_queries = self.get(self.url)
+        sparse, queries = self.get(self.url, {'fields': 'id,name,members.id,members.user.first_name'})
+        
+        self.assertEqual(set(sparse), {'id', 'name', 'members'})
+        self.assertEqual(sparse['members'], [{'id': member['id'], 'user': {'first_name': 'test'}} for member in project['members']])
+        # the workspace name is not joined in for the project or its members
+        self.assertEqual(len(queries), len(all_queries))
+        self.assertFalse(any('"workspace_workspace"."name"' in query for query in queries))
+        
+        # leaving out the members leaves out their prefetch
+        sparse, queries = self.get(self.url, {'fields': 'id,name'})
+        self.assertEqual(sparse, {'id': project['id'], 'name': project['name']})
+        self.assertEqual(len(queries), len(all_queries) - 1)
+        
+    def test_expand(self):
+        project, _ = self.get(self.url)
+        
+        collapsed, queries = self.get(self.url, {'expand': ''})
+        self.assertEqual(collapsed['members'], [member['id'] for member in project['members']])
+        self.assertFalse(any('"user_customuser"' in query for query in queries[-2:]))
+        
+        expanded, _ = self.get(self.url, {'expand': 'members'})
+        self.assertEqual(expanded['members'], [{**member, 'user': member['user']['id']} for member in project['members']])
+        
+        expanded, _ = self.get(self.url, {'expand': 'members.user'})
+        self.assertEqual(expanded, project)
+        
+    def test_list(self):
+        url = reverse('project:workspace-projects', kwargs={'workspace_id': self.workspace.id})
+        create_project(self.workspace, name='other').members.add(*add_members(self.workspace, 2))
+        projects, all_queries = self.get(url)
+        
+        sparse, queries = self.get(url, {'fields': 'id,members', 'expand': ''})
+        self.assertEqual(sparse['results'], [
+            {'id': project['id'], 'members': [member['id'] for member in project['members']]}
+            for project in projects['results']
+        ])
+        self.assertEqual(len(queries), len(all_queries))
+        
+        sparse, queries = self.get(url, {'fields': 'id'})
+        self.assertEqual(sparse['results'], [{'id': project['id']} for project in projects['results']])
+        self.assertEqual(len(queries), len(all_queries) - 1)
+        
+        streamed = self.client.get(url, {'fields': 'id', 'stream': 'true'})
+        self.assertEqual(json.loads(b''.join(streamed.streaming_content)), sparse['results'])
+        
+    def test_unknown_fields(self):
+        list_url = reverse('project:workspace-projects', kwargs={'workspace_id': self.workspace.id})
+        
+        for url, params, unknown in [
+            (self.url, {'fields': 'bogus'}, ['bogus']),
+            (self.url, {'fields': 'id,members.user.bogus,name.first'}, ['members.user.bogus', 'name.first']),
+            (list_url, {'fields': 'id,bogus'}, ['bogus']),
+            (list_url, {'fields': 'bogus', 'stream': 'true'}, ['bogus']),
+        ]:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertEqual(response.json(), {'error': 'These fields do not exist', 'fields': unknown})
+
+
+class ProjectConditionalGetTestCase(APITestCase):
+    '''Test case for answering GETs of unchanged projects with 304 Not Modified'''
+    
+    def setUp(self):
+        self.user = create_user('test@gmail.com')
+        self.workspace = create_workspace(self.user)
+        self.client.force_authenticate(user=self.user)
+        self.project = create_project(self.workspace)
+        self.members = add_members(self.workspace, 3)
+        self.project.members.add(*self.members[:2])
+        self.url = reverse('project:project-details', kwargs={'project_id': self.project.id})
+        self.list_url = reverse('project:workspace-projects', kwargs={'workspace_id': self.workspace.id})
+        
+    def get_etag(self, url, params=None):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        return response['ETag']
+    
+    def test_not_modified(self):
+        etag = self.get_etag(self.url)
+        
+        # only the version is read
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+        
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH='W/"stale"')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['ETag'], etag)
+        
+    def test_etag_changes(self):
+        etags = [self.get_etag(self.url)]
+        
+        self.client.patch(self.url, {'description': 'new'})
+        etags.append(self.get_etag(self.url))
+        
+        # members added and removed in bulk, then a member moved to another project
+        self.client.post(reverse('project:add-members-to-project', kwargs={'project_id': self.project.id}), {'member_ids': [str(self.members[2].id)]}, format='json')
+        etags.append(self.get_etag(self.url))
+        
+        self.client.post(reverse('project:remove-members-from-project', kwargs={'project_id': self.project.id}), {'member_ids': [str(self.members[0].id)]}, format='json')
+        etags.append(self.get_etag(self.url))
+        
+        self.members[1].delete()
+        etags.append(self.get_etag(self.url))
+        
+        # rows rendered with the project
+        self.members[2].user.first_name = 'new'
+        self.members[2].user.save()
+        etags.append(self.get_etag(self.url))
+        
+        Workspace.objects.filter(id=self.workspace.id).update(current_no_of_members=F('current_no_of_members') + 1)
+        etags.append(self.get_etag(self.url))
+        
+        # the same version rendered differently
+        etags.append(self.get_etag(self.url, {'fields': 'id,name'}))
+        
+        self.assertEqual(len(set(etags)), len(etags))
+        
+    def test_does_not_exist(self):
+        response = self.client.get(reverse('project:project-details', kwargs={'project_id': uuid7()}), HTTP_IF_NONE_MATCH='*')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertNotIn('ETag', response)
+        
+    def test_list(self):
+        etags = [self.get_etag(self.list_url)]
+        
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etags[0])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        
+        create_project(self.workspace, name='other')
+        etags.append(self.get_etag(self.list_url))
+        
+        self.members[0].delete()
+        etags.append(self.get_etag(self.list_url))
+        
+        Project.objects.filter(name='other').delete()
+        etags.append(self.get_etag(self.list_url))
+        
+        self.assertEqual(len(set(etags)), len(etags))
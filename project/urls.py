@@ -10,4 +10,6 @@ urlpatterns = [
     path('<uuid:project_id>/toggle-completion-status/', views.ToggleCompletionStatusView.as_view(), name='toggle-completion-status'),
     path('<uuid:project_id>/member/<uuid:member_id>/add/', views.AddMemberToProjectView.as_view(), name='add-member-to-project'),
     path('<uuid:project_id>/member/<uuid:member_id>/remove/', views.RemoveMemberFromProjectView.as_view(), name='remove-member-from-project'),
+    path('<uuid:project_id>/members/add/', views.BulkAddMembersToProjectView.as_view(), name='add-members-to-project'),
+    path('<uuid:project_id>/members/remove/', views.BulkRemoveMembersFromProjectView.as_view(), name='remove-members-from-project'),
 ]
\ No newline at end of file
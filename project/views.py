@@ -1,10 +1,14 @@
 from django.contrib.auth import get_user_model
+from django.db import transaction
 
 from rest_framework import generics, status, filters
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 
 from project.models import Project
+from project_management_api import quotas
+from project_management_api.serializers import Fieldset
+from project_management_api.views import BulkMembersView, ConditionalGetMixin, FastListMixin, StreamingListMixin
 from workspace.models import Member, Workspace
 from workspace.permissions import IsMemberOrReadOnly, IsWorkspaceOwnerOrEditorOrReadOnly
 
@@ -25,16 +29,18 @@ class CreateProjectView(generics.CreateAPIView):
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     
 
-class ProjectDetailsView(generics.RetrieveUpdateDestroyAPIView):
+class ProjectDetailsView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     '''View to get, update, and delete project'''
     
     serializer_class = serializers.ProjectDetailsSerializer
+    lookup_url_kwarg = 'project_id'
     permission_classes = [IsAuthenticated, IsWorkspaceOwnerOrEditorOrReadOnly]
     
-    def get(self, request, *args, **kwargs):
+    def retrieve(self, request, *args, **kwargs):
         try:
-            project = Project.objects.get(id=self.kwargs['project_id'])
-            serializer = self.serializer_class(project)
+            fieldset = Fieldset.from_request(request)
+            project = self.serializer_class.setup_eager_loading(Project.objects, fieldset).get(id=self.kwargs['project_id'])
+            serializer = self.serializer_class(project, context={'fieldset': fieldset})
             return Response(serializer.data, status=status.HTTP_200_OK)
         except Project.DoesNotExist:
             return Response({'error': 'Project does not exist'}, status=status.HTTP_404_NOT_FOUND)
@@ -50,6 +56,16 @@ class ProjectDetailsView(generics.RetrieveUpdateDestroyAPIView):
         except Project.DoesNotExist:
             return Response({'error': 'Project does not exist'}, status=status.HTTP_404_NOT_FOUND)  
     
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            _, deleted = instance.delete()
+            
+            # the project may have been deleted by a concurrent request since it was loaded
+            if not deleted.get(Project._meta.label):
+                raise Project.DoesNotExist
+            
+            quotas.release('projects', [instance.workspace_id])
+    
     def delete(self, request, *args, **kwargs):
         try:
             super().delete(request, *args, **kwargs)
@@ -65,7 +81,7 @@ class AddMemberToProjectView(generics.GenericAPIView):
     
     def post(self, request, project_id, member_id):
         project = Project.objects.get(id=self.kwargs['project_id'])
-        members = Member.objects.filter(id=self.kwargs['member_id'], workspace=project.workspace)
+        members = Member.objects.filter(id=self.kwargs['member_id'], workspace_id=project.workspace_id)
         self.check_object_permissions(request, obj=project)
         member = members.first()
         
@@ -97,7 +113,7 @@ class RemoveMemberFromProjectView(generics.GenericAPIView):
     
     def post(self, request, project_id, member_id):
         project = Project.objects.get(id=self.kwargs['project_id'])
-        members = Member.objects.filter(id=self.kwargs['member_id'], workspace=project.workspace)
+        members = Member.objects.filter(id=self.kwargs['member_id'], workspace_id=project.workspace_id)
         self.check_object_permissions(request, obj=project)
         
         member = members.first()
@@ -119,7 +135,22 @@ class RemoveMemberFromProjectView(generics.GenericAPIView):
             return Response({'error': 'Project does not exist'}, status=status.HTTP_404_NOT_FOUND)
             
         
-class GetProjectsInWorkspaceView(generics.ListAPIView):
+class BulkAddMembersToProjectView(BulkMembersView):
+    '''View to add many members to a project at once'''
+    
+    model = Project
+    lookup_url_kwarg = 'project_id'
+    
+    
+class BulkRemoveMembersFromProjectView(BulkMembersView):
+    '''View to remove many members from a project at once'''
+    
+    model = Project
+    lookup_url_kwarg = 'project_id'
+    remove = True
+    
+
+class GetProjectsInWorkspaceView(ConditionalGetMixin, FastListMixin, StreamingListMixin, generics.ListAPIView):
     '''View to get all projects in a workspace'''
     
     serializer_class = serializers.ProjectDetailsSerializer
@@ -129,7 +160,7 @@ class GetProjectsInWorkspaceView(generics.ListAPIView):
     
     def get_queryset(self):
         workspace = Workspace.objects.get(id=self.kwargs['workspace_id'])
-        projects = Project.objects.filter(workspace=workspace)
+        projects = self.serializer_class.setup_eager_loading(Project.objects.filter(workspace=workspace), Fieldset.from_request(self.request))
         
         return projects
     
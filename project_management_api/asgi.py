@@ -13,4 +13,10 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'project_management_api.settings')
 
+# Serve through ASGI (e.g. `gunicorn -k uvicorn.workers.UvicornWorker`) to keep notification streams open
 application = get_asgi_application()
+
+# Only start the token sweeper in server processes, not in management commands
+from user.sweeper import start_token_sweeper
+
+start_token_sweeper()
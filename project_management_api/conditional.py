@@ -0,0 +1,125 @@
+import hashlib
+
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.db.models import Count, Max
+from rest_framework.relations import StringRelatedField
+from rest_framework.serializers import BaseSerializer
+
+
+def _version_columns(model, prefix=''):
+    # columns of a row that change whenever what is rendered from it changes
+    try:
+        model._meta.get_field('updated_at')
+    except FieldDoesNotExist:
+        return []
+
+    # usage counters are changed with UPDATE statements that do not touch updated_at
+    return [f'{prefix}updated_at', *(f'{prefix}{counter}' for counter in getattr(model, 'usage_counters', []))]
+
+
+def _check_plan(serializer_class):
+    # related rows are only part of the version when the eager loading plan declares them, so a serializer rendering
+    # one it does not declare would answer 304 after the row changed
+    planned = {lookup.split('__')[0] for lookup in getattr(serializer_class, 'select_related_fields', [])}
+    planned.update(getattr(serializer_class, 'prefetch_related_fields', {}))
+    
+    for name, field in getattr(serializer_class, '_declared_fields', {}).items():
+        source = (field.source or name).split('.')[0]
+        
+        if isinstance(field, (StringRelatedField, BaseSerializer)) and source not in planned:
+            raise ImproperlyConfigured(
+                f'{serializer_class.__name__} renders `{name}` without declaring `{source}` in its eager loading plan, '
+                'so its version would not change with it'
+            )
+
+
+def _plan(serializer_class, model, prefix=''):
+    # version columns of the rows a serializer renders, from its eager loading plan, with the foreign key and many
+    # relations on the way to them
+    _check_plan(serializer_class)
+    columns = _version_columns(model, prefix)
+    relations = []
+    many = []
+
+    for lookup in getattr(serializer_class, 'select_related_fields', []):
+        related = model
+        path = prefix
+
+        for name in lookup.split('__'):
+            related = related._meta.get_field(name).related_model
+            path = f'{path}{name}__'
+
+            if path[:-2] not in relations:
+                relations.append(path[:-2])
+                columns += _version_columns(related, path)
+
+    for lookup, nested in getattr(serializer_class, 'prefetch_related_fields', {}).items():
+        nested_columns, nested_relations, nested_many = _plan(nested, model._meta.get_field(lookup).related_model, f'{prefix}{lookup}__')
+        many += [f'{prefix}{lookup}', *nested_relations, *nested_many]
+        columns += nested_columns
+
+    return columns, relations, many
+
+
+def get_version(serializer_class, queryset):
+    '''
+    Function to get the version of the row of a queryset as rendered by a serializer, or None if there is no such row.\n
+    The version is read with one query, without loading or serializing the row: `updated_at` of the row and of the
+    rows joined in by the serializer's eager loading plan, with the number and latest `updated_at` of the rows of its
+    many relations so removed members change it too. Serializers of models without `updated_at` have no version.
+    '''
+
+    columns, relations, many = _plan(serializer_class, queryset.model)
+
+    if not columns:
+        return None
+
+    single = [column for column in columns if not any(column.startswith(f'{lookup}__') for lookup in many)]
+    aggregates = {
+        **{f'count_{lookup}': Count(lookup, distinct=True) for lookup in many},
+        **{f'max_{column}': Max(column) for column in columns if column not in single},
+    }
+
+    rows = queryset.select_related(None).prefetch_related(None).order_by().values(*single)
+
+    if aggregates:
+        rows = rows.annotate(**aggregates)
+
+    row = next(iter(rows[:1]), None)
+    return None if row is None else tuple(row.values())
+
+
+def get_collection_version(serializer_class, queryset):
+    '''
+    Function to get the version of the rows of a queryset as rendered by a serializer, or None if they have none.\n
+    Like `get_version` for a list: the number of rows and the latest `updated_at` of them and of the rows rendered with
+    them, with the number of rows they are related to so rows that stop being related change it.
+    '''
+
+    columns, relations, many = _plan(serializer_class, queryset.model)
+
+    if not columns:
+        return None
+
+    version = queryset.select_related(None).prefetch_related(None).order_by().aggregate(
+        count=Count('pk', distinct=True),
+        # not distinct, so every membership counts: a member removed from one of the rows changes it
+        **{f'count_{lookup}': Count(lookup) for lookup in [*relations, *many]},
+        **{f'max_{column}': Max(column) for column in columns},
+    )
+
+    return tuple(version.values())
+
+
+def get_etag(request, version):
+    '''
+    Function to get the ETag of a response from the version of what it renders, or None if it has no version.\n
+    The query string and the media type are part of the ETag, as they change the response for the same version.
+    '''
+
+    if version is None:
+        return None
+
+    key = repr((version, request.get_full_path(), getattr(request, 'accepted_media_type', None)))
+    return f'W/"{hashlib.md5(key.encode(), usedforsecurity=False).hexdigest()}"'
+
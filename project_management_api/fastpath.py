@@ -0,0 +1,204 @@
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from rest_framework import relations, serializers
+from rest_framework.settings import api_settings
+
+# Fields whose value read from the database is already what they render
+_PLAIN_FIELDS = {
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.EmailField,
+    serializers.IntegerField,
+    serializers.SlugField,
+    serializers.URLField,
+}
+
+
+class Unsupported(Exception):
+    '''Raised when a serializer has a field the fast path cannot read with .values()'''
+
+
+class _Context:
+    def __init__(self, request):
+        self.request = request
+        self.related = {}
+
+
+class ValuesReader:
+    '''
+    Read-only fast path for rendering a list of rows with a serializer.\n
+    The serializer's fields are compiled once into the columns to read with `.values()` and a function per field
+    building its output from a row, so listing rows creates no model instances and no serializer per row. Nested
+    serializers are read through joins, and nested lists (many-to-many fields) with one query on the through table per
+    batch of rows. The output is the same as `serializer_class(rows, many=True).data`, with nested lists in primary key
+    order like EagerLoadingMixin prefetches them.\n
+    Fields computed in Python (method fields, string related fields) are only supported when the serializer maps them to
+    the column they show in `values_lookups`. The reader is compiled from a serializer instance, so it renders the
+    fields of the fieldset in the serializer's context, with the relations that are not expanded read as ids.
+    '''
+
+    def __init__(self, serializer, model, prefix=''):
+        self.lookups = []
+        self.related = []
+        self.build, self.pk = self._compile(serializer, model, prefix)
+
+    def values(self, queryset):
+        '''Function to get a queryset of the columns the serializer reads, as dicts'''
+
+        return queryset.prefetch_related(None).values(*self.lookups)
+
+    def data(self, rows, request=None):
+        '''Function to render rows read with `values()` like the serializer, reading their nested lists'''
+
+        context = _Context(request)
+
+        for key, through, parent, child, reader, pk in self.related:
+            ids = {row[pk] for row in rows} - {None}
+            children = {}
+
+            if ids:
+                through_rows = through.objects.filter(**{f'{parent}_id__in': ids}).order_by(f'{child}_id')
+
+                if reader is None:
+                    # rendered as ids, which the through table holds
+                    for parent_id, child_id in through_rows.values_list(f'{parent}_id', f'{child}_id'):
+                        children.setdefault(parent_id, []).append(child_id)
+                else:
+                    child_rows = list(through_rows.values(f'{parent}_id', *reader.lookups))
+
+                    for child_row, child_data in zip(child_rows, reader.data(child_rows, request)):
+                        children.setdefault(child_row[f'{parent}_id'], []).append(child_data)
+
+            context.related[key] = children
+
+        build = self.build
+        return [build(row, context) for row in rows]
+
+    def _column(self, lookup):
+        if lookup not in self.lookups:
+            self.lookups.append(lookup)
+
+        return lookup
+
+    def _compile(self, serializer, model, prefix):
+        computed = getattr(type(serializer), 'values_lookups', {})
+        pk = self._column(prefix + model._meta.pk.name)
+        steps = []
+
+        for field in serializer._readable_fields:
+            name = field.field_name
+
+            if name in computed:
+                steps.append((name, self._value(prefix + computed[name], None)))
+            elif isinstance(field, (serializers.ListSerializer, relations.ManyRelatedField)):
+                steps.append((name, self._many(model, field, pk)))
+            elif isinstance(field, serializers.BaseSerializer):
+                steps.append((name, self._nested(model, field, prefix)))
+            else:
+                steps.append((name, self._field(model, field, prefix)))
+
+        def build(row, context):
+            return {name: get(row, context) for name, get in steps}
+
+        return build, pk
+
+    def _model_field(self, model, field):
+        try:
+            return model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            raise Unsupported(f'{field.field_name} is not a field of {model.__name__}')
+
+    def _value(self, lookup, convert):
+        column = self._column(lookup)
+
+        if convert is None:
+            return lambda row, context: row[column]
+
+        return lambda row, context: None if row[column] is None else convert(row[column])
+
+    def _field(self, model, field, prefix):
+        model_field = self._model_field(model, field)
+
+        if not model_field.concrete or model_field.many_to_many:
+            raise Unsupported(f'{field.field_name} is not a column')
+
+        if isinstance(field, relations.RelatedField):
+            # the primary key of the related row is the foreign key column
+            if type(field) is not relations.PrimaryKeyRelatedField or field.pk_field is not None:
+                raise Unsupported(f'{field.field_name} is a {type(field).__name__}')
+            convert = None
+        elif isinstance(field, serializers.FileField):
+            return self._file(model_field, field, prefix)
+        elif type(field) in _PLAIN_FIELDS:
+            convert = None
+        elif type(field) is serializers.ChoiceField and all(isinstance(key, str) for key in field.choices):
+            convert = None
+        elif type(field) is serializers.UUIDField and field.uuid_format == 'hex_verbose':
+            convert = str
+        else:
+            convert = field.to_representation
+
+        return self._value(prefix + field.source, convert)
+
+    def _file(self, model_field, field, prefix):
+        column = self._column(prefix + field.source)
+        storage = model_field.storage
+        use_url = getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL)
+
+        def get(row, context):
+            name = row[column]
+
+            if not name:
+                return None
+            if not use_url:
+                return name
+
+            url = storage.url(name)
+            return context.request.build_absolute_uri(url) if context.request is not None else url
+
+        return get
+
+    def _nested(self, model, field, prefix):
+        model_field = self._model_field(model, field)
+
+        if not (model_field.many_to_one or model_field.one_to_one):
+            raise Unsupported(f'{field.field_name} is not a foreign key')
+
+        build, pk = self._compile(field, model_field.related_model, f'{prefix}{field.source}__')
+
+        return lambda row, context: None if row[pk] is None else build(row, context)
+
+    def _many(self, model, field, pk):
+        model_field = self._model_field(model, field)
+
+        if not isinstance(model_field, models.ManyToManyField):
+            raise Unsupported(f'{field.field_name} is not a many-to-many field')
+
+        child = model_field.m2m_reverse_field_name()
+
+        if isinstance(field, relations.ManyRelatedField):
+            if type(field.child_relation) is not relations.PrimaryKeyRelatedField or field.child_relation.pk_field is not None:
+                raise Unsupported(f'{field.field_name} is a list of {type(field.child_relation).__name__}')
+            reader = None
+        else:
+            reader = ValuesReader(field.child, model_field.related_model, prefix=f'{child}__')
+
+        key = len(self.related)
+        self.related.append((key, model_field.remote_field.through, model_field.m2m_field_name(), child, reader, pk))
+
+        return lambda row, context: context.related[key].get(row[pk]) or []
+
+
+@lru_cache(maxsize=256)
+def get_reader(serializer_class, fieldset=None):
+    '''
+    Function to get the fast path of a model serializer for a fieldset, or None if it renders a field the fast path
+    cannot read
+    '''
+
+    try:
+        return ValuesReader(serializer_class(context={'fieldset': fieldset}), serializer_class.Meta.model)
+    except Unsupported:
+        return None
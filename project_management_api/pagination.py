@@ -0,0 +1,15 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    '''
+    Cursor pagination used by every list endpoint.\n
+    Pages are read with `WHERE id > <cursor> ORDER BY id LIMIT <page size + 1>` on the primary key index, so a page
+    costs the same however deep into the list it is and no COUNT query is run. The `next` and `previous` links carry
+    opaque cursors, and clients can ask for smaller or larger pages with `?page_size=` up to `MAX_PAGE_SIZE`.
+    '''
+    
+    ordering = 'id'
+    page_size_query_param = 'page_size'
+    max_page_size = settings.MAX_PAGE_SIZE
@@ -0,0 +1,39 @@
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+
+from project_management_api.renderers import MessagePackRenderer, ORJSONRenderer, msgpack, orjson
+
+
+class ORJSONParser(JSONParser):
+    '''
+    JSON parser backed by orjson, parsing request bodies like DRF's JSONParser.\n
+    orjson only reads UTF-8 and always rejects NaN and infinity, so bodies in another encoding, non-strict parsing and
+    every body when orjson is not installed are left to JSONParser.
+    '''
+
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', settings.DEFAULT_CHARSET)
+
+        if orjson is None or not self.strict or encoding.lower().replace('_', '-') not in ('utf-8', 'utf8'):
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
+
+
+class MessagePackParser(BaseParser):
+    '''Parser of request bodies sent as MessagePack with `Content-Type: application/msgpack`'''
+
+    media_type = 'application/msgpack'
+    renderer_class = MessagePackRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False)
+        except (ValueError, msgpack.UnpackException) as exc:
+            raise ParseError(f'MessagePack parse error - {exc}')
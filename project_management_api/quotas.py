@@ -0,0 +1,138 @@
+from django.apps import apps
+from django.db.models import Case, Count, F, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce
+
+# Plan limits. Each quota is kept as a usage counter on the row the plan belongs to, so checking a limit never
+# counts rows.
+#   model - the model holding the plan and the counter
+#   plan - the plan field on that model
+#   counter - the usage counter field on that model
+#   usage - the model and foreign key whose rows the counter counts, used to reconcile the counters
+#   limits - the limit for each plan
+QUOTAS = {
+    # workspaces a user can be a member of, by the user's subscription plan
+    'workspaces': {
+        'model': 'user.CustomUser',
+        'plan': 'subscription_plan',
+        'counter': 'current_no_of_workspaces',
+        'usage': ('workspace.Member', 'user'),
+        'limits': {'starter': 1, 'pro': 3, 'ultimate': 7},
+    },
+    # projects in a workspace, by the workspace plan
+    'projects': {
+        'model': 'workspace.Workspace',
+        'plan': 'plan',
+        'counter': 'current_no_of_projects',
+        'usage': ('project.Project', 'workspace'),
+        'limits': {'basic': 3, 'premium': 7, 'enterprise': 15},
+    },
+}
+
+
+class QuotaExceeded(Exception):
+    '''Raised when a quota is already used up for the plan (None when several rows were reserved at once)'''
+
+    def __init__(self, quota, plan=None):
+        self.quota = quota
+        self.plan = plan
+        super().__init__(f'The {quota} quota of the {plan} plan is used up' if plan else f'The {quota} quota is used up')
+
+
+class UsageCountersMixin:
+    '''
+    Mixin for models holding usage counters.\n
+    The counters named in `usage_counters` are only changed with atomic UPDATE statements, so saving an instance that
+    was loaded earlier (or came from the user cache) leaves them out instead of writing back a stale value.
+    '''
+
+    usage_counters = []
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.usage_counters
+            ]
+
+        super().save(*args, **kwargs)
+
+
+def get_limit(quota):
+    '''Function to get the limit of a quota for each row as a database expression'''
+
+    quota = QUOTAS[quota]
+
+    # unknown plans get no quota
+    return Case(
+        *[When(**{quota['plan']: plan}, then=Value(limit)) for plan, limit in quota['limits'].items()],
+        default=Value(0),
+    )
+
+
+def reserve(quota, pk):
+    '''
+    Function to use up one unit of a quota.\n
+    The limit check and the increment are a single conditional UPDATE, so concurrent requests cannot go past the limit.
+    Call it in the same transaction as the insert it is for so the unit is given back if the insert fails.
+    Raises QuotaExceeded if the quota is used up.
+    '''
+
+    model = apps.get_model(QUOTAS[quota]['model'])
+    counter = QUOTAS[quota]['counter']
+
+    reserved = model.objects.filter(pk=pk, **{f'{counter}__lt': get_limit(quota)}).update(**{counter: F(counter) + 1})
+
+    if not reserved:
+        raise QuotaExceeded(quota, model.objects.filter(pk=pk).values_list(QUOTAS[quota]['plan'], flat=True).first())
+
+
+def reserve_many(quota, pks):
+    '''
+    Function to use up one unit of a quota for each of the given primary keys.\n
+    All the limit checks and increments are a single conditional UPDATE. Raises QuotaExceeded if any of the rows is
+    at its limit, in which case the caller's transaction must be rolled back to give back the units that were taken.
+    '''
+
+    model = apps.get_model(QUOTAS[quota]['model'])
+    counter = QUOTAS[quota]['counter']
+    pks = set(pks)
+
+    reserved = model.objects.filter(pk__in=pks, **{f'{counter}__lt': get_limit(quota)}).update(**{counter: F(counter) + 1})
+
+    if reserved != len(pks):
+        raise QuotaExceeded(quota)
+
+
+def at_limit(quota, pks):
+    '''Function to get the rows among the given primary keys that have used up their quota'''
+
+    model = apps.get_model(QUOTAS[quota]['model'])
+
+    return model.objects.filter(pk__in=pks, **{f"{QUOTAS[quota]['counter']}__gte": get_limit(quota)})
+
+
+def release(quota, pks):
+    '''Function to give back one unit of a quota for each of the given primary keys (a list or a values queryset)'''
+
+    model = apps.get_model(QUOTAS[quota]['model'])
+    counter = QUOTAS[quota]['counter']
+
+    model.objects.filter(pk__in=pks, **{f'{counter}__gt': 0}).update(**{counter: F(counter) - 1})
+
+
+def reconcile(quota):
+    '''Function to recompute the usage counters of a quota from the rows they count and get the number of rows fixed'''
+
+    model = apps.get_model(QUOTAS[quota]['model'])
+    counter = QUOTAS[quota]['counter']
+    usage_model, usage_field = QUOTAS[quota]['usage']
+
+    usage = Coalesce(
+        Subquery(
+            apps.get_model(usage_model).objects.filter(**{usage_field: OuterRef('pk')})
+            .order_by().values(usage_field).annotate(count=Count('pk')).values('count')
+        ),
+        Value(0),
+    )
+
+    return model.objects.exclude(**{counter: usage}).update(**{counter: usage})
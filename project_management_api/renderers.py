@@ -0,0 +1,72 @@
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class ORJSONRenderer(JSONRenderer):
+    '''
+    JSON renderer backed by orjson, rendering the same bytes as DRF's JSONRenderer several times faster.\n
+    UUIDs are encoded by orjson itself, and dates, times and anything else orjson cannot encode (Decimal, lazy
+    translations, querysets) go to DRF's encoder, so they are written to the same precision. Serializers render their
+    date fields as strings already, so only raw values reach the encoder. Data orjson refuses, like integers wider
+    than 64 bits, indented output (the browsable API, `Accept: application/json; indent=4`), ASCII-only output and
+    non-compact output are left to JSONRenderer, as is everything when orjson is not installed. Unlike JSONRenderer,
+    NaN and infinity are rendered as null instead of raising.
+    '''
+
+    options = (orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS) if orjson is not None else 0
+    default = JSONEncoder().default
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if data is None:
+            return b''
+
+        try:
+            ret = orjson.dumps(data, default=self.default, option=self.options)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # escaped like JSONRenderer does so the output stays a strict javascript subset
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+        return ret
+
+
+class MessagePackRenderer(BaseRenderer):
+    '''
+    Renderer of responses as MessagePack, chosen by clients sending `Accept: application/msgpack`.
+
+    The payload holds the same values as the JSON response: UUIDs, dates, Decimal and anything else MessagePack has no
+    type for are encoded the way DRF's JSON encoder writes them, so clients read the same strings. Only registered when
+    msgpack is installed, see settings.REST_FRAMEWORK.
+    '''
+
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+    default = JSONEncoder().default
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        return msgpack.packb(data, default=self.default, use_bin_type=True, datetime=False)
@@ -0,0 +1,246 @@
+from django.conf import settings
+from django.db.models import Prefetch
+from django.utils.functional import cached_property
+from rest_framework import relations, serializers
+
+
+def _parse_paths(value):
+    # 'id,members.user.first_name' -> {'id': {}, 'members': {'user': {'first_name': {}}}}
+    tree = {}
+    
+    for path in value.split(','):
+        node = tree
+        
+        for name in path.strip().split('.'):
+            if name:
+                node = node.setdefault(name, {})
+                
+    return tree
+
+
+def _unknown_paths(serializer, tree, prefix=''):
+    # dotted paths of a fields tree that are not readable fields of a serializer or of the serializers nested in it
+    unknown = []
+    
+    for name, child in tree.items():
+        field = serializer.fields.get(name)
+        
+        if isinstance(field, serializers.ListSerializer):
+            field = field.child
+            
+        if field is None or field.write_only:
+            unknown.append(f'{prefix}{name}')
+        elif child and isinstance(field, serializers.BaseSerializer):
+            unknown += _unknown_paths(field, child, f'{prefix}{name}.')
+        elif child:
+            unknown += [f'{prefix}{name}.{nested}' for nested in child]
+            
+    return unknown
+
+
+def _freeze(tree):
+    return None if tree is None else tuple(sorted((name, _freeze(child)) for name, child in tree.items()))
+
+
+class Fieldset:
+    '''
+    Fields and relations of a response asked for with `?fields=` and `?expand=`.\n
+    * fields - comma-separated fields to render, with nested fields as dotted paths, e.g.
+      `?fields=id,name,members.id,members.user.first_name`. A nested field given without fields of its own is rendered
+      whole. Every field is rendered when it is not given.
+    * expand - comma-separated nested relations to render as objects, with dotted paths for relations inside them, e.g.
+      `?expand=members,members.user`. The relations left out are rendered as their primary keys, so `?expand=` renders
+      every relation as ids. Every relation is expanded when it is not given.\n
+    Fieldsets are hashable so the fast path can be compiled once per fieldset.
+    '''
+    
+    def __init__(self, fields=None, expand=None):
+        self.fields = fields
+        self.expand = expand
+        
+    @classmethod
+    def from_request(cls, request):
+        '''
+        Function to get the fieldset asked for in a request's query parameters, or None to render everything.\n
+        Fields the serializer of the request's view does not render are rejected with a ValidationError listing them.
+        '''
+        
+        fields = request.query_params.get('fields')
+        expand = request.query_params.get('expand')
+        
+        if not fields and expand is None:
+            return None
+        
+        fieldset = cls(_parse_paths(fields) if fields else None, _parse_paths(expand) if expand is not None else None)
+        view = (request.parser_context or {}).get('view')
+        
+        if fieldset.fields is not None and view is not None:
+            unknown = _unknown_paths(view.get_serializer_class()(), fieldset.fields)
+            
+            if unknown:
+                raise serializers.ValidationError({'error': 'These fields do not exist', 'fields': unknown})
+            
+        return fieldset
+    
+    def includes(self, name):
+        '''Function to check if a field is rendered'''
+        
+        return self.fields is None or name in self.fields
+    
+    def expands(self, name):
+        '''Function to check if a relation is rendered as an object rather than its primary key'''
+        
+        return self.expand is None or name in self.expand
+    
+    def child(self, name):
+        '''Function to get the fieldset of an expanded relation, or None if it is rendered whole'''
+        
+        fields = self.fields.get(name) if self.fields is not None else None
+        expand = self.expand.get(name, {}) if self.expand is not None else None
+        
+        if not fields and expand is None:
+            return None
+        
+        # a nested field given without fields of its own is rendered whole
+        return Fieldset(fields or None, expand)
+    
+    def __eq__(self, other):
+        return isinstance(other, Fieldset) and self._key == other._key
+    
+    def __hash__(self):
+        return hash(self._key)
+    
+    @cached_property
+    def _key(self):
+        return _freeze(self.fields), _freeze(self.expand)
+
+
+def _renders(serializer_class, fieldset, path):
+    # whether the related rows at the end of a select_related path are rendered with a fieldset
+    name, *rest = path
+    
+    if fieldset is None:
+        return True
+    if not fieldset.includes(name):
+        return False
+    
+    field = getattr(serializer_class, '_declared_fields', {}).get(name)
+    
+    if isinstance(field, serializers.ListSerializer):
+        field = field.child
+    if not isinstance(field, serializers.BaseSerializer):
+        # method fields and string related fields read the related row themselves
+        return True
+    if not fieldset.expands(name):
+        return False
+    
+    return not rest or _renders(type(field), fieldset.child(name), rest)
+
+
+class SparseFieldsetMixin:
+    '''
+    Mixin for serializers to render only the fields and relations of the Fieldset in their context under `fieldset`.\n
+    Nested serializers get their part of the fieldset from their parent, and relations that are not expanded are
+    rendered as their primary keys. Only the rendered fields are pruned, so writes are validated as before.
+    '''
+    
+    _fieldset = None
+    
+    def get_fieldset(self):
+        '''Function to get the fieldset this serializer renders, or None if it renders every field'''
+        
+        if self._fieldset is not None:
+            return self._fieldset
+        
+        parent = self.parent.parent if isinstance(self.parent, serializers.ListSerializer) else self.parent
+        return self.context.get('fieldset') if parent is None else None
+    
+    @cached_property
+    def _readable_fields(self):
+        fieldset = self.get_fieldset()
+        fields = []
+        
+        for field in self.fields.values():
+            if field.write_only:
+                continue
+            
+            if fieldset is None:
+                fields.append(field)
+            elif not fieldset.includes(field.field_name):
+                continue
+            elif isinstance(field, serializers.BaseSerializer) and not fieldset.expands(field.field_name):
+                fields.append(self._collapse(field))
+            else:
+                if isinstance(field, serializers.BaseSerializer):
+                    nested = field.child if isinstance(field, serializers.ListSerializer) else field
+                    nested._fieldset = fieldset.child(field.field_name)
+                    
+                fields.append(field)
+                
+        return fields
+    
+    def _collapse(self, field):
+        # the relation rendered as its primary key, or a list of them
+        kwargs = {'source': field.source} if field.source != field.field_name else {}
+        related = relations.PrimaryKeyRelatedField(
+            read_only=True,
+            many=isinstance(field, serializers.ListSerializer),
+            **kwargs
+        )
+        related.bind(field.field_name, self)
+        
+        return related
+
+
+class EagerLoadingMixin:
+    '''
+    Mixin for serializers to declare the related objects they read, so views can load them up front instead of
+    running queries for every serialized row.\n
+    * select_related_fields - foreign keys (including nested ones like `commenter__user`) to join in
+    * prefetch_related_fields - many relations mapped to the serializer used to render them. The related rows are
+      prefetched with that serializer's own plan, in primary key order.
+    * values_lookups - fields computed in Python (method fields, string related fields) mapped to the column they show,
+      so lists can be rendered from `.values()` by project_management_api/fastpath.py\n
+    Given the Fieldset of a request, the plan leaves out the relations that are not rendered, and prefetches only the
+    primary keys of the many relations rendered as ids.
+    '''
+    
+    select_related_fields = []
+    prefetch_related_fields = {}
+    values_lookups = {}
+    
+    @classmethod
+    def setup_eager_loading(cls, queryset, fieldset=None):
+        '''Function to apply the serializer's prefetch plan to a queryset, for the fields of a fieldset when one is given'''
+        
+        select_related_fields = [
+            lookup for lookup in cls.select_related_fields if _renders(cls, fieldset, lookup.split('__'))
+        ]
+        
+        if select_related_fields:
+            queryset = queryset.select_related(*select_related_fields)
+            
+        for lookup, serializer_class in cls.prefetch_related_fields.items():
+            if fieldset is not None and not fieldset.includes(lookup):
+                continue
+            
+            related = queryset.model._meta.get_field(lookup).related_model.objects.order_by('pk')
+            
+            if fieldset is not None and not fieldset.expands(lookup):
+                related = related.only('pk')
+            else:
+                related = serializer_class.setup_eager_loading(related, fieldset and fieldset.child(lookup))
+                
+            queryset = queryset.prefetch_related(Prefetch(lookup, queryset=related))
+            
+        return queryset
+
+
+class MemberIdsSerializer(serializers.Serializer):
+    '''Serializer for the list of workspace member ids taken by the bulk member endpoints'''
+    
+    member_ids = serializers.ListField(child=serializers.UUIDField(), allow_empty=False, max_length=settings.MAX_BULK_MEMBERS)
+    
+    def validate_member_ids(self, value):
+        # drop repeated ids, keeping the order they were sent in
+        return list(dict.fromkeys(value))
@@ -1,4 +1,5 @@
 from datetime import timedelta
+from importlib.util import find_spec
 from pathlib import Path
 import os
 from dotenv import load_dotenv
@@ -52,6 +53,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'notification.middleware.NotificationMiddleware',
 ]
 
 ROOT_URLCONF = 'project_management_api.urls'
@@ -144,14 +146,40 @@ AUTH_USER_MODEL = 'user.CustomUser'
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
         'user.authenticators.BlacklistTokenAuthentication',
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'user.authenticators.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': (
         'project_management_api.permissions.IsActiveOrNoAccess',
         'project_management_api.permissions.IsVerifiedOrNoAccess',
     ),
+    'DEFAULT_PAGINATION_CLASS': 'project_management_api.pagination.KeysetPagination',
+    'PAGE_SIZE': 50,
+    # orjson-backed JSON, falling back to DRF's json module classes when orjson is not installed
+    'DEFAULT_RENDERER_CLASSES': [
+        'project_management_api.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'project_management_api.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
+# MessagePack for clients asking for it with `Accept: application/msgpack`, when msgpack is installed
+if find_spec('msgpack') is not None:
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'].insert(1, 'project_management_api.renderers.MessagePackRenderer')
+    REST_FRAMEWORK['DEFAULT_PARSER_CLASSES'].insert(1, 'project_management_api.parsers.MessagePackParser')
+
+# Largest page a client can ask for with `?page_size=`
+MAX_PAGE_SIZE = 200
+
+# Rows read, serialized and sent at a time by list endpoints streaming the whole list with `?stream=true`
+LIST_STREAM_CHUNK_SIZE = 500
+
+# Largest number of members a bulk member endpoint takes in one request
+MAX_BULK_MEMBERS = 500
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=12),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
@@ -160,6 +188,42 @@ SIMPLE_JWT = {
     'UPDATE_LAST_LOGIN': False,
 }
 
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Authenticated users are cached in the USER_CACHE cache for USER_CACHE_TTL seconds and dropped
+# from it when saved or deleted. A user is only dropped from the cache of the process that saved
+# them, so the cache has to be shared by every server process: with a per-process cache like
+# LocMemCache a deactivated or deleted user would keep authenticating on the other processes for
+# up to USER_CACHE_TTL seconds. Users are only cached when REDIS_URL points to a shared cache
+if os.getenv('REDIS_URL'):
+    CACHES['users'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv('REDIS_URL'),
+    }
+
+USER_CACHE = 'users' if 'users' in CACHES else None
+USER_CACHE_TTL = 60
+
+# Blacklisted tokens are checked against an in-process cache that picks up
+# tokens blacklisted by other processes every BLACKLIST_CACHE_TTL seconds, reading
+# again the ones timestamped in the BLACKLIST_CACHE_OVERLAP seconds before the last
+# load, so tokens committed late or by a server with a lagging clock are not missed
+BLACKLIST_CACHE_ENABLED = True
+BLACKLIST_CACHE_TTL = 30
+BLACKLIST_CACHE_OVERLAP = 60
+
+# Expired tokens are purged with `python manage.py purge_expired_tokens`, or by a
+# background thread in each server process every TOKEN_SWEEPER_INTERVAL seconds when set
+TOKEN_SWEEPER_INTERVAL = None
+TOKEN_SWEEPER_BATCH_SIZE = 500
+
 SWAGGER_SETTINGS = {
     # 'USE_SESSION_AUTH': False,
     'SECURITY_DEFINITIONS': {
@@ -171,10 +235,57 @@ SWAGGER_SETTINGS = {
     }
 }
 
+# Notification streams (notification/stream/)
+# The broker delivering new notifications to open streams: LocalBroker for a single process,
+# PollingBroker to read them from the database every NOTIFICATION_POLL_INTERVAL seconds when
+# the API runs in several processes
+NOTIFICATION_BROKER = 'notification.broker.LocalBroker'
+NOTIFICATION_POLL_INTERVAL = 1
+# seconds every poll goes back to catch notifications committed late
+NOTIFICATION_POLL_OVERLAP = 5
+# seconds between keep-alive comments on idle streams
+NOTIFICATION_STREAM_HEARTBEAT = 15
+# milliseconds clients wait before reconnecting
+NOTIFICATION_STREAM_RETRY = 3000
+# events a stream can fall behind before it is closed for the client to catch up from the database
+NOTIFICATION_STREAM_BUFFER = 100
+# missed notifications sent when a client reconnects with Last-Event-ID
+NOTIFICATION_STREAM_REPLAY_LIMIT = 100
+
+# Notification retention
+# Days notifications of each kind are kept, None to keep them forever. Older notifications are
+# left out of inboxes, and archived and deleted by `python manage.py prune_notifications`
+NOTIFICATION_RETENTION = {
+    'message': 90,
+    'broadcast': 30,
+    'membership': 30,
+}
+# notifications archived and deleted per transaction when pruning
+NOTIFICATION_PRUNE_BATCH_SIZE = 2000
+
+# Notification coalescing
+# Seconds within which unread notifications of each kind sent to the same user about the same
+# target (e.g. a workspace) are merged into one notification with a count. Kinds left out are never merged
+NOTIFICATION_COALESCE_WINDOWS = {
+    'membership': 600,
+}
+# what the latest merged notifications said is kept on the merged notification, older ones are only counted
+NOTIFICATION_COALESCE_MAX_EVENTS = 50
+
 # Email service
-EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
-EMAIL_HOST = 'smtp.gmail.com'
-EMAIL_POST = 587
-EMAIL_USE_TLS = True
+EMAIL_BACKEND = os.getenv('EMAIL_BACKEND', "django.core.mail.backends.smtp.EmailBackend")
+EMAIL_HOST = os.getenv('EMAIL_HOST', 'smtp.gmail.com')
+EMAIL_PORT = int(os.getenv('EMAIL_PORT', 587))
+EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', 'true').lower() == 'true'
 EMAIL_HOST_USER = os.getenv('MY_EMAIL')
 EMAIL_HOST_PASSWORD = os.getenv('PASSWORD')
+DEFAULT_FROM_EMAIL = EMAIL_HOST_USER or 'webmaster@localhost'
+
+# Outbound email queue, sent by `python manage.py send_queued_email`
+EMAIL_QUEUE_BATCH_SIZE = 50
+EMAIL_QUEUE_POLL_INTERVAL = 5
+EMAIL_QUEUE_MAX_ATTEMPTS = 5
+# seconds before the first retry, doubled after every failed attempt
+EMAIL_QUEUE_RETRY_DELAY = 30
+# seconds after which an email claimed by a worker that never finished is claimed again
+EMAIL_QUEUE_CLAIM_TIMEOUT = 600
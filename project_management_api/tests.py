@@ -0,0 +1,298 @@
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import BytesIO
+from unittest import mock, skipUnless
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+
+from rest_framework import serializers
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from comment.models import Comment, CommentReply
+from comment.serializers import CommentDetailsSerializer, CommentReplyDetailsSerializer
+from notification.models import Notification
+from notification.ordering import ORDER
+from project.models import Project
+from project.serializers import ProjectDetailsSerializer
+from project.tests import create_project
+from project_management_api.fastpath import get_reader
+from project_management_api.ids import uuid7, uuid7_at
+from project_management_api.parsers import ORJSONParser
+from project_management_api.renderers import ORJSONRenderer
+from project_management_api.serializers import Fieldset, _parse_paths
+from task.models import Task
+from task.serializers import TaskDetailSerializer
+from team.models import Team
+from team.serializers import TeamDetailsSerializer
+from user.models import BlacklistedToken, Token
+from workspace.models import Member
+from workspace.serializers import MemberSerializer
+from workspace.tests import add_members, create_user, create_workspace
+
+
+class UUID7TestCase(SimpleTestCase):
+    '''Test case for time-ordered ids'''
+    
+    def test_version_and_variant(self):
+        id = uuid7()
+        self.assertEqual(id.version, 7)
+        self.assertEqual(id.variant, uuid.RFC_4122)
+        
+    def test_ids_sort_in_creation_order(self):
+        ids = [uuid7() for _ in range(10000)]
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(len(set(ids)), len(ids))
+        
+    def test_hex_sorts_in_creation_order(self):
+        # UUIDField is stored as hex on SQLite
+        ids = [uuid7().hex for _ in range(1000)]
+        self.assertEqual(ids, sorted(ids))
+        
+    def test_uuid7_at(self):
+        now = time.time()
+        self.assertLess(uuid7_at(now - 1), uuid7())
+        self.assertGreater(uuid7_at(now + 1), uuid7())
+
+
+@skipUnless(connection.vendor == 'sqlite', 'query plans are read from SQLite EXPLAIN QUERY PLAN output')
+class QueryPlanTestCase(TestCase):
+    '''Test case to make sure the hot path queries are served by an index instead of a full table scan or a sort'''
+    
+    id = uuid7()
+    
+    def assertUsesIndex(self, queryset):
+        plan = queryset.explain()
+        
+        for line in plan.splitlines():
+            self.assertNotIn(' SCAN ', f' {line}', f'Full scan in query plan:\n{plan}\n{queryset.query}')
+            self.assertNotIn('USE TEMP B-TREE', line, f'Sort in query plan:\n{plan}\n{queryset.query}')
+            
+    def test_member_queries(self):
+        self.assertUsesIndex(Member.objects.filter(user_id=self.id).select_related('workspace'))
+        self.assertUsesIndex(Member.objects.filter(user_id=self.id, workspace_id=self.id))
+        self.assertUsesIndex(MemberSerializer.setup_eager_loading(Member.objects.filter(workspace_id=self.id)).order_by('id')[:51])
+        
+    def test_project_queries(self):
+        self.assertUsesIndex(Project.objects.filter(workspace_id=self.id).order_by('id')[:51])
+        self.assertUsesIndex(Project.objects.filter(workspace_id=self.id, id__gt=self.id).order_by('id')[:51])
+        self.assertUsesIndex(Project.members.through.objects.filter(project_id__in=[self.id, uuid7()]))
+        
+    def test_task_queries(self):
+        self.assertUsesIndex(Task.objects.filter(project_id=self.id).order_by('id')[:51])
+        self.assertUsesIndex(Task.objects.filter(team_id=self.id).order_by('id')[:51])
+        self.assertUsesIndex(Task.objects.filter(team_id=self.id, id__gt=self.id).order_by('id')[:51])
+        self.assertUsesIndex(Task.members.through.objects.filter(task_id__in=[self.id, uuid7()]))
+        
+    def test_team_queries(self):
+        self.assertUsesIndex(Team.objects.filter(project_id=self.id).order_by('id')[:51])
+        self.assertUsesIndex(Team.members.through.objects.filter(team_id__in=[self.id, uuid7()]))
+        
+    def test_comment_queries(self):
+        self.assertUsesIndex(CommentDetailsSerializer.setup_eager_loading(Comment.objects.filter(project_id=self.id)).order_by('id')[:51])
+        self.assertUsesIndex(CommentReply.objects.filter(comment_id=self.id).order_by('id')[:51])
+        
+    def test_notification_queries(self):
+        self.assertUsesIndex(Notification.objects.filter(receiver_id=self.id).order_by(*ORDER)[:51])
+        self.assertUsesIndex(Notification.objects.filter(receiver_id=self.id, date_sent__gte=timezone.now()).order_by(*ORDER)[:51])
+        self.assertUsesIndex(Notification.objects.filter(receiver_id=self.id, is_read=False).order_by(*ORDER)[:51])
+        self.assertUsesIndex(Notification.objects.filter(receiver_id=self.id).order_by('-date_sent')[:51])
+        
+    def test_token_queries(self):
+        self.assertUsesIndex(BlacklistedToken.objects.filter(jti='jti'))
+        self.assertUsesIndex(Token.objects.filter(jti='jti'))
+        self.assertUsesIndex(BlacklistedToken.objects.filter(expiration_date__lt=timezone.now()).values('id')[:500])
+        self.assertUsesIndex(Token.objects.filter(expiration_date__lt=timezone.now()).values('id')[:500])
+
+
+class FastPathTestCase(TestCase):
+    '''Test case to make sure the fast list path renders exactly what the serializers render'''
+    
+    def setUp(self):
+        self.user = create_user('test@gmail.com')
+        self.workspace = create_workspace(self.user)
+        self.project = create_project(self.workspace)
+        self.members = add_members(self.workspace, 3)
+        
+    def assertSameOutput(self, serializer_class, queryset, request=None, fieldset=None):
+        reader = get_reader(serializer_class, fieldset)
+        self.assertIsNotNone(reader)
+        
+        queryset = serializer_class.setup_eager_loading(queryset, fieldset).order_by('id')
+        context = {'request': request, 'fieldset': fieldset}
+        expected = JSONRenderer().render(serializer_class(queryset, many=True, context=context).data)
+        self.assertEqual(JSONRenderer().render(reader.data(list(reader.values(queryset)), request)), expected)
+        
+    def test_tasks(self):
+        for i, members in enumerate([self.members, self.members[:1], []]):
+            task = Task.objects.create(
+                name=f'task {i}',
+                description='task',
+                start_date=timezone.now(),
+                project=self.project,
+                workspace=self.workspace,
+                created_by=self.members[0],
+            )
+            task.members.add(*reversed(members))
+        
+        self.assertSameOutput(TaskDetailSerializer, Task.objects.filter(project=self.project))
+        
+    def test_projects(self):
+        create_project(self.workspace, name='other').members.add(*self.members)
+        self.assertSameOutput(ProjectDetailsSerializer, Project.objects.filter(workspace=self.workspace))
+        
+    def test_comments_without_commenter(self):
+        Comment.objects.create(comment='comment', project=self.project, commenter=self.members[0])
+        comment = Comment.objects.create(comment='comment', project=self.project, commenter=None)
+        CommentReply.objects.create(reply='reply', comment=comment, commenter=None)
+        CommentReply.objects.create(reply='reply', comment=comment, commenter=self.members[1])
+        
+        self.assertSameOutput(CommentDetailsSerializer, Comment.objects.filter(project=self.project))
+        self.assertSameOutput(CommentReplyDetailsSerializer, CommentReply.objects.filter(comment=comment))
+        
+    def test_file_urls(self):
+        team = Team.objects.create(
+            name='team',
+            team_pic=SimpleUploadedFile('team.png', b'png'),
+            project=self.project,
+            workspace=self.workspace,
+            created_by=self.members[0],
+        )
+        team.members.add(*self.members)
+        Team.objects.create(name='no picture', project=self.project, workspace=self.workspace, created_by=self.members[0])
+        
+        try:
+            self.assertSameOutput(TeamDetailsSerializer, Team.objects.filter(project=self.project))
+            self.assertSameOutput(TeamDetailsSerializer, Team.objects.filter(project=self.project), Request(RequestFactory().get('/')))
+        finally:
+            team.team_pic.delete(save=False)
+            
+    def test_fieldsets(self):
+        task = Task.objects.create(name='task', description='task', start_date=timezone.now(), project=self.project)
+        task.members.add(*self.members)
+        Comment.objects.create(comment='comment', project=self.project, commenter=self.members[0])
+        Comment.objects.create(comment='comment', project=self.project, commenter=None)
+        
+        for fields, expand in [
+            ('id,name,members.id,members.user.first_name', None),
+            ('id,members', ''),
+            (None, 'members'),
+            ('name,members.role,members.workspace', 'members.user'),
+        ]:
+            fieldset = Fieldset(fields and _parse_paths(fields), None if expand is None else _parse_paths(expand))
+            self.assertSameOutput(TaskDetailSerializer, Task.objects.filter(project=self.project), fieldset=fieldset)
+            self.assertSameOutput(ProjectDetailsSerializer, Project.objects.filter(workspace=self.workspace), fieldset=fieldset)
+            
+        for fields, expand in [('id,commenter.id,commenter.user', None), ('comment,commenter', ''), (None, 'commenter')]:
+            fieldset = Fieldset(fields and _parse_paths(fields), None if expand is None else _parse_paths(expand))
+            self.assertSameOutput(CommentDetailsSerializer, Comment.objects.filter(project=self.project), fieldset=fieldset)
+            
+    def test_unsupported_fields(self):
+        class MethodFieldSerializer(serializers.ModelSerializer):
+            name = serializers.SerializerMethodField()
+            
+            class Meta:
+                model = Task
+                fields = ['id', 'name']
+                
+            def get_name(self, obj):
+                return obj.name.upper()
+        
+        self.assertIsNone(get_reader(MethodFieldSerializer))
+
+
+class ORJSONTestCase(SimpleTestCase):
+    '''Test case to make sure the orjson renderer and parser behave like DRF's JSON renderer and parser'''
+    
+    data = {
+        'id': uuid7(),
+        'date_sent': timezone.now(),
+        'naive': datetime(2024, 1, 1, 12, 30),
+        'day': date(2024, 1, 1),
+        'price': Decimal('12.50'),
+        'label': gettext_lazy('Email'),
+        'message': 'caf\u00e9 \u2028 \u2029',
+        'nested': [{'count': 1, 'is_read': False, 'sender': None}],
+        1: 'non-string key',
+    }
+    
+    def test_renders_same_bytes(self):
+        self.assertEqual(ORJSONRenderer().render(self.data), JSONRenderer().render(self.data))
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+        
+    def test_renders_dates_like_json_renderer(self):
+        data = {
+            'aware': datetime(2024, 1, 1, 12, 30, 15, 123456, tzinfo=dt_timezone.utc),
+            'offset': datetime(2024, 1, 1, 12, 30, 15, 123456, tzinfo=dt_timezone(timedelta(hours=1))),
+            'naive': datetime(2024, 1, 1, 12, 30, 15, 123456),
+            'time': datetime(2024, 1, 1, 12, 30, 15, 123456).time(),
+            'duration': timedelta(minutes=1),
+        }
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+        
+    def test_big_ints_fall_back(self):
+        data = {'big': 2 ** 64, 'small': -2 ** 70, 'nested': [{'count': 2 ** 100}]}
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+        
+    def test_indent_falls_back(self):
+        self.assertEqual(
+            ORJSONRenderer().render(self.data, 'application/json; indent=4'),
+            JSONRenderer().render(self.data, 'application/json; indent=4'),
+        )
+        
+    def test_falls_back_without_orjson(self):
+        with mock.patch('project_management_api.renderers.orjson', None), mock.patch('project_management_api.parsers.orjson', None):
+            self.assertEqual(ORJSONRenderer().render(self.data), JSONRenderer().render(self.data))
+            self.assertEqual(ORJSONParser().parse(BytesIO(b'{"a": [1, 2]}')), {'a': [1, 2]})
+            
+    def test_parses_like_json_parser(self):
+        body = JSONRenderer().render(self.data)
+        self.assertEqual(ORJSONParser().parse(BytesIO(body)), JSONParser().parse(BytesIO(body)))
+        
+    def test_parse_errors(self):
+        for body in (b'{"a": ', b'{"a": NaN}', b''):
+            with self.assertRaises(ParseError):
+                ORJSONParser().parse(BytesIO(body))
+
+
+class FieldsetTestCase(SimpleTestCase):
+    '''Test case for reading `?fields=` and `?expand=`'''
+    
+    def fieldset(self, **params):
+        return Fieldset.from_request(Request(RequestFactory().get('/', params)))
+    
+    def test_parse(self):
+        self.assertIsNone(self.fieldset())
+        self.assertIsNone(self.fieldset(fields=''))
+        
+        fieldset = self.fieldset(fields='id, name,members.id,members.user.first_name,,')
+        self.assertEqual(fieldset.fields, {'id': {}, 'name': {}, 'members': {'id': {}, 'user': {'first_name': {}}}})
+        self.assertIsNone(fieldset.expand)
+        self.assertTrue(fieldset.includes('members'))
+        self.assertFalse(fieldset.includes('description'))
+        self.assertTrue(fieldset.expands('members'))
+        
+        # an empty expand renders every relation as ids
+        fieldset = self.fieldset(expand='')
+        self.assertIsNone(fieldset.fields)
+        self.assertFalse(fieldset.expands('members'))
+        
+    def test_child(self):
+        fieldset = self.fieldset(fields='id,members,team.id', expand='members.user,team')
+        
+        self.assertEqual(fieldset.child('members'), Fieldset(None, {'user': {}}))
+        self.assertEqual(fieldset.child('team'), Fieldset({'id': {}}, {}))
+        self.assertIsNone(self.fieldset(fields='id,members').child('members'))
+        
+    def test_hash(self):
+        self.assertEqual(self.fieldset(fields='id,name', expand='a,b'), self.fieldset(fields='name,id', expand='b,a'))
+        self.assertEqual(hash(self.fieldset(fields='id,name')), hash(self.fieldset(fields='name,id')))
+        self.assertNotEqual(self.fieldset(fields='id'), self.fieldset(fields='id', expand=''))
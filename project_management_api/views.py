@@ -0,0 +1,196 @@
+from itertools import islice
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from rest_framework import generics, status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from project_management_api import conditional
+from project_management_api.fastpath import get_reader
+from project_management_api.renderers import ORJSONRenderer
+from project_management_api.serializers import Fieldset, MemberIdsSerializer
+from workspace.models import Member
+from workspace.permissions import IsWorkspaceOwnerOrEditorOrReadOnly
+
+
+class ConditionalGetMixin:
+    '''
+    Mixin for views to send an ETag with their GET responses, and answer GETs whose `If-None-Match` holds the current
+    ETag with 304 Not Modified before anything is loaded or serialized.\n
+    The ETag comes from the version of the rows the serializer renders, read with one query, see
+    project_management_api/conditional.py: the version of the row whose id is in the `lookup_url_kwarg` url kwarg for
+    detail views, and of the whole list for list views. Views render their responses in `retrieve()` or `list()`, as
+    the mixin's `get()` wraps them, and views whose model has no `updated_at` answer as before.
+    '''
+    
+    def get(self, request, *args, **kwargs):
+        etag = conditional.get_etag(request, self.get_version())
+        
+        if etag is None:
+            return super().get(request, *args, **kwargs)
+        
+        response = get_conditional_response(request, etag=etag) or super().get(request, *args, **kwargs)
+        
+        if response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            response['ETag'] = etag
+            
+        return response
+    
+    def get_version(self):
+        serializer_class = self.get_serializer_class()
+        
+        if self.lookup_url_kwarg is None:
+            return conditional.get_collection_version(serializer_class, self.filter_queryset(self.get_queryset()))
+        
+        queryset = serializer_class.Meta.model.objects.filter(pk=self.kwargs[self.lookup_url_kwarg])
+        return conditional.get_version(serializer_class, queryset)
+
+
+class FastListMixin:
+    '''
+    Mixin for list views to render their pages with the read-only fast path of their serializer, see
+    project_management_api/fastpath.py. Views whose serializer the fast path cannot read render pages as before. Pages
+    are rendered with the fieldset asked for with `?fields=` and `?expand=`.
+    '''
+    
+    def list(self, request, *args, **kwargs):
+        data = self.get_page_data(self.filter_queryset(self.get_queryset()), request)
+        return self.get_paginated_response(data or [])
+    
+    def get_page_data(self, queryset, request=None):
+        '''
+        Function to get the rendered rows of the requested page of a queryset, or None if the page is empty.\n
+        `request` is given to build absolute file urls, like the serializer does when it has the request in its context.
+        '''
+        
+        serializer_class = self.get_serializer_class()
+        fieldset = Fieldset.from_request(self.request)
+        reader = get_reader(serializer_class, fieldset)
+        
+        if reader is None:
+            page = self.paginate_queryset(queryset)
+            context = {'request': request, 'fieldset': fieldset}
+            return serializer_class(page, many=True, context=context).data if page else None
+        
+        page = self.paginate_queryset(reader.values(queryset))
+        return reader.data(page, request) if page else None
+
+
+class StreamingListMixin:
+    '''
+    Mixin for list views to send the whole list as one JSON array, streamed as it is read, when asked with `?stream=true`.\n
+    Rows are read with `QuerySet.iterator()` and serialized and sent `LIST_STREAM_CHUNK_SIZE` at a time, with the
+    related objects of each chunk prefetched, so memory stays bounded however long the list is. Rows come in the order
+    of the paginated list and are rendered the same way, and an empty list is sent as `[]`.
+    '''
+    
+    def get(self, request, *args, **kwargs):
+        if request.query_params.get('stream') != 'true':
+            return super().get(request, *args, **kwargs)
+        
+        # in the order of the pages of the list
+        ordering = self.paginator.ordering
+        queryset = self.filter_queryset(self.get_queryset()).order_by(*([ordering] if isinstance(ordering, str) else ordering))
+        # read before the response starts so unknown fields are rejected with a 400
+        fieldset = Fieldset.from_request(request)
+        return StreamingHttpResponse(self.stream(queryset, fieldset), content_type='application/json')
+    
+    def stream(self, queryset, fieldset=None):
+        '''Generator of the JSON array of the serialized rows of a queryset with a fieldset, a chunk of rows at a time'''
+        
+        renderer = ORJSONRenderer()
+        serializer_class = self.get_serializer_class()
+        chunk_size = settings.LIST_STREAM_CHUNK_SIZE
+        # rows are read with .values() when the serializer has a fast path
+        reader = get_reader(serializer_class, fieldset)
+        
+        if reader is not None:
+            queryset = reader.values(queryset)
+            
+        rows = queryset.iterator(chunk_size=chunk_size)
+        separator = b''
+        
+        yield b'['
+        
+        while chunk := list(islice(rows, chunk_size)):
+            data = reader.data(chunk) if reader is not None else serializer_class(chunk, many=True, context={'fieldset': fieldset}).data
+            # the chunk is rendered as an array, sent without its brackets
+            yield separator + renderer.render(data)[1:-1]
+            separator = b','
+            
+        yield b']'
+
+
+class BulkMembersView(generics.GenericAPIView):
+    '''
+    Base view to add workspace members to, or remove them from, the members of a project, team or task in one request.\n
+    The members are checked with one query each for the workspace and the current members, and the rows of the
+    members table are inserted or deleted with one statement, however many members are sent.
+    * model - the model whose `members` are changed
+    * lookup_url_kwarg - the url kwarg holding the id of the object
+    * remove - whether the members are removed instead of added
+    '''
+    
+    permission_classes = [IsAuthenticated, IsWorkspaceOwnerOrEditorOrReadOnly]
+    serializer_class = MemberIdsSerializer
+    model = None
+    lookup_url_kwarg = None
+    remove = False
+    
+    def post(self, request, *args, **kwargs):
+        name = self.model._meta.verbose_name
+        
+        try:
+            obj = self.model.objects.get(id=self.kwargs[self.lookup_url_kwarg])
+        except self.model.DoesNotExist:
+            return Response({'error': f'{name.capitalize()} does not exist'}, status=status.HTTP_404_NOT_FOUND)
+        
+        self.check_object_permissions(request, obj=obj)
+        
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        member_ids = serializer.validated_data['member_ids']
+        
+        # check that all the members are in the object's workspace
+        workspace_members = set(Member.objects.filter(id__in=member_ids, workspace_id=obj.workspace_id).values_list('id', flat=True))
+        missing = [str(id) for id in member_ids if id not in workspace_members]
+        
+        if missing:
+            return Response({'error': 'These members do not exist in this workspace', 'member_ids': missing}, status=status.HTTP_404_NOT_FOUND)
+        
+        # rows of the members table, e.g. project_id and member_id for projects
+        field = self.model._meta.get_field('members')
+        through = field.remote_field.through
+        obj_field = f'{field.m2m_field_name()}_id'
+        member_field = f'{field.m2m_reverse_field_name()}_id'
+        
+        rows = through.objects.filter(**{obj_field: obj.id, f'{member_field}__in': member_ids})
+        current = set(rows.values_list(member_field, flat=True))
+        
+        if self.remove:
+            absent = [str(id) for id in member_ids if id not in current]
+            if absent:
+                return Response({'error': f'These members are not in this {name}', 'member_ids': absent}, status=status.HTTP_400_BAD_REQUEST)
+            
+            rows.delete()
+            self.touch(obj)
+            return Response({'message': f'{len(member_ids)} members removed from {name}'}, status=status.HTTP_200_OK)
+        
+        if current:
+            return Response(
+                {'error': f'These members are already in this {name}', 'member_ids': [str(id) for id in member_ids if id in current]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # members added by a concurrent request since the check are skipped
+        through.objects.bulk_create([through(**{obj_field: obj.id, member_field: id}) for id in member_ids], ignore_conflicts=True)
+        self.touch(obj)
+        return Response({'message': f'{len(member_ids)} members added to {name}'}, status=status.HTTP_201_CREATED)
+    
+    def touch(self, obj):
+        '''Function to bump `updated_at` of the object, whose members table was written without saving it, so its ETag changes'''
+        
+        self.model.objects.filter(id=obj.id).update(updated_at=timezone.now())
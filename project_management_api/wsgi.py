@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'project_management_api.settings')
 
 application = get_wsgi_application()
+
+# Only start the token sweeper in server processes, not in management commands
+from user.sweeper import start_token_sweeper
+
+start_token_sweeper()
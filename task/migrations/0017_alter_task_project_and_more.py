@@ -0,0 +1,35 @@
+# Generated by Django 5.0.1 on 2026-10-17 00:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0035_alter_project_workspace_and_more'),
+        ('task', '0016_alter_task_id'),
+        ('team', '0008_alter_team_project_team_team_project_idx'),
+        ('workspace', '0016_alter_member_options_alter_member_user_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='task',
+            name='project',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, to='project.project'),
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='team',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, to='team.team'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['project', 'id'], name='task_project_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('team__isnull', False)), fields=['team', 'id'], name='task_team_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.0.1 on 2026-10-17 00:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_workspace(apps, schema_editor):
+    '''Copy the workspace of each task's project onto the task'''
+
+    Project = apps.get_model('project', 'Project')
+    Task = apps.get_model('task', 'Task')
+    
+    Task.objects.update(workspace_id=Subquery(Project.objects.filter(id=OuterRef('project_id')).values('workspace_id')[:1]))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task', '0017_alter_task_project_and_more'),
+        ('workspace', '0016_alter_member_options_alter_member_user_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='workspace',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='workspace.workspace'),
+        ),
+        migrations.RunPython(backfill_workspace, migrations.RunPython.noop),
+    ]
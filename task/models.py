@@ -1,16 +1,16 @@
 from django.db import models
 import datetime
-from uuid import uuid4
+from project_management_api.ids import uuid7
 
 from project.models import Project
 from team.models import Team
-from workspace.models import Member
+from workspace.models import Member, Workspace
 
 # Create your models here.
 class Task(models.Model):
     '''Task model'''
     
-    id = models.UUIDField(default=uuid4, primary_key=True)
+    id = models.UUIDField(default=uuid7, primary_key=True)
     name = models.CharField(max_length=128, unique=True, null=False)
     description = models.CharField(null=False, max_length=255)
     label_color = models.CharField(max_length=25, null=False, default='0xFFFFFFFF')
@@ -18,10 +18,28 @@ class Task(models.Model):
     start_date = models.DateTimeField(null=False, default=datetime.datetime.now())
     end_date = models.DateTimeField(null=True)
     is_team_task = models.BooleanField(default=False)
-    team = models.ForeignKey(Team, null=True, on_delete=models.CASCADE)
-    project = models.ForeignKey(Project, null=True, on_delete=models.CASCADE)
+    team = models.ForeignKey(Team, null=True, on_delete=models.CASCADE, db_index=False)
+    project = models.ForeignKey(Project, null=True, on_delete=models.CASCADE, db_index=False)
+    # copy of project.workspace, kept in step by save() and Project.save()
+    workspace = models.ForeignKey(Workspace, null=True, on_delete=models.CASCADE, editable=False, related_name='+')
     members = models.ManyToManyField(Member, related_name='tasks', blank=True)
     created_by = models.ForeignKey(Member, null=True, on_delete=models.CASCADE)
+    # also bumped when members are added or removed in bulk, see project_management_api/views.py BulkMembersView
+    updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
-        return f'{self.id} | {self.name} | {self.project.name}'
\ No newline at end of file
+        return f'{self.id} | {self.name} | {self.project.name}'
+    
+    def save(self, *args, **kwargs):
+        # copy the workspace from the project so permission checks do not have to load it
+        if self.project_id is not None and (self.workspace_id is None or type(self).project.is_cached(self)):
+            self.workspace_id = self.project.workspace_id
+            
+        super().save(*args, **kwargs)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['project', 'id'], name='task_project_idx'),
+            # most tasks are not team tasks
+            models.Index(fields=['team', 'id'], name='task_team_idx', condition=models.Q(team__isnull=False)),
+        ]
@@ -1,6 +1,6 @@
 from rest_framework.permissions import BasePermission, SAFE_METHODS
 
-from workspace.models import Member
+from workspace.membership import get_membership_resolver
 
 class IsTaskWorkspaceOwnerOrEditorOrReadOnly(BasePermission):
     '''Permission class to prevent unauthorized access to tasks'''
@@ -11,14 +11,8 @@ class IsTaskWorkspaceOwnerOrEditorOrReadOnly(BasePermission):
         if request.method in SAFE_METHODS:
             return True
         else:
-            # get member based on current logged in user and workspace object
-            member = Member.objects.filter(user=request.user, workspace=obj.project.workspace)
-            
-            # check if member exists in workspace
-            if not member.exists():
-                return False
-            
-            return (obj.project.workspace.creator == request.user) or member.first().role == 'editor'
+            # check member based on current logged in user and workspace object
+            return get_membership_resolver(request).is_owner_or_editor(obj.workspace_id)
         
 
 class IsTaskMemberOrReadOnly(BasePermission):     
@@ -31,7 +25,7 @@ class IsTaskMemberOrReadOnly(BasePermission):
             return True
         else:
             # get member based on current logged in user
-            member = Member.objects.get(user=request.user)
+            member = get_membership_resolver(request).get(obj.workspace_id)
             
             # check if member is in project members
-            return obj.members.contains(member)
\ No newline at end of file
+            return member is not None and obj.members.contains(member)
@@ -1,10 +1,11 @@
 from rest_framework import serializers
 from datetime import datetime
 from project.models import Project
+from project_management_api.serializers import EagerLoadingMixin, SparseFieldsetMixin
 
 from task.models import Task
 from team.models import Team
-from workspace.models import Member
+from workspace.membership import get_membership_resolver
 from workspace.serializers import MemberSerializer
 
 class CreateProjectTaskSerializer(serializers.ModelSerializer):
@@ -36,12 +37,12 @@ class CreateProjectTaskSerializer(serializers.ModelSerializer):
         
         project = Project.objects.get(id=self.context['view'].kwargs['project_id'])
         # get member based on logged in user and project workspace to avoid another user creating a task in a project that is not in their workspace
-        member = Member.objects.filter(user=self.context['request'].user, workspace=project.workspace)
+        member = get_membership_resolver(self.context['request']).get(project.workspace_id)
         
-        if not member.exists():
+        if member is None:
             raise serializers.ValidationError({'error': 'You do not exist in the workspace'})
         
-        if member.first().role != 'editor':
+        if member.role != 'editor':
             raise serializers.ValidationError({'error': 'You are not an editor in the workspace'})
         
         # Check if task start or end date is past project start or end date
@@ -58,8 +59,8 @@ class CreateProjectTaskSerializer(serializers.ModelSerializer):
         end_date = validated_data.get('end_date')        
         project = Project.objects.get(id=self.context['view'].kwargs['project_id'])
         
-        # filter member object so that members from outside the workspace cannot be added
-        member = Member.objects.filter(user=self.context['request'].user, workspace=project.workspace)
+        # get member object so that members from outside the workspace cannot be added
+        member = get_membership_resolver(self.context['request']).get(project.workspace_id)
         
         task = Task.objects.create(
             name=name,
@@ -70,12 +71,11 @@ class CreateProjectTaskSerializer(serializers.ModelSerializer):
             start_date=start_date,
             end_date=end_date,
             project=project,
-            created_by=member.first()
+            created_by=member
         )
         
         # add member to members list in task
-        task.members.set(member)
-        task.save()
+        task.members.add(member)
         
         return task
     
@@ -109,12 +109,12 @@ class CreateTeamTaskSerializer(serializers.ModelSerializer):
         project = Project.objects.get(id=self.context['view'].kwargs['project_id'])
         team = Team.objects.get(id=self.context['view'].kwargs['team_id'])
         # get member based on logged in user and project workspace
-        member = Member.objects.filter(user=self.context['request'].user, workspace=project.workspace)
+        member = get_membership_resolver(self.context['request']).get(project.workspace_id)
         
-        if not member.exists():
+        if member is None:
             raise serializers.ValidationError({'error': 'You do not exist in the workspace'})
         
-        if member.first().role != 'editor':
+        if member.role != 'editor':
             raise serializers.ValidationError({'error': 'You are not an editor in the workspace'})
         
         # check if project is linked with the team
@@ -122,7 +122,7 @@ class CreateTeamTaskSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError({'error': 'This team does not exist for the project'})
         
         # check if logged in member is part of the team
-        if not team.members.contains(member.first()):
+        if not team.members.contains(member):
             raise serializers.ValidationError({'error': 'You do not belong in this team'})
         
         # Check if task start or end date is past project start or end date
@@ -139,8 +139,8 @@ class CreateTeamTaskSerializer(serializers.ModelSerializer):
         end_date = validated_data.get('end_date')     
            
         project = Project.objects.get(id=self.context['view'].kwargs['project_id'])
-        # filter member object so that members from outside the workspace cannot be added
-        member = Member.objects.filter(user=self.context['request'].user, workspace=project.workspace)
+        # get member object so that members from outside the workspace cannot be added
+        member = get_membership_resolver(self.context['request']).get(project.workspace_id)
         team = Team.objects.get(id=self.context['view'].kwargs['team_id'])
                 
         task = Task.objects.create(
@@ -153,20 +153,21 @@ class CreateTeamTaskSerializer(serializers.ModelSerializer):
             end_date=end_date,
             project=project,
             team=team,
-            created_by=member.first()
+            created_by=member
         )
         
         # add member to members list in task
-        task.members.set(member)
+        task.members.add(member)
         # task.members.set(team.members)
-        task.save()
         
         return task
     
 
-class TaskDetailSerializer(serializers.ModelSerializer):
+class TaskDetailSerializer(SparseFieldsetMixin, EagerLoadingMixin, serializers.ModelSerializer):
     '''Serializer for task details'''
     
+    prefetch_related_fields = {'members': MemberSerializer}
+    
     members = MemberSerializer(read_only=True, many=True)
     
     class Meta:
@@ -1,3 +1,190 @@
-from django.test import TestCase
+import json
+from datetime import timedelta
+from unittest import mock, skipIf
 
-# Create your tests here.
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from project.tests import create_project
+from project_management_api.pagination import KeysetPagination
+from project_management_api.renderers import msgpack
+from task.models import Task
+from workspace.tests import add_members, create_user, create_workspace
+
+
+class TaskQueryCountTestCase(APITestCase):
+    '''Test case to guard the number of queries run by task endpoints'''
+    
+    def setUp(self):
+        self.user = create_user('test@gmail.com')
+        self.workspace = create_workspace(self.user)
+        self.project = create_project(self.workspace)
+        self.client.force_authenticate(user=self.user)
+        
+    def test_create_task(self):
+        data = {
+            'name': 'task',
+            'description': 'task description',
+            'label_color': '0xFF000000',
+            'start_date': (timezone.now() + timedelta(days=1)).isoformat(),
+            'end_date': (timezone.now() + timedelta(days=2)).isoformat(),
+        }
+        
+        # 16 queries before the membership resolver
+        with self.assertNumQueries(9):
+            response = self.client.post(reverse('task:create-general-task', kwargs={'project_id': self.project.id}), data)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        
+    def test_update_task(self):
+        task = Task.objects.create(name='task', description='task description', start_date=timezone.now(), project=self.project)
+        
+        # 7 queries before the membership resolver, 5 before the denormalized workspace
+        with self.assertNumQueries(4):
+            response = self.client.patch(reverse('task:task-detail', kwargs={'task_id': task.id}), {'description': 'new'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+    def test_list_project_tasks(self):
+        url = reverse('task:tasks-for-project', kwargs={'project_id': self.project.id})
+        task = Task.objects.create(name='first', description='task description', start_date=timezone.now(), project=self.project)
+        task.members.add(*add_members(self.workspace, 2))
+        
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(len(response.data['results']), 1)
+        
+        for i in range(3):
+            task = Task.objects.create(name=f'task {i}', description='task description', start_date=timezone.now(), project=self.project)
+            task.members.add(*add_members(self.workspace, 3))
+        
+        with self.assertNumQueries(len(queries)):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data['results']), 4)
+
+        
+    def test_bulk_add_and_remove_members(self):
+        task = Task.objects.create(name='task', description='task description', start_date=timezone.now(), project=self.project)
+        members = add_members(self.workspace, 3)
+        member_ids = [str(member.id) for member in members]
+        
+        response = self.client.post(reverse('task:add-task-members', kwargs={'task_id': task.id}), {'member_ids': member_ids}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(task.members.count(), 3)
+        
+        response = self.client.post(reverse('task:remove-task-members', kwargs={'task_id': task.id}), {'member_ids': member_ids}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(task.members.count(), 0)
+
+class TaskPaginationTestCase(APITestCase):
+    '''Test case for paginating project tasks'''
+    
+    def setUp(self):
+        self.user = create_user('test@gmail.com')
+        self.workspace = create_workspace(self.user)
+        self.project = create_project(self.workspace)
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('task:tasks-for-project', kwargs={'project_id': self.project.id})
+        
+        for i in range(5):
+            Task.objects.create(name=f'task {i}', description='task description', start_date=timezone.now(), project=self.project)
+            
+    def test_walk_pages(self):
+        response = self.client.get(self.url, {'page_size': 2})
+        ids = [task['id'] for task in response.data['results']]
+        self.assertIsNone(response.data['previous'])
+        
+        while response.data['next']:
+            response = self.client.get(response.data['next'])
+            ids += [task['id'] for task in response.data['results']]
+            
+        self.assertEqual(len(ids), 5)
+        self.assertEqual(set(ids), {str(id) for id in Task.objects.values_list('id', flat=True)})
+        
+    def test_page_size_is_capped(self):
+        with mock.patch.object(KeysetPagination, 'max_page_size', 3):
+            response = self.client.get(self.url, {'page_size': 1000})
+        
+        self.assertEqual(len(response.data['results']), 3)
+        self.assertIsNotNone(response.data['next'])
+        
+    def test_no_tasks(self):
+        Task.objects.all().delete()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+
+class TaskStreamingTestCase(APITestCase):
+    '''Test case for streaming the whole list of a project's tasks'''
+    
+    def setUp(self):
+        self.user = create_user('test@gmail.com')
+        self.workspace = create_workspace(self.user)
+        self.project = create_project(self.workspace)
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('task:tasks-for-project', kwargs={'project_id': self.project.id})
+        
+        members = add_members(self.workspace, 3)
+        for i in range(5):
+            task = Task.objects.create(name=f'task {i}', description='task description', start_date=timezone.now(), project=self.project)
+            task.members.add(*members[:i % 4])
+            
+    def stream(self):
+        response = self.client.get(self.url, {'stream': 'true'})
+        self.assertEqual(response['Content-Type'], 'application/json')
+        return json.loads(b''.join(response.streaming_content))
+            
+    def test_stream_matches_pages(self):
+        pages = self.client.get(self.url, {'page_size': 200}).json()['results']
+        
+        # rows are sent a few at a time, with the members of each chunk prefetched
+        with self.settings(LIST_STREAM_CHUNK_SIZE=2), CaptureQueriesContext(connection) as queries:
+            tasks = self.stream()
+        
+        self.assertEqual(tasks, pages)
+        self.assertLess(len(queries), 10)
+        
+    def test_stream_no_tasks(self):
+        Task.objects.all().delete()
+        self.assertEqual(self.stream(), [])
+
+
+@skipIf(msgpack is None, 'msgpack is not installed')
+class TaskMessagePackTestCase(APITestCase):
+    '''Test case for reading and writing tasks as MessagePack'''
+    
+    def setUp(self):
+        self.user = create_user('test@gmail.com')
+        self.workspace = create_workspace(self.user)
+        self.project = create_project(self.workspace)
+        self.client.force_authenticate(user=self.user)
+        
+        task = Task.objects.create(name='task', description='task description', start_date=timezone.now(), project=self.project)
+        task.members.add(*add_members(self.workspace, 2))
+        
+    def test_list_tasks(self):
+        url = reverse('task:tasks-for-project', kwargs={'project_id': self.project.id})
+        response = self.client.get(url, HTTP_ACCEPT='application/msgpack')
+        
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        self.assertEqual(msgpack.unpackb(response.content), self.client.get(url).json())
+        
+    def test_create_task(self):
+        data = msgpack.packb({
+            'name': 'new task',
+            'description': 'task description',
+            'label_color': '0xFF000000',
+            'start_date': (timezone.now() + timedelta(days=1)).isoformat(),
+            'end_date': (timezone.now() + timedelta(days=2)).isoformat(),
+        })
+        url = reverse('task:create-general-task', kwargs={'project_id': self.project.id})
+        
+        response = self.client.post(url, data, content_type='application/msgpack', HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(msgpack.unpackb(response.content)['name'], 'new task')
+        
+        response = self.client.post(url, b'\xc1', content_type='application/msgpack')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
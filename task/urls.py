@@ -11,5 +11,7 @@ urlpatterns = [
     path('<uuid:task_id>/', views.TaskDetailView.as_view(), name='task-detail'),
     path('<uuid:task_id>/member/<uuid:member_id>/add/', views.AddMemberToTaskView.as_view(), name='add-task-member'),
     path('<uuid:task_id>/member/<uuid:member_id>/remove/', views.RemoveMemberFromTaskView.as_view(), name='remove-task-member'),
+    path('<uuid:task_id>/members/add/', views.BulkAddMembersToTaskView.as_view(), name='add-task-members'),
+    path('<uuid:task_id>/members/remove/', views.BulkRemoveMembersFromTaskView.as_view(), name='remove-task-members'),
     path('<uuid:task_id>/toggle-completion-status/', views.ToggleCompletionStatusView.as_view(), name='toggle-completion-status'),
 ]
\ No newline at end of file
@@ -7,6 +7,8 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
 
 from project.models import Project
+from project_management_api.serializers import Fieldset
+from project_management_api.views import BulkMembersView, ConditionalGetMixin, FastListMixin, StreamingListMixin
 from task.models import Task
 from team.models import Team
 from workspace.permissions import IsMemberOrReadOnly, IsWorkspaceOwnerOrEditorOrReadOnly
@@ -32,16 +34,18 @@ class CreateTeamTaskView(generics.CreateAPIView):
     queryset = Task.objects.all()
 
 
-class TaskDetailView(generics.RetrieveUpdateDestroyAPIView):
+class TaskDetailView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     '''View to get, update and delete tasks'''
     
     permission_classes = [IsAuthenticated, IsWorkspaceOwnerOrEditorOrReadOnly]
     serializer_class = serializers.TaskDetailSerializer
+    lookup_url_kwarg = 'task_id'
     
-    def get(self, request, *args, **kwargs):
+    def retrieve(self, request, *args, **kwargs):
         try:
-            task = Task.objects.get(id=self.kwargs['task_id'])
-            serializer = self.serializer_class(task)
+            fieldset = Fieldset.from_request(request)
+            task = self.serializer_class.setup_eager_loading(Task.objects, fieldset).get(id=self.kwargs['task_id'])
+            serializer = self.serializer_class(task, context={'fieldset': fieldset})
             return Response(serializer.data, status=status.HTTP_200_OK)
         except Task.DoesNotExist:
             return Response({'error': 'Task doe snot exist'}, status=status.HTTP_404_NOT_FOUND)
@@ -65,7 +69,7 @@ class TaskDetailView(generics.RetrieveUpdateDestroyAPIView):
             return Response({'error': 'Task does not exist'}, status=status.HTTP_404_NOT_FOUND)  
         
 
-class GetTasksForTeamView(generics.ListAPIView):
+class GetTasksForTeamView(ConditionalGetMixin, FastListMixin, StreamingListMixin, generics.ListAPIView):
     '''View to get tasks for a specific team'''
     
     permission_classes = [IsAuthenticated]
@@ -73,23 +77,20 @@ class GetTasksForTeamView(generics.ListAPIView):
     
     def get_queryset(self):
         team = Team.objects.get(id=self.kwargs['team_id'])
-        tasks = Task.objects.filter(team=team)
+        tasks = self.serializer_class.setup_eager_loading(Task.objects.filter(team=team), Fieldset.from_request(self.request))
         
         return tasks
     
     def list(self, request, *args, **kwargs):
-        team = Team.objects.get(id=self.kwargs['team_id'])
-        tasks = Task.objects.filter(team=team)
-        
-        serializer = self.serializer_class(tasks, many=True)
+        tasks = self.get_page_data(self.get_queryset())
         
-        if tasks.exists():
-            return Response(serializer.data, status=status.HTTP_200_OK)
+        if tasks:
+            return self.get_paginated_response(tasks)
         else:
             return Response({'error': 'There are no tasks for this team'}, status=status.HTTP_204_NO_CONTENT)
         
         
-class GetProjectTasksView(generics.ListAPIView):
+class GetProjectTasksView(ConditionalGetMixin, FastListMixin, StreamingListMixin, generics.ListAPIView):
     '''View to get tasks for a project'''
     
     permission_classes = [IsAuthenticated]
@@ -97,18 +98,15 @@ class GetProjectTasksView(generics.ListAPIView):
     
     def get_queryset(self):
         project = Project.objects.get(id=self.kwargs['project_id'])
-        tasks = Task.objects.filter(project=project)
+        tasks = self.serializer_class.setup_eager_loading(Task.objects.filter(project=project), Fieldset.from_request(self.request))
         
         return tasks
     
     def list(self, request, *args, **kwargs):
-        project = Project.objects.get(id=self.kwargs['project_id'])
-        tasks = Task.objects.filter(project=project)
-        
-        serializer = self.serializer_class(tasks, many=True)
+        tasks = self.get_page_data(self.get_queryset())
         
-        if tasks.exists():
-            return Response(serializer.data, status=status.HTTP_200_OK)
+        if tasks:
+            return self.get_paginated_response(tasks)
         else:
             return Response({'error': 'There are no tasks for this project'}, status=status.HTTP_204_NO_CONTENT)
         
@@ -120,7 +118,7 @@ class AddMemberToTaskView(APIView):
     
     def post(self, request, task_id, member_id):
         task = Task.objects.get(id=self.kwargs['task_id'])
-        members = Member.objects.filter(id=self.kwargs['member_id'], workspace=task.project.workspace)
+        members = Member.objects.filter(id=self.kwargs['member_id'], workspace_id=task.workspace_id)
         self.check_object_permissions(request, obj=task)
         member = members.first()
         
@@ -149,7 +147,7 @@ class RemoveMemberFromTaskView(APIView):
     
     def post(self, request, task_id, member_id):
         task = Task.objects.get(id=self.kwargs['task_id'])
-        members = Member.objects.filter(id=self.kwargs['member_id'], workspace=task.project.workspace)
+        members = Member.objects.filter(id=self.kwargs['member_id'], workspace_id=task.workspace_id)
         self.check_object_permissions(request, obj=task)
         member = members.first()
         
@@ -172,6 +170,21 @@ class RemoveMemberFromTaskView(APIView):
             return Response({'error': 'Task does not exist'}, status=status.HTTP_404_NOT_FOUND)
         
 
+class BulkAddMembersToTaskView(BulkMembersView):
+    '''View to add many members to a task at once'''
+    
+    model = Task
+    lookup_url_kwarg = 'task_id'
+    
+    
+class BulkRemoveMembersFromTaskView(BulkMembersView):
+    '''View to remove many members from a task at once'''
+    
+    model = Task
+    lookup_url_kwarg = 'task_id'
+    remove = True
+    
+
 class ToggleCompletionStatusView(APIView):
     '''View to mark a task as complete'''
     
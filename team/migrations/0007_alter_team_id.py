@@ -0,0 +1,19 @@
+# Generated by Django 5.0.1 on 2026-10-17 00:40
+
+import project_management_api.ids
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('team', '0006_alter_team_created_by'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='team',
+            name='id',
+            field=models.UUIDField(default=project_management_api.ids.uuid7, primary_key=True, serialize=False),
+        ),
+    ]
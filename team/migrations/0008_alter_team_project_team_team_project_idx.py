@@ -0,0 +1,25 @@
+# Generated by Django 5.0.1 on 2026-10-17 00:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0035_alter_project_workspace_and_more'),
+        ('team', '0007_alter_team_id'),
+        ('workspace', '0016_alter_member_options_alter_member_user_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='team',
+            name='project',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, to='project.project'),
+        ),
+        migrations.AddIndex(
+            model_name='team',
+            index=models.Index(fields=['project', 'id'], name='team_project_idx'),
+        ),
+    ]
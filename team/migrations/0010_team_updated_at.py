@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-17 02:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('team', '0009_team_workspace'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='team',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
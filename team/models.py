@@ -1,11 +1,11 @@
 import os
 
 from django.db import models
-from uuid import uuid4
+from project_management_api.ids import uuid7
 
 from project.models import Project
 from user.models import CustomUser
-from workspace.models import Member
+from workspace.models import Member, Workspace
 
 # Create your models here.
 class Team(models.Model):
@@ -17,12 +17,28 @@ class Team(models.Model):
         extension = filename.split('.')[-1]
         return os.path.join('team', str(model.id), f'team_pic.{extension}')
     
-    id = models.UUIDField(default=uuid4, primary_key=True)
+    id = models.UUIDField(default=uuid7, primary_key=True)
     name = models.CharField(max_length=120, null=False, unique=True)
     team_pic = models.ImageField(upload_to=upload_image, null=True)
-    project = models.ForeignKey(Project, null=True, on_delete=models.CASCADE)
+    project = models.ForeignKey(Project, null=True, on_delete=models.CASCADE, db_index=False)
+    # copy of project.workspace, kept in step by save() and Project.save()
+    workspace = models.ForeignKey(Workspace, null=True, on_delete=models.CASCADE, editable=False, related_name='+')
     members = models.ManyToManyField(Member, related_name='teams', blank=True)
     created_by = models.ForeignKey(Member, null=True, on_delete=models.CASCADE)
+    # also bumped when members are added or removed in bulk, see project_management_api/views.py BulkMembersView
+    updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
-        return f'{self.id} | {self.name} | {self.project.name}'
\ No newline at end of file
+        return f'{self.id} | {self.name} | {self.project.name}'
+    
+    def save(self, *args, **kwargs):
+        # copy the workspace from the project so permission checks do not have to load it
+        if self.project_id is not None and (self.workspace_id is None or type(self).project.is_cached(self)):
+            self.workspace_id = self.project.workspace_id
+            
+        super().save(*args, **kwargs)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['project', 'id'], name='team_project_idx'),
+        ]
@@ -1,8 +1,9 @@
 from rest_framework import serializers
 from project.models import Project
+from project_management_api.serializers import EagerLoadingMixin, SparseFieldsetMixin
 
 from team.models import Team
-from workspace.models import Member
+from workspace.membership import get_membership_resolver
 from workspace.serializers import MemberSerializer
 
 class CreateTeamSerializer(serializers.ModelSerializer):
@@ -19,31 +20,32 @@ class CreateTeamSerializer(serializers.ModelSerializer):
         name = validated_data.get('name')
         team_pic = validated_data.get('team_pic')
         project = Project.objects.get(id=self.context['view'].kwargs['project_id'])
-        member = Member.objects.filter(user=self.context['request'].user, workspace=project.workspace)
+        member = get_membership_resolver(self.context['request']).get(project.workspace_id)
 
         # check if member is in project members list
-        if not project.members.contains(member.first()):
+        if member is None or not project.members.contains(member):
             raise serializers.ValidationError({'error': 'You are not a part of this project so you cannot create a team'})
         
-        if member.first().role != 'editor':
+        if member.role != 'editor':
             raise serializers.ValidationError({'error': 'You are not an editor in the workspace'})
         
         team = Team.objects.create(
             name=name,
             team_pic=team_pic,
             project=project,
-            created_by=member.first(),
+            created_by=member,
         )
         
-        team.members.set(member)
-        team.save()
+        team.members.add(member)
         
         return team
     
 
-class TeamDetailsSerializer(serializers.ModelSerializer):
+class TeamDetailsSerializer(SparseFieldsetMixin, EagerLoadingMixin, serializers.ModelSerializer):
     '''Serializer for team details'''
     
+    prefetch_related_fields = {'members': MemberSerializer}
+    
     members = MemberSerializer(many=True, read_only=True)
     
     class Meta:
@@ -1,3 +1,62 @@
-from django.test import TestCase
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 
-# Create your tests here.
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from project.tests import create_project
+from team.models import Team
+from workspace.tests import add_members, create_user, create_workspace
+
+
+class TeamQueryCountTestCase(APITestCase):
+    '''Test case to guard the number of queries run by team endpoints'''
+    
+    def setUp(self):
+        self.user = create_user('test@gmail.com')
+        self.workspace = create_workspace(self.user)
+        self.project = create_project(self.workspace)
+        self.client.force_authenticate(user=self.user)
+        
+    def test_create_team(self):
+        # 15 queries before the membership resolver
+        with self.assertNumQueries(9):
+            response = self.client.post(reverse('team:create-team', kwargs={'project_id': self.project.id}), {'name': 'team'})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        
+    def test_update_team(self):
+        team = Team.objects.create(name='team', project=self.project)
+        
+        # 8 queries before the membership resolver, 6 before the denormalized workspace
+        with self.assertNumQueries(5):
+            response = self.client.patch(reverse('team:team-details', kwargs={'team_id': team.id}), {'name': 'new team'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+    def test_list_teams(self):
+        url = reverse('team:all-teams-in-project', kwargs={'project_id': self.project.id})
+        Team.objects.create(name='first', project=self.project).members.add(*add_members(self.workspace, 2))
+        
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(len(response.data['results']), 1)
+        
+        for i in range(3):
+            Team.objects.create(name=f'team {i}', project=self.project).members.add(*add_members(self.workspace, 3))
+        
+        with self.assertNumQueries(len(queries)):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data['results']), 4)
+        
+    def test_bulk_add_and_remove_members(self):
+        team = Team.objects.create(name='team', project=self.project)
+        members = add_members(self.workspace, 3)
+        member_ids = [str(member.id) for member in members]
+        
+        response = self.client.post(reverse('team:add-team-members', kwargs={'team_id': team.id}), {'member_ids': member_ids}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(team.members.count(), 3)
+        
+        response = self.client.post(reverse('team:remove-team-members', kwargs={'team_id': team.id}), {'member_ids': member_ids}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(team.members.count(), 0)
@@ -9,4 +9,6 @@ urlpatterns = [
     path('project/<uuid:project_id>/all/', views.GetAllProjectTeams.as_view(), name='all-teams-in-project'),
     path('<uuid:team_id>/member/<uuid:member_id>/add/', views.AddMemberToTeamView.as_view(), name='add-team-member'),
     path('<uuid:team_id>/member/<uuid:member_id>/remove/', views.RemoveMemberFromTeamView.as_view(), name='remove-team-member'),
+    path('<uuid:team_id>/members/add/', views.BulkAddMembersToTeamView.as_view(), name='add-team-members'),
+    path('<uuid:team_id>/members/remove/', views.BulkRemoveMembersFromTeamView.as_view(), name='remove-team-members'),
 ]
\ No newline at end of file
@@ -7,6 +7,8 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
 
 from project.models import Project
+from project_management_api.serializers import Fieldset
+from project_management_api.views import BulkMembersView, ConditionalGetMixin, FastListMixin, StreamingListMixin
 from team.models import Team
 from workspace.models import Member
 from workspace.permissions import IsMemberOrReadOnly, IsWorkspaceOwnerOrEditorOrReadOnly
@@ -23,16 +25,18 @@ class CreateTeamView(generics.CreateAPIView):
     queryset = Team.objects.all()
     
 
-class TeamDetailsView(generics.RetrieveUpdateDestroyAPIView):
+class TeamDetailsView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     '''View to get, update, and delete teams'''
     
     permission_classes = [IsAuthenticated, IsWorkspaceOwnerOrEditorOrReadOnly]
     serializer_class = serializers.TeamDetailsSerializer
+    lookup_url_kwarg = 'team_id'
 
-    def get(self, request, *args, **kwargs):
+    def retrieve(self, request, *args, **kwargs):
         try:
-            team = Team.objects.get(id=self.kwargs['team_id'])
-            serializer = self.serializer_class(team)
+            fieldset = Fieldset.from_request(request)
+            team = self.serializer_class.setup_eager_loading(Team.objects, fieldset).get(id=self.kwargs['team_id'])
+            serializer = self.serializer_class(team, context={'fieldset': fieldset})
             return Response(serializer.data, status=status.HTTP_200_OK)
         except Team.DoesNotExist:
             return Response({'error': 'Team doe snot exist'}, status=status.HTTP_404_NOT_FOUND)
@@ -63,7 +67,7 @@ class AddMemberToTeamView(APIView):
     
     def post(self, request, team_id, member_id):
         team = Team.objects.get(id=self.kwargs['team_id'])
-        members = Member.objects.filter(id=self.kwargs['member_id'], workspace=team.project.workspace)
+        members = Member.objects.filter(id=self.kwargs['member_id'], workspace_id=team.workspace_id)
         self.check_object_permissions(request, obj=team)
         
         if not members.exists():
@@ -92,7 +96,7 @@ class RemoveMemberFromTeamView(APIView):
     
     def post(self, request, team_id, member_id):
         team = Team.objects.get(id=self.kwargs['team_id'])
-        members = Member.objects.filter(id=self.kwargs['member_id'], workspace=team.project.workspace)
+        members = Member.objects.filter(id=self.kwargs['member_id'], workspace_id=team.workspace_id)
         self.check_object_permissions(request, obj=team)
         
         if not members.exists():
@@ -114,7 +118,22 @@ class RemoveMemberFromTeamView(APIView):
             return Response({'error': 'Team does not exist'}, status=status.HTTP_404_NOT_FOUND)
            
 
-class GetAllProjectTeams(generics.ListAPIView):
+class BulkAddMembersToTeamView(BulkMembersView):
+    '''View to add many members to a team at once'''
+    
+    model = Team
+    lookup_url_kwarg = 'team_id'
+    
+    
+class BulkRemoveMembersFromTeamView(BulkMembersView):
+    '''View to remove many members from a team at once'''
+    
+    model = Team
+    lookup_url_kwarg = 'team_id'
+    remove = True
+    
+
+class GetAllProjectTeams(ConditionalGetMixin, FastListMixin, StreamingListMixin, generics.ListAPIView):
     '''View to get all teams in a specific project'''
     
     permission_classes = [IsAuthenticated]
@@ -122,16 +141,14 @@ class GetAllProjectTeams(generics.ListAPIView):
     
     def get_queryset(self):
         project = Project.objects.get(id=self.kwargs['project_id'])
-        teams = Team.objects.filter(project=project)
+        teams = self.serializer_class.setup_eager_loading(Team.objects.filter(project=project), Fieldset.from_request(self.request))
         return teams
     
     def list(self, request, *args, **kwargs):
-        project = Project.objects.get(id=self.kwargs['project_id'])
-        teams = Team.objects.filter(project=project)
-        serializer = self.serializer_class(teams, many=True)
+        teams = self.get_page_data(self.get_queryset())
         
-        if teams.exists():
-            return Response(serializer.data, status=status.HTTP_200_OK)
+        if teams:
+            return self.get_paginated_response(teams)
         else:
             return Response({'error': 'There are no teams in this project'}, status=status.HTTP_204_NO_CONTENT)
         
\ No newline at end of file
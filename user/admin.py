@@ -3,7 +3,7 @@ from django.contrib import admin
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 
-from user.models import BlacklistedToken, Token
+from user.models import BlacklistedToken, QueuedEmail, Token
 from .forms import UserChangeForm, UserCreationForm
 from django.contrib.auth import get_user_model
 from django.utils.translation import gettext_lazy as _
@@ -36,3 +36,4 @@ class UserAdmin(UserAdmin):
 admin.site.register(User, UserAdmin)
 admin.site.register(Token)
 admin.site.register(BlacklistedToken)
+admin.site.register(QueuedEmail)
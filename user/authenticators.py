@@ -1,6 +1,77 @@
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
 from rest_framework.authentication import BaseAuthentication
 from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
 from .models import BlacklistedToken
+from .tokens import get_token_key
+
+
+class BlacklistCache:
+    '''
+    Per-process cache of blacklisted tokens.\n
+    The whole blacklist is loaded into memory once and topped up every `BLACKLIST_CACHE_TTL` seconds with rows
+    timestamped since `BLACKLIST_CACHE_OVERLAP` seconds before the last load, so checking a token that was never
+    blacklisted costs no database round trip. Rows are picked up by timestamp rather than by id, as ids are not
+    committed in order, and the overlap catches rows committed after a load that started after they were
+    timestamped. Tokens are kept by their `jti` so the memory footprint stays small.
+    '''
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tokens = {}
+        self._since = None
+        self._loaded_at = None
+
+    def _is_stale(self):
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > settings.BLACKLIST_CACHE_TTL
+
+    def refresh(self):
+        '''Function to load blacklisted tokens created since the last refresh and drop expired ones'''
+
+        with self._lock:
+            # expired tokens are rejected by the jwt authentication anyway
+            now = timezone.now()
+            self._tokens = {jti: expiration_date for jti, expiration_date in self._tokens.items() if expiration_date >= now}
+
+            rows = BlacklistedToken.objects.all()
+
+            if self._since is not None:
+                rows = rows.filter(timestamp__gte=self._since - timedelta(seconds=settings.BLACKLIST_CACHE_OVERLAP))
+
+            for jti, expiration_date in rows.values_list('jti', 'expiration_date'):
+                self._tokens[jti] = expiration_date
+
+            self._since = now
+            self._loaded_at = time.monotonic()
+
+    def add(self, jti, expiration_date):
+        with self._lock:
+            self._tokens[jti] = expiration_date
+
+    def get(self, jti):
+        '''Function to get the expiration date of a blacklisted token or None if the token is not blacklisted'''
+
+        if self._is_stale():
+            self.refresh()
+
+        return self._tokens.get(jti)
+
+    def clear(self):
+        with self._lock:
+            self._tokens = {}
+            self._since = None
+            self._loaded_at = None
+
+
+blacklist_cache = BlacklistCache()
+
 
 class BlacklistTokenAuthentication(BaseAuthentication):
     def authenticate(self, request):
@@ -11,13 +82,55 @@ class BlacklistTokenAuthentication(BaseAuthentication):
             
             if access_token is None:
                 return None
+            
+            # leave malformed tokens for the jwt authentication to reject
+            jti = get_token_key(access_token)
+            if jti is None:
+                return None
+
+            if settings.BLACKLIST_CACHE_ENABLED:
+                expiration_date = blacklist_cache.get(jti)
+                if expiration_date is None:
+                    return None
+
+                blacklisted_token = BlacklistedToken(jti=jti, expiration_date=expiration_date)
+                if blacklisted_token.is_expired():
+                    raise AuthenticationFailed('Token is expired')
+                else:
+                    raise AuthenticationFailed('Token is blacklisted')
 
             try:
-                blacklisted_token = BlacklistedToken.objects.get(token=access_token)
+                blacklisted_token = BlacklistedToken.objects.get(jti=jti)
                 if blacklisted_token.is_expired():
                     raise AuthenticationFailed('Token is expired')
                 else:
                     raise AuthenticationFailed('Token is blacklisted')
             except BlacklistedToken.DoesNotExist:
                 return None
-    
\ No newline at end of file
+
+
+def user_cache_key(user_id):
+    return f'authenticated-user:{user_id}'
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    '''
+    JWT authentication that keeps authenticated users in the `USER_CACHE` cache for `USER_CACHE_TTL` seconds.\n
+    Cached users are dropped whenever they are saved or deleted (see signals.py), so the permission classes never act
+    on stale `is_active`, `is_verified` or `subscription_plan` values. Users are not cached when `USER_CACHE` is None,
+    as a cache that is not shared by every process would keep them stale in the processes that did not save them.
+    '''
+    
+    def get_user(self, validated_token):
+        if settings.USER_CACHE is None:
+            return super().get_user(validated_token)
+        
+        user_cache = caches[settings.USER_CACHE]
+        key = user_cache_key(validated_token.get(api_settings.USER_ID_CLAIM))
+        user = user_cache.get(key)
+        
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(key, user, settings.USER_CACHE_TTL)
+            
+        return user
@@ -0,0 +1,139 @@
+import logging
+import threading
+from datetime import timedelta
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import close_old_connections
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import QueuedEmail
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_email(subject, body, email):
+    '''Function to add an email to the outbound queue'''
+
+    return QueuedEmail.objects.create(subject=subject, body=body, email=email)
+
+
+class MailWorker(threading.Thread):
+    '''
+    Worker that sends queued emails in batches.\n
+    The worker keeps one authenticated connection to the mail server open across batches while there is a backlog,
+    and closes it when the queue runs dry, as mail servers drop idle connections and the first email sent on a dropped
+    one would fail. It also reconnects after an error. Failed emails are retried with an exponential backoff until
+    `EMAIL_QUEUE_MAX_ATTEMPTS`.
+    '''
+
+    def __init__(self, batch_size=None, poll_interval=None):
+        super().__init__(name='mail-worker', daemon=True)
+        self.batch_size = batch_size or settings.EMAIL_QUEUE_BATCH_SIZE
+        self.poll_interval = poll_interval or settings.EMAIL_QUEUE_POLL_INTERVAL
+        self.worker_id = uuid4().hex
+        self.connection = None
+        self.stopped = threading.Event()
+
+    def claim_batch(self):
+        '''Function to claim a batch of due emails for this worker so no other worker sends them'''
+
+        now = timezone.now()
+        # emails claimed by a worker that died while sending are claimed again
+        stale = now - timedelta(seconds=settings.EMAIL_QUEUE_CLAIM_TIMEOUT)
+
+        ids = list(
+            QueuedEmail.objects.filter(
+                Q(status=QueuedEmail.PENDING, next_attempt_at__lte=now) |
+                Q(status=QueuedEmail.SENDING, claimed_at__lt=stale)
+            ).order_by('next_attempt_at').values_list('id', flat=True)[:self.batch_size]
+        )
+
+        QueuedEmail.objects.filter(
+            Q(status=QueuedEmail.PENDING) | Q(status=QueuedEmail.SENDING, claimed_at__lt=stale),
+            id__in=ids,
+        ).update(status=QueuedEmail.SENDING, claimed_by=self.worker_id, claimed_at=now)
+
+        return list(QueuedEmail.objects.filter(status=QueuedEmail.SENDING, claimed_by=self.worker_id))
+
+    def get_connection(self):
+        if self.connection is None:
+            self.connection = get_connection()
+            self.connection.open()
+
+        return self.connection
+
+    def close_connection(self):
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            except Exception:
+                pass
+            self.connection = None
+
+    def send(self, queued_email):
+        message = EmailMessage(
+            subject=queued_email.subject,
+            body=queued_email.body,
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[queued_email.email],
+            connection=self.get_connection(),
+        )
+        message.send()
+
+    def mark_failed(self, queued_email, error):
+        queued_email.attempts += 1
+        queued_email.last_error = str(error)
+        queued_email.claimed_by = ''
+
+        if queued_email.attempts >= settings.EMAIL_QUEUE_MAX_ATTEMPTS:
+            queued_email.status = QueuedEmail.FAILED
+        else:
+            delay = settings.EMAIL_QUEUE_RETRY_DELAY * 2 ** (queued_email.attempts - 1)
+            queued_email.status = QueuedEmail.PENDING
+            queued_email.next_attempt_at = timezone.now() + timedelta(seconds=delay)
+
+        queued_email.save(update_fields=['attempts', 'last_error', 'claimed_by', 'status', 'next_attempt_at'])
+
+    def run_once(self):
+        '''Function to send one batch of due emails. Returns the number of emails sent'''
+
+        sent_ids = []
+
+        for queued_email in self.claim_batch():
+            try:
+                self.send(queued_email)
+                sent_ids.append(queued_email.id)
+            except Exception as e:
+                logger.warning('Sending email %s to %s failed: %s', queued_email.id, queued_email.email, e)
+                # the connection may be in a broken state so start over with a new one
+                self.close_connection()
+                self.mark_failed(queued_email, e)
+
+        QueuedEmail.objects.filter(id__in=sent_ids).update(status=QueuedEmail.SENT, sent_at=timezone.now(), claimed_by='')
+        return len(sent_ids)
+
+    def run(self):
+        try:
+            while not self.stopped.is_set():
+                try:
+                    sent = self.run_once()
+                except Exception:
+                    logger.exception('Mail worker %s failed to process a batch', self.worker_id)
+                    self.close_connection()
+                    sent = 0
+                finally:
+                    close_old_connections()
+
+                # keep going while there is a backlog, otherwise wait for new emails without holding a connection
+                # the mail server would drop while idle
+                if sent < self.batch_size:
+                    self.close_connection()
+                    self.stopped.wait(self.poll_interval)
+        finally:
+            self.close_connection()
+
+    def stop(self):
+        self.stopped.set()
@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from user.sweeper import purge_expired_tokens
+
+
+class Command(BaseCommand):
+    help = 'Delete expired tokens and blacklisted tokens in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, help='Number of rows deleted per statement (default: TOKEN_SWEEPER_BATCH_SIZE)')
+        parser.add_argument('--pause', type=float, default=0, help='Seconds to wait between batches')
+
+    def handle(self, *args, **options):
+        removed, elapsed = purge_expired_tokens(options['batch_size'] or settings.TOKEN_SWEEPER_BATCH_SIZE, options['pause'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Removed {removed['tokens']} tokens and {removed['blacklisted_tokens']} blacklisted tokens in {elapsed:.2f}s"
+        ))
@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from user.mailer import MailWorker
+
+
+class Command(BaseCommand):
+    help = 'Send emails from the outbound email queue with a pool of mail workers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2, help='Number of mail workers')
+        parser.add_argument('--batch-size', type=int, default=None, help='Number of emails each worker claims at a time')
+        parser.add_argument('--once', action='store_true', help='Send one batch per worker and exit')
+
+    def handle(self, *args, **options):
+        workers = [MailWorker(batch_size=options['batch_size']) for _ in range(options['workers'])]
+
+        if options['once']:
+            sent = 0
+            for worker in workers:
+                sent += worker.run_once()
+                worker.close_connection()
+            self.stdout.write(self.style.SUCCESS(f'Sent {sent} emails'))
+            return
+
+        for worker in workers:
+            worker.start()
+
+        self.stdout.write(f"Started {options['workers']} mail workers")
+
+        try:
+            while any(worker.is_alive() for worker in workers):
+                time.sleep(1)
+        except KeyboardInterrupt:
+            for worker in workers:
+                worker.stop()
+            for worker in workers:
+                worker.join()
@@ -0,0 +1,36 @@
+# Generated by Django 5.0.1 on 2026-10-17 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0014_token'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='blacklistedtoken',
+            unique_together=set(),
+        ),
+        migrations.AlterUniqueTogether(
+            name='token',
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name='blacklistedtoken',
+            name='jti',
+            field=models.CharField(max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='token',
+            name='jti',
+            field=models.CharField(max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='token',
+            name='expiration_date',
+            field=models.DateTimeField(null=True),
+        ),
+    ]
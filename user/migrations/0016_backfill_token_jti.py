@@ -0,0 +1,44 @@
+# Generated by Django 5.0.1 on 2026-10-17 09:13
+
+import jwt
+from django.db import migrations
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from user.tokens import get_token_key
+
+
+def get_expiration_date(token):
+    payload = jwt.decode(token, options={'verify_signature': False})
+    return datetime_from_epoch(payload['exp'])
+
+
+def backfill_jti(apps, schema_editor):
+    '''Replace stored token strings with their jti, dropping rows that cannot be decoded or are duplicates'''
+
+    for model_name in ['Token', 'BlacklistedToken']:
+        model = apps.get_model('user', model_name)
+        seen = set()
+
+        for row in model.objects.all().iterator():
+            jti = get_token_key(row.token)
+
+            if jti is None or jti in seen:
+                row.delete()
+                continue
+
+            seen.add(jti)
+            row.jti = jti
+            if model_name == 'Token':
+                row.expiration_date = get_expiration_date(row.token)
+            row.save(update_fields=['jti', 'expiration_date'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0015_token_jti_blacklistedtoken_jti'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_jti, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.0.1 on 2026-10-17 09:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0016_backfill_token_jti'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='blacklistedtoken',
+            name='token',
+        ),
+        migrations.RemoveField(
+            model_name='token',
+            name='token',
+        ),
+        migrations.AlterField(
+            model_name='blacklistedtoken',
+            name='jti',
+            field=models.CharField(max_length=64, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='token',
+            name='jti',
+            field=models.CharField(max_length=64, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='token',
+            name='expiration_date',
+            field=models.DateTimeField(),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.1 on 2026-10-17 10:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0017_remove_token_token_remove_blacklistedtoken_token_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='blacklistedtoken',
+            name='expiration_date',
+            field=models.DateTimeField(db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='token',
+            name='expiration_date',
+            field=models.DateTimeField(db_index=True),
+        ),
+    ]
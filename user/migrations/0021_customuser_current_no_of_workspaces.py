@@ -0,0 +1,34 @@
+# Generated by Django 5.0.1 on 2026-10-17 01:01
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_workspace_count(apps, schema_editor):
+    '''Count the workspaces each user is a member of'''
+
+    CustomUser = apps.get_model('user', 'CustomUser')
+    Member = apps.get_model('workspace', 'Member')
+    
+    CustomUser.objects.update(current_no_of_workspaces=Coalesce(
+        Subquery(Member.objects.filter(user=OuterRef('pk')).order_by().values('user').annotate(count=Count('pk')).values('count')),
+        Value(0),
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0020_alter_customuser_id'),
+        ('workspace', '0016_alter_member_options_alter_member_user_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='current_no_of_workspaces',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_workspace_count, migrations.RunPython.noop),
+    ]
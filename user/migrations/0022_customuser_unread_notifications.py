@@ -0,0 +1,37 @@
+# Generated by Django 5.0.1 on 2026-10-17 01:11
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_unread_count(apps, schema_editor):
+    '''Count the unread notifications each user has received'''
+
+    CustomUser = apps.get_model('user', 'CustomUser')
+    Notification = apps.get_model('notification', 'Notification')
+
+    CustomUser.objects.update(unread_notifications=Coalesce(
+        Subquery(
+            Notification.objects.filter(receiver=OuterRef('pk'), is_read=False).order_by().values('receiver')
+            .annotate(count=Count('pk')).values('count')
+        ),
+        Value(0),
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0021_customuser_current_no_of_workspaces'),
+        ('notification', '0006_notification_is_read_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='unread_notifications',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_unread_count, migrations.RunPython.noop),
+    ]
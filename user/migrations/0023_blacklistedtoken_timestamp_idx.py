@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-17 02:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0022_customuser_unread_notifications'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='blacklistedtoken',
+            name='timestamp',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
@@ -1,15 +1,16 @@
-from datetime import datetime, timezone
 import os
 
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin
 from django.utils.translation import gettext_lazy
-from uuid import uuid4
+from project_management_api.ids import uuid7
+from project_management_api.quotas import UsageCountersMixin
 
 from .manager import CustomUserManager
 
 # Create your models here.
-class CustomUser(AbstractBaseUser, PermissionsMixin):
+class CustomUser(UsageCountersMixin, AbstractBaseUser, PermissionsMixin):
     '''Custom user model'''
     
     def upload_image(model, filename):
@@ -28,7 +29,7 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
         (ULTIMATE, 'Ultimate'),
     ]
 
-    id = models.UUIDField(default=uuid4, primary_key=True)
+    id = models.UUIDField(default=uuid7, primary_key=True)
     email = models.EmailField(gettext_lazy('email address'), unique=True, null=False)
     first_name = models.CharField(max_length=128, null=False)
     last_name = models.CharField(max_length=128, null=False)
@@ -36,6 +37,10 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
     phone_number = models.CharField(max_length=11, null=False)
     is_verified = models.BooleanField(default=False)
     subscription_plan = models.CharField(choices=subscription_choices, default=STARTER, null=False, max_length=10)
+    # number of workspaces the user is a member of, see project_management_api/quotas.py
+    current_no_of_workspaces = models.IntegerField(null=False, default=0)
+    # number of unread notifications the user has received, see notification/counters.py
+    unread_notifications = models.IntegerField(null=False, default=0)
     
     is_active = models.BooleanField(default=True)
     is_superuser = models.BooleanField(default=False)
@@ -48,39 +53,71 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
     REQUIRED_FIELDS = []
 
     objects = CustomUserManager()
+    
+    usage_counters = ['current_no_of_workspaces', 'unread_notifications']
 
     def __str__(self):
         return self.email
 
 
 class Token(models.Model):
-    '''A model to store user access tokens'''
+    '''A model to store the ids (jti) of issued user access tokens'''
     
-    token = models.CharField(max_length=500)
+    jti = models.CharField(max_length=64, unique=True)
     user = models.ForeignKey(CustomUser, related_name="user_token", on_delete=models.CASCADE)
     timestamp = models.DateTimeField(auto_now=True)
+    expiration_date = models.DateTimeField(db_index=True)
     
     def __str__(self):
         return f'{self.user.email}'
-
-    class Meta:
-        unique_together = ("token", "user")
         
 
 class BlacklistedToken(models.Model):
-    '''A model to store blacklisted tokens'''
+    '''A model to store the ids (jti) of blacklisted tokens'''
     
-    token = models.CharField(max_length=500)
+    jti = models.CharField(max_length=64, unique=True)
     user = models.ForeignKey(CustomUser, related_name="token_user", on_delete=models.CASCADE)
-    timestamp = models.DateTimeField(auto_now=True)
-    expiration_date = models.DateTimeField()
+    timestamp = models.DateTimeField(auto_now=True, db_index=True)
+    expiration_date = models.DateTimeField(db_index=True)
 
     def is_expired(self):
-        return self.expiration_date.replace(tzinfo=None) < datetime.now().replace(tzinfo=None)
+        return self.expiration_date < timezone.now()
     
     def __str__(self):
         return f'{self.user.email}'
+        
 
+class QueuedEmail(models.Model):
+    '''A model to store outbound emails until a mail worker sends them'''
+    
+    PENDING = 'pending'
+    SENDING = 'sending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    
+    status_choices = [
+        (PENDING, 'Pending'),
+        (SENDING, 'Sending'),
+        (SENT, 'Sent'),
+        (FAILED, 'Failed'),
+    ]
+    
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    email = models.EmailField()
+    status = models.CharField(choices=status_choices, default=PENDING, max_length=7)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, default='')
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claimed_by = models.CharField(max_length=64, blank=True, default='')
+    claimed_at = models.DateTimeField(null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True)
+    
+    def __str__(self):
+        return f'{self.subject} | {self.email} | {self.status}'
+    
     class Meta:
-        unique_together = ("token", "user")
-        
\ No newline at end of file
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
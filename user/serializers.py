@@ -5,7 +5,9 @@ from rest_framework import serializers
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.exceptions import TokenError
 
+from project_management_api.serializers import SparseFieldsetMixin
 from .models import Token
+from .tokens import get_token_expiration_date
 
 User = get_user_model()
 
@@ -104,22 +106,25 @@ class LoginSerializer(serializers.Serializer):
 
         # create token for jwt
         refresh_token = RefreshToken.for_user(user=user)
+        # access_token creates a new token each time it is accessed
+        access_token = refresh_token.access_token
         
         Token.objects.create(
-            token=str(refresh_token.access_token),
-            user=user
+            jti=access_token['jti'],
+            user=user,
+            expiration_date=get_token_expiration_date(access_token)
         )
         
         data['message'] = f'Welcome {email}'
         data['token'] = {
             'refresh': str(refresh_token),
-            'access': str(refresh_token.access_token)
+            'access': str(access_token)
         }
 
         return data
 
     
-class UserDetailsSerializer(serializers.ModelSerializer):
+class UserDetailsSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
 
     '''Serializer to update a user's details.'''
 
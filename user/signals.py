@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authenticators import blacklist_cache, user_cache_key
+from .models import BlacklistedToken, CustomUser
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def add_token_to_blacklist_cache(sender, instance, created, **kwargs):
+    '''Make a newly blacklisted token visible to this process straight away'''
+
+    blacklist_cache.add(instance.jti, instance.expiration_date)
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def remove_user_from_cache(sender, instance, **kwargs):
+    '''Drop a saved user from the authenticated user cache'''
+
+    if settings.USER_CACHE is not None:
+        caches[settings.USER_CACHE].delete(user_cache_key(instance.id))
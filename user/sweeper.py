@@ -0,0 +1,81 @@
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .models import BlacklistedToken, Token
+
+logger = logging.getLogger(__name__)
+
+
+def delete_expired(model, batch_size=500, pause=0):
+    '''
+    Function to delete expired rows of a token model in batches.\n
+    Each batch is deleted in its own short statement so the table is never locked for long.
+    Returns the number of rows deleted.
+    '''
+
+    now = timezone.now()
+    deleted = 0
+
+    while True:
+        ids = list(model.objects.filter(expiration_date__lt=now).values_list('id', flat=True)[:batch_size])
+        if not ids:
+            break
+
+        count, _ = model.objects.filter(id__in=ids).delete()
+        deleted += count
+
+        if pause:
+            time.sleep(pause)
+
+    return deleted
+
+
+def purge_expired_tokens(batch_size=500, pause=0):
+    '''Function to delete expired tokens and blacklisted tokens. Returns the rows removed per model and the time taken'''
+
+    start = time.perf_counter()
+    removed = {
+        'tokens': delete_expired(Token, batch_size, pause),
+        'blacklisted_tokens': delete_expired(BlacklistedToken, batch_size, pause),
+    }
+
+    return removed, time.perf_counter() - start
+
+
+class TokenSweeper(threading.Thread):
+    '''Background thread that purges expired tokens every `TOKEN_SWEEPER_INTERVAL` seconds'''
+
+    def __init__(self, interval, batch_size=500):
+        super().__init__(name='token-sweeper', daemon=True)
+        self.interval = interval
+        self.batch_size = batch_size
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                removed, elapsed = purge_expired_tokens(self.batch_size)
+                logger.info('Purged %s tokens and %s blacklisted tokens in %.2fs', removed['tokens'], removed['blacklisted_tokens'], elapsed)
+            except Exception:
+                logger.exception('Purging expired tokens failed')
+            finally:
+                close_old_connections()
+
+    def stop(self):
+        self.stopped.set()
+
+
+def start_token_sweeper():
+    '''Function to start the background token sweeper if `TOKEN_SWEEPER_INTERVAL` is set'''
+
+    if not settings.TOKEN_SWEEPER_INTERVAL:
+        return None
+
+    sweeper = TokenSweeper(settings.TOKEN_SWEEPER_INTERVAL, settings.TOKEN_SWEEPER_BATCH_SIZE)
+    sweeper.start()
+    return sweeper
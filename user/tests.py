@@ -1,18 +1,30 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.test import override_settings
 from django.urls import reverse
+from django.utils import timezone
 
 from rest_framework import status
 from rest_framework.test import APITestCase
 from rest_framework_simplejwt.tokens import RefreshToken
 
-from .models import CustomUser, Token
+from .authenticators import blacklist_cache
+from .mailer import MailWorker
+from .models import BlacklistedToken, CustomUser, QueuedEmail, Token
+from .tokens import get_token_key
 from .import serializers
 
 
 def authorize(client):
     '''Function to authorize the user'''
     
-    token = Token.objects.get(user__email='test@gmail.com')
-    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token.token}')
+    user = CustomUser.objects.get(email='test@gmail.com')
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
     
 
 class RegisterTestCase(APITestCase):
@@ -64,5 +76,249 @@ class LoginLogoutTestCase(APITestCase):
     #     response = self.client.post(reverse('user:logout'))
     #     # response.headers['Authorization'] = f'Bearer {self.token}'
     #     self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class BlacklistCacheTestCase(APITestCase):
+    '''Test case for the in-process blacklisted token cache'''
+    
+    def setUp(self):
+        blacklist_cache.clear()
+        self.user = CustomUser.objects.create(
+            email = 'test@gmail.com', 
+            first_name= 'test', 
+            last_name = 'tester', 
+            password = 'Testing@03', 
+            phone_number = '08012345678', 
+            subscription_plan = 'starter',
+            is_verified = True
+        )
+        
+        response = self.client.post(reverse('user:login'), {'email': 'test@gmail.com', 'password': 'Testing@03'})
+        self.token = response.data['token']['access']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        
+    @override_settings(USER_CACHE='default')
+    def test_valid_token_skips_blacklist_query(self):
+        # warm up the cache
+        self.client.get(reverse('user:user-details'))
+        
+        # both the blacklist and the authenticated user are served from memory
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('user:user-details'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+    def test_logged_out_token_is_rejected(self):
+        self.client.get(reverse('user:user-details'))
+        
+        response = self.client.post(reverse('user:logout'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        response = self.client.get(reverse('user:user-details'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        
+    def test_token_committed_out_of_order(self):
+        expiration_date = timezone.now() + timedelta(hours=1)
+        # blacklisted by other processes, without this process's signal
+        BlacklistedToken.objects.bulk_create([BlacklistedToken(id=10, jti='other', user=self.user, expiration_date=expiration_date)])
+        self.client.get(reverse('user:user-details'))
+        
+        # a lower id committed after a higher one was loaded
+        BlacklistedToken.objects.bulk_create([BlacklistedToken(id=5, jti=get_token_key(self.token), user=self.user, expiration_date=expiration_date)])
+        
+        with override_settings(BLACKLIST_CACHE_TTL=0):
+            response = self.client.get(reverse('user:user-details'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        
+    def test_logged_out_concurrently(self):
+        self.client.get(reverse('user:user-details'))
+        
+        # the token is blacklisted by another process before this process's cache picks it up
+        BlacklistedToken.objects.bulk_create([
+            BlacklistedToken(jti=get_token_key(self.token), user=self.user, expiration_date=timezone.now() + timedelta(hours=1))
+        ])
+        
+        response = self.client.post(reverse('user:logout'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(BlacklistedToken.objects.filter(jti=get_token_key(self.token)).count(), 1)
+
+
+class PurgeExpiredTokensTestCase(APITestCase):
+    '''Test case for purging expired tokens'''
+    
+    def setUp(self):
+        self.user = CustomUser.objects.create(
+            email = 'test@gmail.com', 
+            first_name= 'test', 
+            last_name = 'tester', 
+            password = 'Testing@03', 
+            phone_number = '08012345678', 
+            subscription_plan = 'starter',
+            is_verified = True
+        )
+        
+        past = timezone.now() - timedelta(hours=1)
+        future = timezone.now() + timedelta(hours=1)
+        
+        for i in range(3):
+            Token.objects.create(jti=f'expired-{i}', user=self.user, expiration_date=past)
+            BlacklistedToken.objects.create(jti=f'expired-{i}', user=self.user, expiration_date=past)
+            
+        Token.objects.create(jti='valid', user=self.user, expiration_date=future)
+        BlacklistedToken.objects.create(jti='valid', user=self.user, expiration_date=future)
         
+    def test_purge_expired_tokens(self):
+        out = StringIO()
+        call_command('purge_expired_tokens', batch_size=2, stdout=out)
+        
+        self.assertIn('Removed 3 tokens and 3 blacklisted tokens', out.getvalue())
+        self.assertEqual(list(Token.objects.values_list('jti', flat=True)), ['valid'])
+        self.assertEqual(list(BlacklistedToken.objects.values_list('jti', flat=True)), ['valid'])
+        
+    @override_settings(TOKEN_SWEEPER_BATCH_SIZE=2)
+    def test_batch_size_defaults_to_setting(self):
+        with mock.patch('user.management.commands.purge_expired_tokens.purge_expired_tokens', return_value=({'tokens': 0, 'blacklisted_tokens': 0}, 0)) as purge:
+            call_command('purge_expired_tokens', stdout=StringIO())
+        
+        purge.assert_called_once_with(2, 0)
+
+
+@override_settings(USER_CACHE='default')
+class UserCacheTestCase(APITestCase):
+    '''Test case for the authenticated user cache'''
     
+    def setUp(self):
+        self.user = CustomUser.objects.create(
+            email = 'test@gmail.com', 
+            first_name= 'test', 
+            last_name = 'tester', 
+            password = 'Testing@03', 
+            phone_number = '08012345678', 
+            subscription_plan = 'starter',
+            is_verified = True
+        )
+        authorize(self.client)
+        
+    def test_saved_user_is_dropped_from_cache(self):
+        self.client.get(reverse('user:user-details'))
+        
+        response = self.client.put(reverse('user:update-subscription'), {'subscription_plan': 'pro'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        response = self.client.get(reverse('user:user-details'))
+        self.assertEqual(response.data['subscription_plan'], 'pro')
+        
+    def test_deleted_account_loses_access(self):
+        self.client.get(reverse('user:user-details'))
+        
+        response = self.client.delete(reverse('user:delete-account'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        response = self.client.get(reverse('user:user-details'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        
+    @override_settings(USER_CACHE=None)
+    def test_not_cached_without_shared_cache(self):
+        self.client.get(reverse('user:user-details'))
+        
+        # deactivated by another process, whose signal does not reach this process's cache
+        CustomUser.objects.filter(id=self.user.id).update(is_active=False)
+        
+        response = self.client.get(reverse('user:user-details'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class GetUserConditionalTestCase(APITestCase):
+    '''Test case for answering GETs of unchanged users with 304 Not Modified'''
+    
+    def setUp(self):
+        self.user = CustomUser.objects.create(
+            email = 'test@gmail.com', 
+            first_name= 'test', 
+            last_name = 'tester', 
+            password = 'Testing@03', 
+            phone_number = '08012345678', 
+            subscription_plan = 'starter',
+            is_verified = True
+        )
+        authorize(self.client)
+        self.url = reverse('user:get_user', kwargs={'user_id': self.user.id})
+        
+    def test_not_modified_until_changed(self):
+        etag = self.client.get(self.url)['ETag']
+        
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        
+        response = self.client.put(reverse('user:update-subscription'), {'subscription_plan': 'pro'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['subscription_plan'], 'pro')
+        self.assertNotEqual(response['ETag'], etag)
+        
+
+class FailingEmailBackend(BaseEmailBackend):
+    '''Email backend that fails to send every message'''
+    
+    def send_messages(self, email_messages):
+        raise ConnectionRefusedError('Mail server is down')
+        
+
+class MailQueueTestCase(APITestCase):
+    '''Test case for the outbound email queue'''
+    
+    def setUp(self):
+        data = {
+            'email': 'test@gmail.com', 
+            'first_name': 'test', 
+            'last_name': 'tester', 
+            'password': 'Testing@03', 
+            'password2': 'Testing@03', 
+            'phone_number': '08012345678', 
+            'subscription_plan': 'starter'
+        }
+        
+        self.client.post(reverse('user:register'), data, format='multipart')
+        
+    def test_register_only_queues_email(self):
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(QueuedEmail.objects.filter(email='test@gmail.com', status=QueuedEmail.PENDING).count(), 1)
+        
+    def test_worker_sends_queued_email(self):
+        sent = MailWorker().run_once()
+        
+        self.assertEqual(sent, 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['test@gmail.com'])
+        self.assertEqual(QueuedEmail.objects.get().status, QueuedEmail.SENT)
+        
+    @override_settings(EMAIL_BACKEND='user.tests.FailingEmailBackend', EMAIL_QUEUE_MAX_ATTEMPTS=2)
+    def test_failed_email_is_retried_with_backoff(self):
+        MailWorker().run_once()
+        
+        queued_email = QueuedEmail.objects.get()
+        self.assertEqual(queued_email.status, QueuedEmail.PENDING)
+        self.assertEqual(queued_email.attempts, 1)
+        self.assertGreater(queued_email.next_attempt_at, timezone.now())
+        
+        # not due yet
+        self.assertEqual(MailWorker().run_once(), 0)
+        
+        QueuedEmail.objects.update(next_attempt_at=timezone.now())
+        MailWorker().run_once()
+        self.assertEqual(QueuedEmail.objects.get().status, QueuedEmail.FAILED)
+        
+    def test_worker_closes_idle_connection(self):
+        worker = MailWorker()
+        
+        def wait(timeout):
+            # the connection is closed before waiting for new emails
+            self.assertIsNone(worker.connection)
+            worker.stop()
+            
+        # the test database connection is kept open
+        with mock.patch.object(worker.stopped, 'wait', side_effect=wait), mock.patch('user.mailer.close_old_connections'):
+            worker.run()
+            
+        self.assertEqual(len(mail.outbox), 1)
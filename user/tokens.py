@@ -0,0 +1,26 @@
+import hashlib
+
+import jwt
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+
+def get_token_key(token):
+    '''
+    Function to get the compact key tokens are stored and revoked by.\n
+    This is the token's `jti` claim, or a sha256 digest of the token if it has no `jti` claim. The signature is not
+    verified here, that is left to the jwt authentication. Returns None if the token cannot be decoded.
+    '''
+
+    try:
+        payload = jwt.decode(token, options={'verify_signature': False})
+    except jwt.exceptions.DecodeError:
+        return None
+
+    return payload.get(api_settings.JTI_CLAIM) or hashlib.sha256(token.encode()).hexdigest()
+
+
+def get_token_expiration_date(token):
+    '''Function to get the expiration date of a simplejwt token object from its `exp` claim'''
+
+    return datetime_from_epoch(token['exp'])
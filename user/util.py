@@ -1,7 +1,4 @@
-import smtplib
-from pathlib import Path
-import os
-from dotenv import load_dotenv
+from .mailer import enqueue_email
 
 class Util:
     '''Utility class'''
@@ -9,26 +6,12 @@ class Util:
     @staticmethod
     def send_email(data: dict):
         '''
-        Function to send verification email to a user;s email.\n
+        Function to queue a verification email to a user's email. The email is sent by a mail worker
+        (`python manage.py send_queued_email`).\n
         In the data dictionary, the following fields showuld be provided:
             * subject - Subject of the email
             * body - The content the email should contain
             * email - The email the verification email should be sent to
         '''
         
-        BASE_DIR = Path(__file__).resolve().parent.parent
-        load_dotenv(os.path.join(BASE_DIR, ".env"))
-        
-        EMAIL_HOST_USER = os.getenv('MY_EMAIL')
-        EMAIL_HOST_PASSWORD = os.getenv('PASSWORD')
-        
-        with smtplib.SMTP('smtp.gmail.com', 587) as conn:
-            conn.starttls()
-            conn.login(user=EMAIL_HOST_USER, password=EMAIL_HOST_PASSWORD)
-            
-            conn.sendmail(
-                from_addr=EMAIL_HOST_USER, 
-                to_addrs=data['email'],
-                msg=f"Subject:{data['subject']}\n\n{data['body']}"
-            )
-            
\ No newline at end of file
+        enqueue_email(subject=data['subject'], body=data['body'], email=data['email'])
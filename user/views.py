@@ -1,4 +1,3 @@
-from datetime import datetime, timedelta
 import os
 from dotenv import load_dotenv
 from pathlib import Path
@@ -17,9 +16,11 @@ from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenViewBase
 import jwt
 
+from project_management_api.views import ConditionalGetMixin
 from user.models import BlacklistedToken, Token
 
 from . import serializers
+from .tokens import get_token_expiration_date
 from .util import Util
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -248,19 +249,17 @@ class LogoutView(APIView):
     permission_classes = [IsAuthenticated]
     
     def post(self, request):
-        # Add token to blacklisted tokens
-        BlacklistedToken.objects.create(
-            user=request.user,
-            token=request.headers.get('Authorization').split(' ')[1],
-            expiration_date=datetime.now() + timedelta(minutes=10)
+        # validated access token set by the jwt authentication
+        access_token = request.auth
+        
+        # Add token to blacklisted tokens until the token expires, once if it is logged out twice concurrently
+        BlacklistedToken.objects.get_or_create(
+            jti=access_token['jti'],
+            defaults={'user': request.user, 'expiration_date': get_token_expiration_date(access_token)}
         )
         
         # Delete token fron database
-        token = Token.objects.get(
-            user=request.user,
-            token=request.headers.get('Authorization').split(' ')[1]
-        )
-        token.delete()
+        Token.objects.filter(jti=access_token['jti']).delete()
         
         return Response({'message': 'Logged out successfully'}, status=status.HTTP_200_OK)
         
@@ -284,16 +283,17 @@ class DeleteAccountView(APIView):
         return Response({'message': 'Account deleted successfully'}, status=status.HTTP_200_OK)
     
 
-class GetUserView(generics.GenericAPIView):
+class GetUserView(ConditionalGetMixin, generics.RetrieveAPIView):
     '''View to get a user's details by id'''
     
     permission_classes = [IsAuthenticated]
     serializer_class = serializers.UserDetailsSerializer
+    lookup_url_kwarg = 'user_id'
     
     def get_object(self, user_id):
         return User.objects.get(id=user_id)
     
-    def get(self, request, user_id):
+    def retrieve(self, request, user_id):
         try:
             user = User.objects.get(id=user_id)
             serializer = self.serializer_class(user)
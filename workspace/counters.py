@@ -0,0 +1,39 @@
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from workspace.models import Member, Workspace
+
+
+def reserve_member_slot(workspace_id, count=1):
+    '''
+    Function to take `count` member slots in a workspace.\n
+    The capacity check and the increment are a single conditional UPDATE, so concurrent invites cannot push
+    `current_no_of_members` past `no_of_members_allowed`. Returns False if the workspace does not have room for them all.
+    Call it in the same transaction as the Member inserts so the slots are given back if the inserts fail.
+    '''
+    
+    return Workspace.objects.filter(
+        id=workspace_id,
+        current_no_of_members__lte=F('no_of_members_allowed') - count,
+    ).update(current_no_of_members=F('current_no_of_members') + count) == 1
+    
+
+def release_member_slot(workspace_id, count=1):
+    '''Function to give back `count` member slots after members are removed from a workspace'''
+    
+    Workspace.objects.filter(id=workspace_id, current_no_of_members__gte=count).update(
+        current_no_of_members=F('current_no_of_members') - count
+    )
+    
+
+def reconcile_member_counts():
+    '''Function to recompute every workspace's member counter from its Member rows and get the number of workspaces fixed'''
+    
+    member_count = Coalesce(
+        Subquery(
+            Member.objects.filter(workspace=OuterRef('pk')).order_by().values('workspace').annotate(count=Count('id')).values('count')
+        ),
+        Value(0),
+    )
+    
+    return Workspace.objects.exclude(current_no_of_members=member_count).update(current_no_of_members=member_count)
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from workspace.counters import reconcile_member_counts
+
+
+class Command(BaseCommand):
+    help = 'Recompute the member counter of every workspace from its members'
+
+    def handle(self, *args, **options):
+        fixed = reconcile_member_counts()
+
+        self.stdout.write(self.style.SUCCESS(f'Fixed the member counter of {fixed} workspaces'))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from project_management_api import quotas
+
+
+class Command(BaseCommand):
+    help = 'Recompute the usage counters of the subscription and plan quotas from the rows they count'
+
+    def add_arguments(self, parser):
+        parser.add_argument('quotas', nargs='*', help=f'Quotas to reconcile: {", ".join(quotas.QUOTAS)} (default: all)')
+
+    def handle(self, *args, **options):
+        for quota in options['quotas']:
+            if quota not in quotas.QUOTAS:
+                raise CommandError(f'Unknown quota {quota}')
+
+        for quota in options['quotas'] or quotas.QUOTAS:
+            fixed = quotas.reconcile(quota)
+
+            self.stdout.write(self.style.SUCCESS(f'Fixed the {quota} counter of {fixed} rows'))
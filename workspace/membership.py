@@ -0,0 +1,58 @@
+from workspace.models import Member
+
+
+class MembershipResolver:
+    '''
+    Request-scoped lookup of the logged in user's workspace memberships.\n
+    All of the user's memberships (with their workspaces) are loaded with a single query the first time one is
+    needed, and every permission class and serializer handling the request reads from that.
+    '''
+    
+    def __init__(self, user):
+        self.user = user
+        self._members = None
+        
+    @property
+    def members(self):
+        if self._members is None:
+            self._members = {
+                member.workspace_id: member
+                for member in Member.objects.filter(user=self.user).select_related('workspace')
+            }
+            
+        return self._members
+    
+    def get(self, workspace_id):
+        '''Function to get the user's member object in a workspace or None if the user is not a member'''
+        
+        return self.members.get(workspace_id)
+    
+    def is_owner_or_editor(self, workspace_id):
+        member = self.get(workspace_id)
+        
+        if member is None:
+            return False
+        
+        return (member.workspace.creator_id == self.user.id) or member.role == Member.EDITOR
+    
+    def add(self, member):
+        '''Function to record a membership of the user created during the request'''
+        
+        if self._members is not None:
+            self._members[member.workspace_id] = member
+        
+    def remove(self, workspace_id):
+        if self._members is not None:
+            self._members.pop(workspace_id, None)
+        
+
+def get_membership_resolver(request):
+    '''Function to get the membership resolver of a request, creating it on first use'''
+    
+    resolver = getattr(request, '_membership_resolver', None)
+    
+    if resolver is None or resolver.user != request.user:
+        resolver = MembershipResolver(request.user)
+        request._membership_resolver = resolver
+        
+    return resolver
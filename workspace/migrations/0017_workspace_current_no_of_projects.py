@@ -0,0 +1,34 @@
+# Generated by Django 5.0.1 on 2026-10-17 01:01
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_project_count(apps, schema_editor):
+    '''Count the projects in each workspace'''
+
+    Workspace = apps.get_model('workspace', 'Workspace')
+    Project = apps.get_model('project', 'Project')
+    
+    Workspace.objects.update(current_no_of_projects=Coalesce(
+        Subquery(Project.objects.filter(workspace=OuterRef('pk')).order_by().values('workspace').annotate(count=Count('pk')).values('count')),
+        Value(0),
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0035_alter_project_workspace_and_more'),
+        ('workspace', '0016_alter_member_options_alter_member_user_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workspace',
+            name='current_no_of_projects',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_project_count, migrations.RunPython.noop),
+    ]
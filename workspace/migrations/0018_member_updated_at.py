@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-17 02:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workspace', '0017_workspace_current_no_of_projects'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='member',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
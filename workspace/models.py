@@ -1,10 +1,11 @@
 from django.db import models
 from django.contrib.auth import get_user_model
-from uuid import uuid4
+from project_management_api.ids import uuid7
+from project_management_api.quotas import UsageCountersMixin
 
 User = get_user_model()
 
-class Workspace(models.Model):
+class Workspace(UsageCountersMixin, models.Model):
     '''Workspace model'''
     
     # Plans
@@ -18,17 +19,20 @@ class Workspace(models.Model):
         (ENTERPRISE, 'Enterprise'),
     ]
     
-    id = models.UUIDField(default=uuid4, primary_key=True)
+    id = models.UUIDField(default=uuid7, primary_key=True)
     name = models.CharField(max_length=128, null=False, unique=True)
     company_email = models.EmailField(null=False, unique=True)
     no_of_members_allowed = models.IntegerField(null=False)
     current_no_of_members = models.IntegerField(null=False, default=0)
+    current_no_of_projects = models.IntegerField(null=False, default=0)
     plan = models.CharField(choices=plan_choices, default=BASIC, null=False, max_length=10)
     creator = models.ForeignKey(User, on_delete=models.CASCADE, null=True)
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    usage_counters = ['current_no_of_members', 'current_no_of_projects']
+    
     def __str__(self):
         return self.name
   
@@ -43,14 +47,21 @@ class Member(models.Model):
         (EDITOR, 'Editor'),
     ]
     
-    id = models.UUIDField(default=uuid4, primary_key=True)
-    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True)
-    workspace = models.ForeignKey(Workspace, on_delete=models.CASCADE)
+    id = models.UUIDField(default=uuid7, primary_key=True)
+    # both foreign keys are indexed by the constraint and index in Meta
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, db_index=False)
+    workspace = models.ForeignKey(Workspace, on_delete=models.CASCADE, db_index=False)
     role = models.CharField(choices=roles, default=VIEWER, max_length=6, null=False)
     date_joined = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
         return f"{self.id} | {self.user.email} | {self.workspace.name} | {self.role}"
     
     class Meta:
-        ordering = ['workspace']
\ No newline at end of file
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'workspace'], name='unique_workspace_member'),
+        ]
+        indexes = [
+            models.Index(fields=['workspace', 'id'], name='member_workspace_idx'),
+        ]
\ No newline at end of file
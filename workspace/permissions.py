@@ -3,7 +3,19 @@ from project.models import Project
 from task.models import Task
 from team.models import Team
 
-from workspace.models import Member, Workspace
+from workspace.membership import get_membership_resolver
+from workspace.models import Workspace
+
+
+def get_workspace_id(obj):
+    '''Function to get the id of the workspace a workspace, project, task or team belongs to'''
+    
+    # Check if objects are of a certin object type to know what wworkspace object to work with
+    if isinstance(obj, Workspace):
+        return obj.id
+    elif isinstance(obj, Project) or isinstance(obj, Task) or isinstance(obj, Team):
+        return obj.workspace_id
+    
 
 class IsWorkspaceOwnerOrEditorOrReadOnly(BasePermission):
     '''Permission to check if logged in user is a workspace creator or editor'''
@@ -15,24 +27,8 @@ class IsWorkspaceOwnerOrEditorOrReadOnly(BasePermission):
         if request.method in SAFE_METHODS:
             return True
         else:
-            workspace_obj = obj
-            
-            # Check if objects are of a certin object type to know what wworkspace object to work with
-            if isinstance(obj, Workspace):
-                workspace_obj = obj
-            elif isinstance(obj, Project):
-                workspace_obj = obj.workspace
-            elif isinstance(obj, Task) or isinstance(obj, Team):
-                workspace_obj = obj.project.workspace
-            
-            # get member based on current logged in user and workspace object
-            member = Member.objects.filter(user=request.user, workspace=workspace_obj)
-            
-            # check if member exists in workspace
-            if not member.exists():
-                return False
-            
-            return (workspace_obj.creator == request.user) or member.first().role == 'editor'
+            # check member based on current logged in user and workspace object
+            return get_membership_resolver(request).is_owner_or_editor(get_workspace_id(obj))
         
         
 class IsMemberOrReadOnly(BasePermission):     
@@ -45,7 +41,7 @@ class IsMemberOrReadOnly(BasePermission):
             return True
         else:
             # get member based on current logged in user
-            member = Member.objects.get(user=request.user)
+            member = get_membership_resolver(request).get(get_workspace_id(obj))
             
             # check if member is in project members
-            return obj.members.contains(member)
+            return member is not None and obj.members.contains(member)
@@ -1,12 +1,32 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
 
+from notification import dispatcher
 from notification.models import Notification
+from project_management_api import quotas
+from project_management_api.serializers import EagerLoadingMixin, SparseFieldsetMixin
 from user.serializers import UserDetailsSerializer
+from workspace.counters import reserve_member_slot
+from workspace.membership import get_membership_resolver
 from workspace.models import Member, Workspace
 
 User = get_user_model()
 
+# Messages for users that are members of as many workspaces as their subscription allows
+OWN_WORKSPACE_LIMIT_MESSAGES = {
+    'starter': 'You are entitled to one workspace at a time. Upgrade your subscription to have access to more.',
+    'pro': 'You are entitled to only three workspaces. Upgrade your subscription to have access to more.',
+    'ultimate': 'You are entitled to seven workspaces.',
+}
+NEW_MEMBER_WORKSPACE_LIMIT_MESSAGES = {
+    'starter': 'This user you want to add is entitled to one workspace at a time.',
+    'pro': 'This user you want to add is entitled to only three workspaces.',
+    'ultimate': 'This user you want to add is entitled to seven workspaces.',
+}
+
+
 class CreateWorkspaceSerializer(serializers.ModelSerializer):
     '''Serializer to create a new workspace'''
     
@@ -18,33 +38,13 @@ class CreateWorkspaceSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'creator']
         
     def validate(self, data):
-        user = self.context['request'].user
-        
         if Workspace.objects.filter(company_email=data['company_email']).exists():
             raise serializers.ValidationError({'error': 'This email is in use by another workspace'})
         
         if data['plan'] not in ['basic', 'premium', 'enterprise']:
             raise serializers.ValidationError({'error': 'This workspace plan is not available. Choose between basic, premium, and enterprise'})
         
-        # -----------------------------------------------------
-        # CHECK USER SUBSCRIPTION RESTRICTIONS
-        # -----------------------------------------------------
-        
-        # For starter plan for the user's subscription
-        if user.subscription_plan == 'starter':
-            if Member.objects.filter(user=user).exists():
-                raise serializers.ValidationError({'error': 'You are entitled to one workspace at a time. Upgrade your subscription to have access to more.'})
-        
-        # For pro plan for the user's subscription
-        if user.subscription_plan == 'pro':
-            if Member.objects.filter(user=user).count() == 3:
-                raise serializers.ValidationError({'error': 'You are entitled to only three workspaces. Upgrade your subscription to have access to more.'})
-        
-        # For ultimate plan for the user's subscription
-        if user.subscription_plan == 'ultimate':
-            if Member.objects.filter(user=user).count() == 7:
-                raise serializers.ValidationError({'error': 'You are entitled to seven workspaces.'})
-        
+        # the user's subscription restrictions are checked when the workspace is created
         return data
         
     def create(self, validated_data):
@@ -53,43 +53,52 @@ class CreateWorkspaceSerializer(serializers.ModelSerializer):
         no_of_members_allowed = validated_data.get('no_of_members_allowed')
         creator = self.context['request'].user
         
-        # create workspace
-        workspace = Workspace.objects.create(
-            name=name,
-            company_email=company_email,
-            no_of_members_allowed=no_of_members_allowed,
-            creator=creator,
-        )
-        
-        # Add creator to member list
-        Member.objects.create(
-            user=creator,
-            workspace=workspace,
-            role='editor',
-        )
-        
-        # Increase number of members by 1
-        workspace.current_no_of_members += 1
-        workspace.save()
+        with transaction.atomic():
+            # CHECK USER SUBSCRIPTION RESTRICTIONS
+            try:
+                quotas.reserve('workspaces', creator.id)
+            except quotas.QuotaExceeded as error:
+                raise serializers.ValidationError({'error': OWN_WORKSPACE_LIMIT_MESSAGES[error.plan]})
+            
+            # create workspace, counting the creator as its first member
+            workspace = Workspace.objects.create(
+                name=name,
+                company_email=company_email,
+                no_of_members_allowed=no_of_members_allowed,
+                current_no_of_members=1,
+                creator=creator,
+            )
+            
+            # Add creator to member list
+            member = Member.objects.create(
+                user=creator,
+                workspace=workspace,
+                role='editor',
+            )
+            
+        get_membership_resolver(self.context['request']).add(member)
         
         return workspace
     
 
-class WorkspaceDetailsSerializer(serializers.ModelSerializer):
+class WorkspaceDetailsSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     '''Serializer for handling workspace details'''
     
+    select_related_fields = ['creator']
+    
     creator = serializers.StringRelatedField(read_only=True)
     
     class Meta:
         model = Workspace
         fields = '__all__'
-        read_only_fields = ['id', 'creator', 'current_no_of_members']
+        read_only_fields = ['id', 'creator', 'current_no_of_members', 'current_no_of_projects']
         
     def update(self, instance, validated_data):
         for key, value in validated_data.items():
             setattr(instance, key, value)
             
-        instance.save()
+        # save only the changed fields so a stale member counter is never written back
+        instance.save(update_fields=[*validated_data, 'updated_at'])
         return instance
     
 class UpdateWorkspaceSubscriptionSerializer(serializers.ModelSerializer):
@@ -110,14 +119,18 @@ class UpdateWorkspaceSubscriptionSerializer(serializers.ModelSerializer):
         for key, value in validated_data.items():
             setattr(instance, key, value)
             
-        instance.save()
+        # save only the changed fields so a stale member counter is never written back
+        instance.save(update_fields=[*validated_data, 'updated_at'])
         return instance
     
     
 
-class MemberSerializer(serializers.ModelSerializer):
+class MemberSerializer(SparseFieldsetMixin, EagerLoadingMixin, serializers.ModelSerializer):
     '''Serializer to add a member to a workspace and also get all members in a workspace'''
     
+    select_related_fields = ['user', 'workspace']
+    values_lookups = {'workspace': 'workspace__name'}
+    
     workspace = serializers.SerializerMethodField(read_only=True)
     user = UserDetailsSerializer(read_only=True)  
 
@@ -133,32 +146,10 @@ class MemberSerializer(serializers.ModelSerializer):
         workspace_id = self.context['view'].kwargs['workspace_id']
         user_id = self.context['view'].kwargs['user_id']
         
-        workspace = Workspace.objects.get(id=workspace_id)
-        user = User.objects.get(id=user_id)
-        
-        # -----------------------------------------------------
-        # CHECK USER SUBSCRIPTION RESTRICTIONS
-        # -----------------------------------------------------
-        
-        # For starter plan for the user's subscription
-        if user.subscription_plan == 'starter':
-            if Member.objects.filter(user=user).exists():
-                raise serializers.ValidationError({'error': 'This user you want to add is entitled to one workspace at a time.'})
-        
-        # For pro plan for the user's subscription
-        if user.subscription_plan == 'pro':
-            if Member.objects.filter(user=user).count() == 3:
-                raise serializers.ValidationError({'error': 'This user you want to add is entitled to only three workspaces.'})
-        
-        # For ultimate plan for the user's subscription
-        if user.subscription_plan == 'ultimate':
-            if Member.objects.filter(user=user).count() == 7:
-                raise serializers.ValidationError({'error': 'This user you want to add is entitled to seven workspaces.'})
-        
-        # check if workspace is full
-        if workspace.current_no_of_members == workspace.no_of_members_allowed:
-            raise serializers.ValidationError({'error': 'The workspaace is full'})
+        if Member.objects.filter(user_id=user_id, workspace_id=workspace_id).exists():
+            raise serializers.ValidationError({'error': 'This user is already a member of this workspace'})
         
+        # the user's subscription restrictions and whether the workspace is full are checked when the member is added
         return data
             
     def create(self, validated_data):
@@ -169,28 +160,116 @@ class MemberSerializer(serializers.ModelSerializer):
         user = User.objects.get(id=user_id)
         role = validated_data.get('role')
         
-        member = Member.objects.create(
-            workspace=workspace,
-            user=user,
-            role=role,
-        )
+        with transaction.atomic():
+            # CHECK USER SUBSCRIPTION RESTRICTIONS
+            try:
+                quotas.reserve('workspaces', user.id)
+            except quotas.QuotaExceeded as error:
+                raise serializers.ValidationError({'error': NEW_MEMBER_WORKSPACE_LIMIT_MESSAGES[error.plan]})
+            
+            # check if workspace is full and take a slot in one statement
+            if not reserve_member_slot(workspace.id):
+                raise serializers.ValidationError({'error': 'The workspaace is full'})
+            
+            try:
+                member = Member.objects.create(
+                    workspace=workspace,
+                    user=user,
+                    role=role,
+                )
+            except IntegrityError:
+                # added by a concurrent request since validate(), raising rolls back the reserved quota and slot too
+                raise serializers.ValidationError({'error': 'This user is already a member of this workspace'})
+            
+            # Send notification to the user referenced in url with id
+            dispatcher.notify(
+                user,
+                f'You have been added to workspace {workspace.name}',
+                sender=self.context['request'].user,
+                kind=Notification.MEMBERSHIP,
+                target=workspace,
+            )
+        
+        return member
+    
+    
+class BulkAddMembersSerializer(serializers.Serializer):
+    '''Serializer to add many users to a workspace at once'''
+    
+    user_ids = serializers.ListField(child=serializers.UUIDField(), allow_empty=False, max_length=settings.MAX_BULK_MEMBERS)
+    role = serializers.ChoiceField(choices=Member.roles, default=Member.VIEWER)
+    
+    def validate(self, data):
+        workspace_id = self.context['view'].kwargs['workspace_id']
         
-        workspace.current_no_of_members += 1
-        workspace.save()
+        # drop repeated ids, keeping the order they were sent in
+        user_ids = list(dict.fromkeys(data['user_ids']))
         
-        # Send notification
-        Notification.objects.create(
-            message=f'You have been added to workspace {workspace.name}',
-            sender=self.context['request'].user,  # current user
-            receiver=user,  # user referenced in url with id
-        )
+        users = User.objects.in_bulk(user_ids)
+        missing = [str(id) for id in user_ids if id not in users]
         
-        return member
+        if missing:
+            raise serializers.ValidationError({'error': 'These users do not exist', 'user_ids': missing})
+        
+        existing = list(Member.objects.filter(workspace_id=workspace_id, user_id__in=user_ids).values_list('user_id', flat=True))
+        
+        if existing:
+            raise serializers.ValidationError({'error': 'These users are already members of this workspace', 'user_ids': [str(id) for id in existing]})
+        
+        data['users'] = [users[id] for id in user_ids]
+        
+        # the users' subscription restrictions and whether the workspace has room are checked when the members are added
+        return data
     
+    def create(self, validated_data):
+        workspace = validated_data['workspace']
+        users = validated_data['users']
+        user_ids = [user.id for user in users]
+        
+        try:
+            with transaction.atomic():
+                # CHECK USER SUBSCRIPTION RESTRICTIONS for every user in one statement
+                quotas.reserve_many('workspaces', user_ids)
+                
+                # check if the workspace has room for all of them and take the slots in one statement
+                if not reserve_member_slot(workspace.id, len(users)):
+                    raise serializers.ValidationError({'error': f'The workspace does not have room for {len(users)} more members'})
+                
+                members = Member.objects.bulk_create([
+                    Member(workspace=workspace, user=user, role=validated_data['role'])
+                    for user in users
+                ])
+                
+                # Send notifications
+                dispatcher.notify(
+                    users,
+                    f'You have been added to workspace {workspace.name}',
+                    sender=self.context['request'].user,
+                    kind=Notification.MEMBERSHIP,
+                    target=workspace,
+                )
+                
+        except IntegrityError:
+            # some of the users were added by a concurrent request since validate(), and the transaction is rolled back
+            existing = Member.objects.filter(workspace=workspace, user_id__in=user_ids).values_list('user_id', flat=True)
+            raise serializers.ValidationError({'error': 'These users are already members of this workspace', 'user_ids': [str(id) for id in existing]})
+        
+        except quotas.QuotaExceeded:
+            # the transaction is rolled back by now, so only users that were already at their limit are listed
+            user_ids = quotas.at_limit('workspaces', user_ids).values_list('id', flat=True)
+            raise serializers.ValidationError({
+                'error': 'These users you want to add have as many workspaces as their subscription allows',
+                'user_ids': [str(id) for id in user_ids],
+            })
+        
+        return members
     
-class UpdateMemberSerializer(serializers.ModelSerializer):
+    
+class UpdateMemberSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     '''Serializer to update member role'''
     
+    select_related_fields = ['user', 'workspace']
+    
     workspace = serializers.SerializerMethodField(read_only=True)
     user = UserDetailsSerializer(read_only=True)  
 
@@ -1,3 +1,399 @@
-from django.test import TestCase
+from io import StringIO
+from unittest import mock
+from uuid import uuid4
 
-# Create your tests here.
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import F
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from notification.models import Notification
+from project_management_api import conditional
+from user.models import CustomUser
+from workspace.models import Member, Workspace
+from workspace.serializers import BulkAddMembersSerializer, CreateWorkspaceSerializer, MemberSerializer
+
+
+def create_user(email, **extras):
+    '''Function to create a verified user'''
+    
+    extras.setdefault('subscription_plan', 'ultimate')
+    
+    return CustomUser.objects.create(
+        email=email,
+        first_name='test',
+        last_name='tester',
+        password='Testing@03',
+        phone_number='08012345678',
+        is_verified=True,
+        **extras
+    )
+    
+
+def create_workspace(creator, name='workspace', no_of_members_allowed=10):
+    '''Function to create a workspace with its creator as an editor'''
+    
+    workspace = Workspace.objects.create(
+        name=name,
+        company_email=f'{name}@gmail.com',
+        no_of_members_allowed=no_of_members_allowed,
+        current_no_of_members=1,
+        creator=creator,
+    )
+    Member.objects.create(user=creator, workspace=workspace, role='editor')
+    CustomUser.objects.filter(id=creator.id).update(current_no_of_workspaces=F('current_no_of_workspaces') + 1)
+    
+    return workspace
+
+
+def add_members(workspace, count, role='viewer'):
+    '''Function to add `count` new users to a workspace'''
+    
+    return [
+        Member.objects.create(
+            user=create_user(f'{uuid4().hex}@gmail.com', current_no_of_workspaces=1),
+            workspace=workspace,
+            role=role,
+        )
+        for _ in range(count)
+    ]
+
+
+class WorkspaceQueryCountTestCase(APITestCase):
+    '''Test case to guard the number of queries run by workspace endpoints'''
+    
+    def setUp(self):
+        self.user = create_user('test@gmail.com')
+        self.workspace = create_workspace(self.user)
+        self.client.force_authenticate(user=self.user)
+        
+    def test_update_workspace(self):
+        editor = create_user('editor@gmail.com')
+        Member.objects.create(user=editor, workspace=self.workspace, role='editor')
+        self.client.force_authenticate(user=editor)
+        
+        # 6 queries before the membership resolver
+        with self.assertNumQueries(5):
+            response = self.client.patch(
+                reverse('workspace:workspace-details', kwargs={'workspace_id': self.workspace.id}),
+                {'name': 'new workspace'}
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+    def test_add_member(self):
+        new_user = create_user('new@gmail.com')
+        
+        # 11 queries before the membership resolver, plus the check for an existing membership
+        # and the savepoint around reserving the member slot, with the subscription quota
+        # reserved in one statement instead of counting the user's memberships, and the update
+        # of the unread notification counter in a savepoint with the notification, after looking
+        # for a recent notification about the workspace to merge it with
+        with self.assertNumQueries(15), self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('workspace:add-member', kwargs={'workspace_id': self.workspace.id, 'user_id': new_user.id}),
+                {'role': 'viewer'}
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        
+    def test_list_members(self):
+        url = reverse('workspace:get-workspace-members', kwargs={'workspace_id': self.workspace.id})
+        add_members(self.workspace, 2)
+        
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(len(response.data['results']), 3)
+        
+        add_members(self.workspace, 5)
+        
+        with self.assertNumQueries(len(queries)):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data['results']), 8)
+
+
+class MemberCounterTestCase(APITestCase):
+    '''Test case for the workspace member counter'''
+    
+    def setUp(self):
+        self.user = create_user('test@gmail.com')
+        self.workspace = create_workspace(self.user, no_of_members_allowed=2)
+        self.client.force_authenticate(user=self.user)
+        
+    def add_member(self, user):
+        return self.client.post(
+            reverse('workspace:add-member', kwargs={'workspace_id': self.workspace.id, 'user_id': user.id}),
+            {'role': 'viewer'}
+        )
+        
+    def test_full_workspace(self):
+        self.assertEqual(self.add_member(create_user('first@gmail.com')).status_code, status.HTTP_201_CREATED)
+        
+        response = self.add_member(create_user('second@gmail.com'))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['error'], 'The workspaace is full')
+        
+        self.workspace.refresh_from_db()
+        self.assertEqual(self.workspace.current_no_of_members, 2)
+        self.assertEqual(Member.objects.filter(workspace=self.workspace).count(), 2)
+        
+    def test_member_added_concurrently(self):
+        member = add_members(self.workspace, 1)[0]
+        
+        # as if the member was added by a concurrent request after the check
+        with mock.patch.object(MemberSerializer, 'validate', lambda serializer, data: data):
+            response = self.add_member(member.user)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['error'], 'This user is already a member of this workspace')
+        
+        # the slot and the quota taken before the insert are given back
+        self.workspace.refresh_from_db()
+        member.user.refresh_from_db()
+        self.assertEqual(self.workspace.current_no_of_members, 1)
+        self.assertEqual(member.user.current_no_of_workspaces, 1)
+        
+    def test_remove_member(self):
+        member = add_members(self.workspace, 1)[0]
+        Workspace.objects.filter(id=self.workspace.id).update(current_no_of_members=2)
+        
+        response = self.client.post(reverse('workspace:remove-member', kwargs={'workspace_id': self.workspace.id, 'member_id': member.id}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        self.workspace.refresh_from_db()
+        self.assertEqual(self.workspace.current_no_of_members, 1)
+        
+    def test_reconcile_member_counts(self):
+        add_members(self.workspace, 1)
+        other = create_workspace(create_user('other@gmail.com'), name='other')
+        Workspace.objects.filter(id=self.workspace.id).update(current_no_of_members=7)
+        Workspace.objects.filter(id=other.id).update(current_no_of_members=0)
+        
+        out = StringIO()
+        call_command('reconcile_member_counts', stdout=out)
+        
+        self.assertIn('Fixed the member counter of 2 workspaces', out.getvalue())
+        self.assertEqual(
+            dict(Workspace.objects.values_list('id', 'current_no_of_members')),
+            {self.workspace.id: 2, other.id: 1},
+        )
+
+
+class WorkspaceQuotaTestCase(APITestCase):
+    '''Test case for the subscription quota on the number of workspaces a user is a member of'''
+    
+    def setUp(self):
+        self.user = create_user('test@gmail.com', subscription_plan='starter')
+        self.client.force_authenticate(user=self.user)
+        
+    def create_workspace(self, name):
+        return self.client.post(reverse('workspace:create-workspace'), {
+            'name': name,
+            'company_email': f'{name}@gmail.com',
+            'no_of_members_allowed': 5,
+            'plan': 'basic',
+        })
+        
+    def test_create_workspace_over_quota(self):
+        self.assertEqual(self.create_workspace('first').status_code, status.HTTP_201_CREATED)
+        
+        response = self.create_workspace('second')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['error'], 'You are entitled to one workspace at a time. Upgrade your subscription to have access to more.')
+        
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.current_no_of_workspaces, 1)
+        self.assertFalse(Workspace.objects.filter(name='second').exists())
+        
+    def test_add_member_over_quota(self):
+        owner = create_user('owner@gmail.com')
+        workspace = create_workspace(owner, name='other')
+        create_workspace(self.user)
+        self.client.force_authenticate(user=owner)
+        
+        response = self.client.post(
+            reverse('workspace:add-member', kwargs={'workspace_id': workspace.id, 'user_id': self.user.id}),
+            {'role': 'viewer'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['error'], 'This user you want to add is entitled to one workspace at a time.')
+        
+        # the member slot taken in the same transaction is given back
+        workspace.refresh_from_db()
+        self.assertEqual(workspace.current_no_of_members, 1)
+        
+    def test_delete_workspace_releases_quota(self):
+        workspace = create_workspace(self.user)
+        member = add_members(workspace, 1)[0]
+        
+        response = self.client.delete(reverse('workspace:workspace-details', kwargs={'workspace_id': workspace.id}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        self.assertEqual(
+            dict(CustomUser.objects.filter(id__in=[self.user.id, member.user_id]).values_list('id', 'current_no_of_workspaces')),
+            {self.user.id: 0, member.user_id: 0},
+        )
+        self.assertEqual(self.create_workspace('second').status_code, status.HTTP_201_CREATED)
+        
+    def test_remove_member_releases_quota(self):
+        workspace = create_workspace(self.user)
+        member = add_members(workspace, 1)[0]
+        
+        response = self.client.post(reverse('workspace:remove-member', kwargs={'workspace_id': workspace.id, 'member_id': member.id}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        member.user.refresh_from_db()
+        self.assertEqual(member.user.current_no_of_workspaces, 0)
+        
+    def test_saving_user_keeps_counter(self):
+        # a user loaded before joining a workspace must not write back its old counter
+        stale_user = CustomUser.objects.get(id=self.user.id)
+        create_workspace(self.user)
+        
+        stale_user.first_name = 'new'
+        stale_user.save()
+        
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.current_no_of_workspaces, 1)
+        
+    def test_reconcile_quotas(self):
+        create_workspace(self.user)
+        CustomUser.objects.filter(id=self.user.id).update(current_no_of_workspaces=5)
+        
+        out = StringIO()
+        call_command('reconcile_quotas', 'workspaces', stdout=out)
+        
+        self.assertIn('Fixed the workspaces counter of 1 rows', out.getvalue())
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.current_no_of_workspaces, 1)
+
+
+class BulkMembersTestCase(APITestCase):
+    '''Test case for adding and removing many workspace members at once'''
+    
+    def setUp(self):
+        self.user = create_user('test@gmail.com')
+        self.workspace = create_workspace(self.user, no_of_members_allowed=50)
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('workspace:add-members', kwargs={'workspace_id': self.workspace.id})
+        
+    def add_members(self, users, role='viewer'):
+        return self.client.post(self.url, {'user_ids': [str(user.id) for user in users], 'role': role}, format='json')
+        
+    def test_add_members(self):
+        users = [create_user(f'{i}@gmail.com') for i in range(20)]
+        
+        # the same queries for any number of users, with one for the notifications to merge with
+        with self.assertNumQueries(14), self.captureOnCommitCallbacks(execute=True):
+            response = self.add_members(users)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 20)
+        
+        self.workspace.refresh_from_db()
+        self.assertEqual(self.workspace.current_no_of_members, 21)
+        self.assertEqual(set(CustomUser.objects.filter(id__in=[user.id for user in users]).values_list('current_no_of_workspaces', flat=True)), {1})
+        self.assertEqual(Notification.objects.filter(receiver__in=users).count(), 20)
+        
+    def test_add_existing_members(self):
+        member = add_members(self.workspace, 1)[0]
+        
+        response = self.add_members([member.user, create_user('new@gmail.com')])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['user_ids'], [str(member.user_id)])
+        
+    def test_add_members_added_concurrently(self):
+        member = add_members(self.workspace, 1)[0]
+        users = [member.user, create_user('new@gmail.com')]
+        
+        # as if the member was added by a concurrent request after the check
+        with mock.patch.object(BulkAddMembersSerializer, 'validate', lambda serializer, data: {**data, 'users': users}):
+            response = self.add_members(users)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['user_ids'], [str(member.user_id)])
+        
+        self.workspace.refresh_from_db()
+        self.assertEqual(self.workspace.current_no_of_members, 1)
+        self.assertEqual(CustomUser.objects.get(email='new@gmail.com').current_no_of_workspaces, 0)
+        
+    def test_add_members_over_quota(self):
+        starter = create_user('starter@gmail.com', subscription_plan='starter')
+        create_workspace(starter, name='other')
+        
+        response = self.add_members([create_user('new@gmail.com'), starter])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['user_ids'], [str(starter.id)])
+        
+        # nothing is kept from the failed request
+        self.workspace.refresh_from_db()
+        self.assertEqual(self.workspace.current_no_of_members, 1)
+        self.assertEqual(CustomUser.objects.get(email='new@gmail.com').current_no_of_workspaces, 0)
+        
+    def test_add_members_over_capacity(self):
+        Workspace.objects.filter(id=self.workspace.id).update(no_of_members_allowed=3)
+        
+        response = self.add_members([create_user(f'{i}@gmail.com') for i in range(3)])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['error'], 'The workspace does not have room for 3 more members')
+        self.assertEqual(Member.objects.filter(workspace=self.workspace).count(), 1)
+        
+    def test_remove_members(self):
+        members = add_members(self.workspace, 3)
+        Workspace.objects.filter(id=self.workspace.id).update(current_no_of_members=4)
+        
+        response = self.client.post(
+            reverse('workspace:remove-members', kwargs={'workspace_id': self.workspace.id}),
+            {'member_ids': [str(member.id) for member in members[:2]]},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        self.workspace.refresh_from_db()
+        self.assertEqual(self.workspace.current_no_of_members, 2)
+        self.assertEqual(
+            list(CustomUser.objects.filter(id__in=[member.user_id for member in members]).order_by('email').values_list('email', 'current_no_of_workspaces')),
+            sorted([(member.user.email, 0) for member in members[:2]] + [(members[2].user.email, 1)]),
+        )
+        
+    def test_remove_missing_members(self):
+        other = create_workspace(create_user('other@gmail.com'), name='other')
+        member = add_members(other, 1)[0]
+        
+        response = self.client.post(
+            reverse('workspace:remove-members', kwargs={'workspace_id': self.workspace.id}),
+            {'member_ids': [str(member.id)]},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertTrue(Member.objects.filter(id=member.id).exists())
+
+
+class WorkspaceConditionalGetTestCase(APITestCase):
+    '''Test case for answering GETs of unchanged workspaces with 304 Not Modified'''
+    
+    def setUp(self):
+        self.user = create_user('test@gmail.com')
+        self.workspace = create_workspace(self.user)
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('workspace:workspace-details', kwargs={'workspace_id': self.workspace.id})
+        
+    def test_creator_changed(self):
+        etag = self.client.get(self.url)['ETag']
+        
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        
+        # the creator is rendered with the workspace by their email
+        self.user.email = 'new@gmail.com'
+        self.user.save()
+        
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['creator'], 'new@gmail.com')
+        self.assertNotEqual(response['ETag'], etag)
+        
+    def test_unplanned_relation(self):
+        # a related row rendered without being declared in the eager loading plan would not change the version
+        with self.assertRaises(ImproperlyConfigured):
+            conditional.get_version(CreateWorkspaceSerializer, Workspace.objects.filter(id=self.workspace.id))
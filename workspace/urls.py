@@ -10,5 +10,7 @@ urlpatterns = [
     path('<uuid:workspace_id>/member/<uuid:user_id>/add/', views.AddMemberToWorkspaceView.as_view(), name='add-member'),
     path('<uuid:workspace_id>/member/<uuid:member_id>/remove/', views.RemoveMemberFromWorkspaceView.as_view(), name='remove-member'),
     path('<uuid:workspace_id>/members/', views.GetWorkspaceMembersView.as_view(), name='get-workspace-members'),
+    path('<uuid:workspace_id>/members/add/', views.BulkAddMembersToWorkspaceView.as_view(), name='add-members'),
+    path('<uuid:workspace_id>/members/remove/', views.BulkRemoveMembersFromWorkspaceView.as_view(), name='remove-members'),
     path('<uuid:workspace_id>/member/<uuid:member_id>/update/', views.UpdateMemberRoleView.as_view(), name='get-workspace-members'),
 ]
\ No newline at end of file
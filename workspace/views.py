@@ -1,11 +1,17 @@
 from django.contrib.auth import get_user_model
+from django.db import transaction
 
 from rest_framework import generics
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
 
+from notification import dispatcher
 from notification.models import Notification
+from project_management_api.serializers import Fieldset, MemberIdsSerializer
+from project_management_api import quotas
+from project_management_api.views import ConditionalGetMixin, StreamingListMixin
+from workspace.counters import release_member_slot
 from workspace.models import Member, Workspace
 from workspace.permissions import IsWorkspaceOwnerOrEditorOrReadOnly
 
@@ -25,15 +31,16 @@ class CreateWorkspaceView(generics.CreateAPIView):
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     
 
-class WorkspaceDetailsView(generics.RetrieveUpdateDestroyAPIView):
+class WorkspaceDetailsView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     '''View to get, update and delete workspace details'''
     
     permission_classes = [IsAuthenticated, IsWorkspaceOwnerOrEditorOrReadOnly]
     serializer_class = serializers.WorkspaceDetailsSerializer
+    lookup_url_kwarg = 'workspace_id'
     
-    def get(self, request, *args, **kwargs):        
+    def retrieve(self, request, *args, **kwargs):        
         try:
-            workspace = Workspace.objects.get(id=self.kwargs['workspace_id'])
+            workspace = self.serializer_class.setup_eager_loading(Workspace.objects).get(id=self.kwargs['workspace_id'])
             serializer = self.serializer_class(workspace)
             return Response(serializer.data, status=status.HTTP_200_OK)
         
@@ -51,6 +58,17 @@ class WorkspaceDetailsView(generics.RetrieveUpdateDestroyAPIView):
         except Workspace.DoesNotExist:
             return Response({'error': 'Workspace does not exist'}, status=status.HTTP_404_NOT_FOUND)
     
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            # give every member back the workspace their subscription counted
+            quotas.release('workspaces', Member.objects.filter(workspace=instance).values('user_id'))
+            
+            _, deleted = instance.delete()
+            
+            # the workspace may have been deleted by a concurrent request since it was loaded
+            if not deleted.get(Workspace._meta.label):
+                raise Workspace.DoesNotExist
+    
     def delete(self, request, *args, **kwargs):
         try:
             super().delete(request, *args, **kwargs)
@@ -100,7 +118,11 @@ class RemoveMemberFromWorkspaceView(generics.GenericAPIView):
     
     def post(self, request, workspace_id, member_id):
         workspace = Workspace.objects.get(id=workspace_id)
-        member = Member.objects.get(id=member_id, workspace=workspace)
+        
+        try:
+            member = Member.objects.get(id=member_id, workspace=workspace)
+        except Member.DoesNotExist:
+            return Response({'error': 'Member does not exist in workspace'}, status=status.HTTP_404_NOT_FOUND)
         
         self.check_object_permissions(request, obj=workspace)
         
@@ -109,16 +131,23 @@ class RemoveMemberFromWorkspaceView(generics.GenericAPIView):
         else:
             try:
                 # get member to delete based on the workspace and user objects
-                member.delete()
-                
-                workspace.current_no_of_members -= 1
-                workspace.save()
-                
-                Notification.objects.create(
-                    message=f'You have been removed from workspace {workspace.name}',
-                    sender=request.user,  # current user
-                    receiver=member.user,  # user referenced in url with id
-                )
+                with transaction.atomic():
+                    _, deleted = member.delete()
+                    
+                    # the member may have been removed by a concurrent request since it was loaded
+                    if not deleted.get(Member._meta.label):
+                        raise Member.DoesNotExist
+                    
+                    release_member_slot(workspace.id)
+                    quotas.release('workspaces', [member.user_id])
+                    
+                    dispatcher.notify(
+                        member.user,
+                        f'You have been removed from workspace {workspace.name}',
+                        sender=request.user,
+                        kind=Notification.MEMBERSHIP,
+                        target=workspace,
+                    )
                 
                 return Response({'message': f'Member {member.user.email} has been removed'})
             
@@ -126,7 +155,78 @@ class RemoveMemberFromWorkspaceView(generics.GenericAPIView):
                 return Response({'error': 'Member does not exist in workspace'}, status=status.HTTP_404_NOT_FOUND)
             
 
-class GetWorkspaceMembersView(generics.ListAPIView):
+class BulkAddMembersToWorkspaceView(generics.GenericAPIView):
+    '''View to add many users to a workspace at once'''
+    
+    permission_classes = [IsAuthenticated, IsWorkspaceOwnerOrEditorOrReadOnly]
+    serializer_class = serializers.BulkAddMembersSerializer
+    
+    def post(self, request, workspace_id):
+        try:
+            workspace = Workspace.objects.get(id=workspace_id)
+        except Workspace.DoesNotExist:
+            return Response({'error': 'Workspace does not exist'}, status=status.HTTP_404_NOT_FOUND)
+        
+        self.check_object_permissions(request, obj=workspace)
+        
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        members = serializer.save(workspace=workspace)
+        
+        return Response(serializers.MemberSerializer(members, many=True).data, status=status.HTTP_201_CREATED)
+    
+    
+class BulkRemoveMembersFromWorkspaceView(generics.GenericAPIView):
+    '''View to remove many members from a workspace at once'''
+    
+    permission_classes = [IsAuthenticated, IsWorkspaceOwnerOrEditorOrReadOnly]
+    serializer_class = MemberIdsSerializer
+    
+    def post(self, request, workspace_id):
+        try:
+            workspace = Workspace.objects.get(id=workspace_id)
+        except Workspace.DoesNotExist:
+            return Response({'error': 'Workspace does not exist'}, status=status.HTTP_404_NOT_FOUND)
+        
+        self.check_object_permissions(request, obj=workspace)
+        
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        member_ids = serializer.validated_data['member_ids']
+        
+        members = Member.objects.filter(id__in=member_ids, workspace=workspace)
+        user_ids = dict(members.values_list('id', 'user_id'))
+        missing = [str(id) for id in member_ids if id not in user_ids]
+        
+        if missing:
+            return Response({'error': 'These members do not exist in workspace', 'member_ids': missing}, status=status.HTTP_404_NOT_FOUND)
+        
+        if request.user.id in user_ids.values():
+            return Response({'error': 'You cannot remove yourself from the workspace'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        with transaction.atomic():
+            _, deleted = members.delete()
+            
+            # some of the members may have been removed by a concurrent request since they were loaded
+            if deleted.get(Member._meta.label, 0) != len(member_ids):
+                transaction.set_rollback(True)
+                return Response({'error': 'Some of these members have already been removed from the workspace'}, status=status.HTTP_409_CONFLICT)
+            
+            release_member_slot(workspace.id, len(member_ids))
+            quotas.release('workspaces', list(user_ids.values()))
+            
+            dispatcher.notify(
+                user_ids.values(),
+                f'You have been removed from workspace {workspace.name}',
+                sender=request.user,
+                kind=Notification.MEMBERSHIP,
+                target=workspace,
+            )
+        
+        return Response({'message': f'{len(member_ids)} members have been removed'})
+    
+
+class GetWorkspaceMembersView(ConditionalGetMixin, StreamingListMixin, generics.ListAPIView):
     '''View to view all workspace members'''
     
     permission_classes = [IsAuthenticated, IsWorkspaceOwnerOrEditorOrReadOnly]
@@ -136,18 +236,15 @@ class GetWorkspaceMembersView(generics.ListAPIView):
         workspace_id = self.kwargs['workspace_id']
         workspace = Workspace.objects.get(id=workspace_id)
         
-        members = Member.objects.filter(workspace=workspace)
+        members = self.serializer_class.setup_eager_loading(Member.objects.filter(workspace=workspace), Fieldset.from_request(self.request))
         return members
     
     def list(self, request, *args, **kwargs):
-        workspace_id = self.kwargs['workspace_id']
-        workspace = Workspace.objects.get(id=workspace_id)
-        
-        members = Member.objects.filter(workspace=workspace)
-        serializer = self.serializer_class(members, many=True)
+        members = self.paginate_queryset(self.get_queryset())
         
-        if members.exists():
-            return Response(serializer.data, status=status.HTTP_200_OK)
+        if members:
+            serializer = self.serializer_class(members, many=True, context={'fieldset': Fieldset.from_request(request)})
+            return self.get_paginated_response(serializer.data)
         else:
             return Response({'error': 'There are no members in this workspace'}, status=status.HTTP_204_NO_CONTENT)
         
@@ -173,10 +270,12 @@ class UpdateMemberRoleView(generics.UpdateAPIView):
         try:
             workspace = Workspace.objects.get(id=self.kwargs['workspace_id'])
             member = Member.objects.get(id=self.kwargs['member_id'], workspace=workspace)
-            Notification.objects.create(
-                message=f'Youur role has been updated in {workspace.name}. You are now a/an {member.role}.',
-                sender=self.request.user,  # current user
-                receiver=member.user,  # user referenced in url with id
+            dispatcher.notify(
+                member.user,  # user referenced in url with id
+                f'Youur role has been updated in {workspace.name}. You are now a/an {member.role}.',
+                sender=self.request.user,
+                kind=Notification.MEMBERSHIP,
+                target=workspace,
             )
             
             return Response(serializer.data, status=status.HTTP_200_OK)